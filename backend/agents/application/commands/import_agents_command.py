@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from typing import Any
+
+
+class ImportAgentsCommand(BaseModel):
+    records: Any  # AsyncIterator[Agent], consumed once
+    batch_size: int = 1000
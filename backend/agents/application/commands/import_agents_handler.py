@@ -0,0 +1,44 @@
+from typing import AsyncIterator, List, Optional, Tuple
+from .import_agents_command import ImportAgentsCommand
+from ...core.entities.agent import Agent
+from ...core.repositories.agent_repository import AgentRepository
+from ...core.events.agent_event_observer import AgentEventObserver, AgentEvent, AgentEventType
+import time
+
+
+class ImportAgentsHandler:
+    def __init__(self, agent_repository: AgentRepository, event_observer: Optional[AgentEventObserver] = None):
+        self.agent_repository = agent_repository
+        self.event_observer = event_observer
+    
+    async def handle(self, command: ImportAgentsCommand) -> int:
+        # Stream records straight into batches; only ids and names are kept, for the events
+        created: List[Tuple[str, str]] = []
+
+        async def batches() -> AsyncIterator[List[Agent]]:
+            batch: List[Agent] = []
+            now = str(time.time())
+            async for agent in command.records:
+                agent.created_at = agent.created_at or now
+                agent.updated_at = agent.updated_at or now
+                batch.append(agent)
+                if self.event_observer is not None:
+                    created.append((agent.id, agent.name))
+                if len(batch) >= command.batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        
+        imported = await self.agent_repository.bulk_create(batches())
+        
+        # The import is one transaction; observers hear of it only once it committed
+        if self.event_observer is not None:
+            for agent_id, name in created:
+                await self.event_observer.notify(AgentEvent(
+                    agent_id=agent_id,
+                    event_type=AgentEventType.CREATED,
+                    timestamp=time.time(),
+                    data={"name": name, "source": "import"},
+                ))
+        return imported
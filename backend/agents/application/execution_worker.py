@@ -0,0 +1,171 @@
+"""Execution tier: runs queued agent executions outside the web process.
+
+    python -m agents.application.execution_worker --concurrency 8
+
+Scale by running more of these; they share the job queue through a Redis
+consumer group. A worker that dies leaves its job pending, and another
+worker picks it up once the claim timeout passes. A job that keeps dying
+before it is acknowledged is marked failed and dead-lettered after the
+queue's max_deliveries.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Any, Dict, Optional
+from agents.application.orchestrator import stream_agent_events
+from agents.core.entities.agent import Agent
+from agents.infrastructure.messaging.execution_queue import RedisExecutionQueue, RedisExecutionEvents
+from agents.infrastructure.monitoring.metrics import get_global_metrics, start_metrics_server
+
+JOB_SECONDS = get_global_metrics().histogram(
+    "execution_job_seconds", "Queued execution run time by outcome.", ["outcome"]
+)
+JOBS_IN_FLIGHT = get_global_metrics().gauge("execution_jobs_in_flight", "Jobs this worker is running.")
+
+
+class ExecutionWorker:
+    def __init__(
+        self,
+        queue: RedisExecutionQueue,
+        events: RedisExecutionEvents,
+        concurrency: int = 4,
+        name: Optional[str] = None,
+    ):
+        self.queue = queue
+        self.events = events
+        self.concurrency = concurrency
+        # A consumer reads its own pending jobs first, so two processes sharing a
+        # name would both run them: the default adds the pid to the hostname.
+        # A stable, unique EXECUTION_WORKER_NAME lets a restarted worker resume
+        # its own pending job right away instead of after claim_idle_ms.
+        self.name = name or os.getenv("EXECUTION_WORKER_NAME") or f"{socket.gethostname()}-{os.getpid()}"
+        self.completed = 0
+        self.failed = 0
+
+    async def run_job(self, job: Dict[str, Any]) -> None:
+        """Run the orchestrator for one job, publishing its events as they happen."""
+        execution_id = job["execution_id"]
+        result = ""
+        steps = []
+        started = time.perf_counter()
+        JOBS_IN_FLIGHT.inc()
+        try:
+            # Inside the try: a job that fails validation is recorded as failed
+            # and acknowledged instead of being redelivered forever
+            agent = Agent(**job["agent"])
+            await self.events.set_status(execution_id, status="running", started_at=time.time())
+            await self.events.publish(execution_id, {"type": "status", "status": "running"})
+            # The orchestrator is a blocking generator (tool calls do network I/O):
+            # advance it on a thread so one worker process runs several jobs at once
+            events = stream_agent_events(agent, job["query"])
+            while True:
+                ev = await asyncio.to_thread(next, events, None)
+                if ev is None:
+                    break
+                etype = ev.get("type")
+                content = ev.get("content")
+                if etype in {"message", "result"} and content is not None:
+                    event = {"type": etype, "content": content}
+                    step = ev.get("step")
+                    if step:
+                        steps.append(step)
+                        event["tool"] = step["tool_name"]
+                        event["duration"] = step["duration"]
+                    if ev.get("route"):
+                        event["route"] = ev["route"]
+                    if ev.get("cache"):
+                        event["cache"] = ev["cache"]
+                    await self.events.publish(execution_id, event)
+                    if etype == "result":
+                        result = content
+        except Exception as e:
+            self.failed += 1
+            JOB_SECONDS.labels(outcome="error").observe(time.perf_counter() - started)
+            await self.events.set_status(execution_id, status="failed", error=str(e), completed_at=time.time(),
+                                         steps=json.dumps(steps))
+            await self.events.publish(execution_id, {"type": "error", "message": str(e)})
+            return
+        finally:
+            JOBS_IN_FLIGHT.dec()
+        self.completed += 1
+        JOB_SECONDS.labels(outcome="ok").observe(time.perf_counter() - started)
+        await self.events.set_status(execution_id, status="completed", result=result, completed_at=time.time(),
+                                     steps=json.dumps(steps))
+        await self.events.publish(execution_id, {"type": "complete"})
+
+    async def _heartbeat(self, consumer: str, entry_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.queue.claim_idle_ms / 3000)
+            await self.queue.touch(consumer, entry_id)
+
+    async def process_one(self, consumer: str, block_ms: Optional[int] = 5000) -> bool:
+        """Take one job, run it, then acknowledge it. Returns False if none arrived."""
+        item = await self.queue.next_job(consumer, block_ms=block_ms)
+        if item is None:
+            return False
+        entry_id, job = item
+        deliveries = await self.queue.deliveries(entry_id)
+        if deliveries > self.queue.max_deliveries:
+            # Every earlier attempt died before acking (worker crash, Redis errors
+            # while recording the outcome): stop replaying it
+            await self.give_up(entry_id, job, f"gave up after {deliveries - 1} deliveries")
+            return True
+        heartbeat = asyncio.create_task(self._heartbeat(consumer, entry_id))
+        try:
+            await self.run_job(job)
+        finally:
+            heartbeat.cancel()
+        # Only acknowledged once the outcome is recorded; a crash before this replays the job
+        await self.queue.ack(entry_id)
+        return True
+
+    async def give_up(self, entry_id: str, job: Dict[str, Any], reason: str) -> None:
+        self.failed += 1
+        execution_id = job["execution_id"]
+        await self.events.set_status(execution_id, status="failed", error=reason, completed_at=time.time())
+        await self.events.publish(execution_id, {"type": "error", "message": reason})
+        await self.queue.dead_letter(entry_id, json.dumps(job, ensure_ascii=False), reason)
+
+    async def _consume(self, consumer: str) -> None:
+        while True:
+            try:
+                await self.process_one(consumer)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                try:
+                    print(f"[executions] warn: worker {consumer} error: {e}")
+                except Exception:
+                    pass
+                await asyncio.sleep(1.0)
+
+    async def run(self) -> None:
+        await self.queue.ensure_group()
+        await asyncio.gather(*(self._consume(f"{self.name}-{i}") for i in range(self.concurrency)))
+
+
+async def main(concurrency: int) -> None:
+    from agents.infrastructure.persistence.redis_client import redis_client
+    # Tools registered on the web tier must exist here too
+    if os.getenv("TOOL_SYNC", "").lower() == "redis":
+        from agents.core.services.tool_registry import get_global_registry
+        from agents.infrastructure.messaging.tool_registry_sync import RedisToolRegistrySync
+        RedisToolRegistrySync(redis_client, get_global_registry()).start()
+    # Workers have no web app; serve their tool, LLM and Redis metrics directly
+    metrics_port = os.getenv("EXECUTION_METRICS_PORT")
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+    worker = ExecutionWorker(RedisExecutionQueue(redis_client), RedisExecutionEvents(redis_client), concurrency)
+    await worker.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued agent executions")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("EXECUTION_CONCURRENCY", "4")))
+    args = parser.parse_args()
+    from dotenv import load_dotenv
+    load_dotenv()
+    asyncio.run(main(args.concurrency))
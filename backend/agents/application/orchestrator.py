@@ -1,6 +1,14 @@
-from typing import TypedDict, List, Generator, Dict, Any
-from langgraph.graph import StateGraph, END
+import time
+from typing import TypedDict, List, Generator, Dict, Any, Optional
+from agents.core.entities.execution import ExecutionStep
 from agents.core.services.tool_registry import ToolRegistry, get_global_registry
+from agents.application.query_router import get_query_router
+from agents.infrastructure.persistence.semantic_cache import get_semantic_cache
+from agents.infrastructure.monitoring.metrics import get_global_metrics
+
+STEP_SECONDS = get_global_metrics().histogram(
+    "orchestrator_step_seconds", "Orchestrator step latency by tool and outcome (ok, error, skipped).", ["tool", "outcome"]
+)
 
 
 class AgentState(TypedDict):
@@ -9,9 +17,24 @@ class AgentState(TypedDict):
     index: int
     context: str
     last_output: str
+    step: Optional[Dict[str, Any]]
+
+
+def _record_step(name: str, query: str, outcome: str, started: float, output: Dict[str, Any]) -> Dict[str, Any]:
+    duration = time.perf_counter() - started
+    STEP_SECONDS.labels(tool=name, outcome=outcome).observe(duration)
+    return ExecutionStep(
+        tool_name=name,
+        input={"query": query},
+        output=output,
+        timestamp=str(time.time()),
+        duration=duration,
+    ).model_dump()
 
 
 def _make_graph(tool_registry: ToolRegistry):
+    # langgraph (and the langchain_core it pulls in) loads on the first execution, not at startup
+    from langgraph.graph import StateGraph, END
     graph = StateGraph(AgentState)
 
     def run_next_tool(state: AgentState) -> AgentState:
@@ -22,6 +45,7 @@ def _make_graph(tool_registry: ToolRegistry):
         if idx >= len(tools):
             return state
         name = tools[idx]
+        started = time.perf_counter()
         # Create tool instance (supports class-based and function-based). If missing, skip.
         try:
             tool = tool_registry.create_tool(name)
@@ -30,6 +54,7 @@ def _make_graph(tool_registry: ToolRegistry):
                 **state,
                 "index": idx + 1,
                 "last_output": f"Skipping unknown tool: {name}",
+                "step": _record_step(name, q, "skipped", started, {"skipped": True}),
             }
         try:
             if name == "web_search":
@@ -50,17 +75,22 @@ def _make_graph(tool_registry: ToolRegistry):
                 out = tool.run(query=q, text=context or q)
                 content = str(out.content)
                 context += f"\n[{name}]\n{content}\n"
+            # A tool that caught its own failure still returns output; the step is an error
+            error = getattr(out, "error", None)
+            output = {"content": content, "error": error} if error else {"content": content}
             return {
                 **state,
                 "index": idx + 1,
                 "context": context,
                 "last_output": content,
+                "step": _record_step(name, q, "error" if error else "ok", started, output),
             }
         except Exception as e:
             return {
                 **state,
                 "index": idx + 1,
                 "last_output": f"Tool {name} error: {e}",
+                "step": _record_step(name, q, "error", started, {"error": str(e)}),
             }
 
     graph.add_node("step", run_next_tool)
@@ -75,19 +105,44 @@ def _make_graph(tool_registry: ToolRegistry):
 
 
 def stream_agent_events(agent: Any, query: str) -> Generator[Dict[str, Any], None, None]:
-    registry = get_global_registry()
-    app = _make_graph(registry)
-
     init: AgentState = {
         "query": (query or "").strip(),
         "tools": agent.tools or [],
         "index": 0,
         "context": "",
         "last_output": "",
+        "step": None,
     }
 
+    # Routing runs before anything is built: a direct reply needs no graph or tools
+    router = get_query_router()
+    route = router.route(init["query"], init["tools"]) if router is not None else None
+    if route is not None and route.reply is not None:
+        yield {"type": "message", "content": route.reply, "route": route.as_event()}
+        yield {"type": "result", "content": route.reply}
+        yield {"type": "complete"}
+        return
+
+    # A near-duplicate of an answered query is served from the cache, again without a graph;
+    # answers are scoped to the agent's id and version, so an edited agent starts over
+    cache = get_semantic_cache() if getattr(agent, "id", None) else None
+    scope = (agent.id, getattr(agent, "version", 1)) if cache is not None else None
+    if cache is not None:
+        hit = cache.get(scope, init["query"])
+        if hit is not None:
+            yield {"type": "message", "content": f"Answered from cache (similar to: {hit.query})",
+                   "cache": {"query": hit.query, "similarity": hit.similarity}}
+            yield {"type": "result", "content": hit.answer}
+            yield {"type": "complete"}
+            return
+
+    app = _make_graph(get_global_registry())
+
     yield {"type": "message", "content": f"Processing query: {init['query']}"}
     yield {"type": "message", "content": f"Loaded agent '{agent.name}' with tools: {', '.join(init['tools']) or 'none'}"}
+    if route is not None and route.intent != "none":
+        yield {"type": "message", "content": route.describe(), "route": route.as_event()}
+        init["tools"] = route.tools
 
     # Ensure summarizer is included when using web_search to produce a concise final answer
     tools = list(init["tools"]) if init["tools"] else []
@@ -96,13 +151,25 @@ def stream_agent_events(agent: Any, query: str) -> Generator[Dict[str, Any], Non
         yield {"type": "message", "content": "Auto-attached 'summarizer' to refine web search results."}
     init["tools"] = tools
 
+    clean = True
     for state in app.stream(init, stream_mode="values"):
         # Emit last step output if any
         last = state.get("last_output")
         if last:
-            yield {"type": "message", "content": last}
+            event = {"type": "message", "content": last}
+            step = state.get("step")
+            if step:
+                # Timed step record (ExecutionStep); consumers may keep or drop it
+                event["step"] = step
+                if "error" in step["output"] or "skipped" in step["output"]:
+                    clean = False
+            yield event
 
     # Final result is the aggregated context
     final_context = state.get("context", "") if 'state' in locals() else ""
-    yield {"type": "result", "content": final_context.strip()}
+    result = final_context.strip()
+    # Only answers every tool produced cleanly are worth repeating
+    if cache is not None and clean and result:
+        cache.put(scope, init["query"], result)
+    yield {"type": "result", "content": result}
     yield {"type": "complete"}
@@ -0,0 +1,13 @@
+from typing import AsyncIterator, List
+from .export_agents_query import ExportAgentsQuery
+from ...core.entities.agent import Agent
+from ...core.repositories.agent_repository import AgentRepository
+
+
+class ExportAgentsHandler:
+    def __init__(self, agent_repository: AgentRepository):
+        self.agent_repository = agent_repository
+    
+    async def handle(self, query: ExportAgentsQuery) -> AsyncIterator[List[Agent]]:
+        async for batch in self.agent_repository.stream_all(query.batch_size):
+            yield batch
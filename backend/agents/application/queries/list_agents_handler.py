@@ -9,4 +9,4 @@ class ListAgentsHandler:
         self.agent_repository = agent_repository
     
     async def handle(self, query: ListAgentsQuery) -> List[Agent]:
-        return await self.agent_repository.list_all(query.skip, query.limit)
+        return await self.agent_repository.list_all(query.limit, query.after)
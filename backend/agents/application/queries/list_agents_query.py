@@ -1,6 +1,7 @@
 from pydantic import BaseModel
+from typing import Optional
 
 
 class ListAgentsQuery(BaseModel):
-    skip: int = 0
     limit: int = 100
+    after: Optional[str] = None
@@ -0,0 +1,180 @@
+"""Rule-based routing in front of the orchestrator.
+
+Each query is classified by cheap local matchers, and the first matching
+rule rewrites the agent's tool plan for that query: answer directly
+(`reply`), keep only some tools (`only`), drop some (`skip`), or move some
+to the front (`first`). `when` lists tools the plan must contain for the
+rule to apply. A rule never empties a plan; if it would, the plan is kept.
+
+    {"intent": "math", "match": "math", "when": ["calculator"], "only": ["calculator"]}
+    {"intent": "ticket", "pattern": "^[A-Z]+-\\\\d+$", "first": ["jira_lookup"]}
+
+`match` names a built-in matcher (greeting, math, url, json); `pattern` is
+a regex searched case-insensitively. QUERY_ROUTES_PATH points at a JSON
+list of rules replacing the defaults; QUERY_ROUTER=off disables routing.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from agents.infrastructure.monitoring.metrics import get_global_metrics
+
+QUERY_ROUTER = os.getenv("QUERY_ROUTER", "on").lower() != "off"
+QUERY_ROUTES_PATH = os.getenv("QUERY_ROUTES_PATH", "")
+
+ROUTES = get_global_metrics().counter(
+    "query_router_routes_total", "Queries by routed intent (none: no rule matched).", ["intent"]
+)
+TOOL_CALLS_AVOIDED = get_global_metrics().counter(
+    "query_router_tool_calls_avoided_total", "Tool calls pruned from plans by the query router.", ["intent", "tool"]
+)
+
+GREETING_REPLY = "Hello! How can I help you today?"
+
+DEFAULT_ROUTES: List[Dict[str, Any]] = [
+    {"intent": "greeting", "match": "greeting", "reply": GREETING_REPLY},
+    # A calculator answers arithmetic; searching and summarizing it only adds latency
+    {"intent": "math", "match": "math", "when": ["calculator"], "only": ["calculator"]},
+    {"intent": "json", "match": "json", "skip": ["web_search", "calculator"]},
+    {"intent": "url", "match": "url", "skip": ["calculator"]},
+]
+
+_GREETINGS = {"hi", "hello", "hey", "hola", "yo", "sup", "good morning", "good afternoon", "good evening"}
+_MATH = re.compile(r"^(?:(?:what\s+is|what's|calculate|compute|evaluate)\s+)?[\d\s.,+\-*/%^()×÷]+[?=]?$", re.I)
+_MATH_OPERATION = re.compile(r"\d\s*[+\-*/%^×÷]\s*[(\-]?\s*[\d(]")
+_URL = re.compile(r"\bhttps?://\S+|\bwww\.[\w-]+\.\w+", re.I)
+
+
+def _is_greeting(query: str) -> bool:
+    q = query.lower()
+    return q in _GREETINGS or any(q.startswith(g + " ") for g in _GREETINGS)
+
+
+def _is_math(query: str) -> bool:
+    return bool(_MATH.match(query) and _MATH_OPERATION.search(query))
+
+
+def _is_url(query: str) -> bool:
+    return bool(_URL.search(query))
+
+
+def _is_json(query: str) -> bool:
+    if query[:1] not in ("{", "["):
+        return False
+    try:
+        json.loads(query)
+    except ValueError:
+        return False
+    return True
+
+
+MATCHERS: Dict[str, Callable[[str], bool]] = {
+    "greeting": _is_greeting,
+    "math": _is_math,
+    "url": _is_url,
+    "json": _is_json,
+}
+
+
+@dataclass
+class Route:
+    """The routing decision for one query."""
+    intent: str
+    tools: List[str]
+    skipped: List[str] = field(default_factory=list)
+    reply: Optional[str] = None
+
+    def as_event(self) -> Dict[str, Any]:
+        return {"intent": self.intent, "tools": self.tools, "skipped": self.skipped, "reply": self.reply is not None}
+
+    def describe(self) -> str:
+        if self.reply is not None:
+            return f"Routed as {self.intent}: answered directly"
+        text = f"Routed as {self.intent}: running {', '.join(self.tools) or 'no tools'}"
+        return text + (f" (skipped {', '.join(self.skipped)})" if self.skipped else "")
+
+
+class _Rule:
+    def __init__(self, spec: Dict[str, Any]):
+        self.intent = spec["intent"]
+        if "match" in spec:
+            if spec["match"] not in MATCHERS:
+                raise ValueError(f"Unknown matcher {spec['match']!r} in route {self.intent!r}")
+            self.matches = MATCHERS[spec["match"]]
+        elif "pattern" in spec:
+            self.matches = re.compile(spec["pattern"], re.I).search
+        else:
+            raise ValueError(f"Route {self.intent!r} needs a match or a pattern")
+        self.when = set(spec.get("when", []))
+        self.only: Optional[List[str]] = spec.get("only")
+        self.skip = set(spec.get("skip", []))
+        self.first: List[str] = spec.get("first", [])
+        self.reply: Optional[str] = spec.get("reply")
+
+    def plan(self, tools: List[str]) -> List[str]:
+        if self.only is not None:
+            tools = [t for t in self.only if t in tools]
+        tools = [t for t in tools if t not in self.skip]
+        front = [t for t in self.first if t in tools]
+        return front + [t for t in tools if t not in front]
+
+
+class QueryRouter:
+    """Applies the first rule whose matcher accepts the query."""
+
+    def __init__(self, routes: Optional[List[Dict[str, Any]]] = None):
+        # Compiled once; routing a query is a handful of regex matches
+        self.rules = [_Rule(spec) for spec in (DEFAULT_ROUTES if routes is None else routes)]
+
+    def route(self, query: str, tools: List[str]) -> Route:
+        q = (query or "").strip()
+        for rule in self.rules:
+            if rule.when and not rule.when.issubset(tools):
+                continue
+            if not q or not rule.matches(q):
+                continue
+            if rule.reply is not None:
+                route = Route(rule.intent, [], list(tools), rule.reply)
+            else:
+                planned = rule.plan(tools)
+                if not planned:
+                    # Pruning everything would leave nothing to answer with
+                    route = Route(rule.intent, list(tools))
+                else:
+                    route = Route(rule.intent, planned, [t for t in tools if t not in planned])
+            ROUTES.labels(intent=route.intent).inc()
+            for tool in route.skipped:
+                TOOL_CALLS_AVOIDED.labels(intent=route.intent, tool=tool).inc()
+            return route
+        ROUTES.labels(intent="none").inc()
+        return Route("none", list(tools))
+
+
+def load_routes(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        routes = json.load(f)
+    if not isinstance(routes, list):
+        raise ValueError("Query routes must be a JSON list")
+    return routes
+
+
+_GLOBAL_ROUTER: Optional[QueryRouter] = None
+
+def get_query_router() -> Optional[QueryRouter]:
+    """The process-wide router, or None when QUERY_ROUTER=off."""
+    global _GLOBAL_ROUTER
+    if not QUERY_ROUTER:
+        return None
+    if _GLOBAL_ROUTER is None:
+        router = None
+        if QUERY_ROUTES_PATH:
+            try:
+                router = QueryRouter(load_routes(QUERY_ROUTES_PATH))
+            except Exception as e:
+                try:
+                    print(f"[router] warn: ignoring {QUERY_ROUTES_PATH}, using default routes: {e}")
+                except Exception:
+                    pass
+        _GLOBAL_ROUTER = router or QueryRouter()
+    return _GLOBAL_ROUTER
@@ -10,3 +10,4 @@ class Agent(BaseModel):
     tools: List[str] = Field(default_factory=list)
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
+    version: int = 1  # bumped by every persisted update
@@ -1,7 +1,9 @@
 import asyncio
-from typing import Callable, List, Awaitable
+import time
+from typing import Callable, List, Awaitable, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from ...infrastructure.monitoring.metrics import get_global_metrics
 
 
 class AgentEventType(Enum):
@@ -21,12 +23,154 @@ class AgentEvent:
     data: dict
 
 
+class OverflowPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"  # make room by discarding the longest-waiting event
+    DROP_NEWEST = "drop_newest"  # discard the incoming event
+    BLOCK = "block"  # apply backpressure: notify waits for space
+
+
 class AgentEventObserver:
-    def __init__(self):
+    """Fans events out to subscribers from background workers.
+
+    `notify` only enqueues, so a slow or failing subscriber never adds
+    latency to, or raises into, the request that produced the event.
+    Workers start on the first notify and pull up to `batch_size` queued
+    events at a time; subscribers registered with `subscribe_batch` get
+    them as one list, the rest get one call per event.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 1000,
+        workers: int = 1,
+        batch_size: int = 100,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ):
         self._observers: List[Callable[[AgentEvent], Awaitable[None]]] = []
-    
+        self._batch_observers: List[Callable[[List[AgentEvent]], Awaitable[None]]] = []
+        self._queue: asyncio.Queue[Tuple[float, AgentEvent]] = asyncio.Queue(maxsize=max_queue_size)
+        self._worker_count = workers
+        self._workers: List[asyncio.Task] = []
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.dropped = 0
+        self.delivered = 0
+        self.failed = 0
+        self.lag_seconds = 0.0  # queue wait of the most recently dequeued event
+
     def subscribe(self, callback: Callable[[AgentEvent], Awaitable[None]]):
         self._observers.append(callback)
-    
+
+    def subscribe_batch(self, callback: Callable[[List[AgentEvent]], Awaitable[None]]):
+        self._batch_observers.append(callback)
+
     async def notify(self, event: AgentEvent):
-        await asyncio.gather(*[observer(event) for observer in self._observers])
+        if not self._workers:
+            self._start()
+        item = (time.monotonic(), event)
+        if self.overflow is OverflowPolicy.BLOCK:
+            await self._queue.put(item)
+            return
+        if self._queue.full():
+            self.dropped += 1
+            if self.overflow is OverflowPolicy.DROP_NEWEST:
+                return
+            self._queue.get_nowait()
+            self._queue.task_done()
+        self._queue.put_nowait(item)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "queue_capacity": self._queue.maxsize,
+            "lag_seconds": self.lag_seconds,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+    async def drain(self) -> None:
+        """Wait until every queued event has been delivered."""
+        if self._workers:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        await self.drain()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _start(self) -> None:
+        self._workers = [
+            asyncio.create_task(self._run_worker(), name=f"agent-events-{i}")
+            for i in range(self._worker_count)
+        ]
+
+    async def _run_worker(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self.lag_seconds = time.monotonic() - batch[0][0]
+            events = [event for _, event in batch]
+            try:
+                await self._deliver(events)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, events: List[AgentEvent]) -> None:
+        calls = [self._guard(observer, event) for event in events for observer in self._observers]
+        calls += [self._guard(observer, events) for observer in self._batch_observers]
+        await asyncio.gather(*calls)
+        self.delivered += len(events)
+
+    async def _guard(self, observer: Callable[..., Awaitable[None]], payload) -> None:
+        # One subscriber's failure must not reach the others or the worker
+        try:
+            await observer(payload)
+        except Exception as e:
+            self.failed += 1
+            try:
+                print(f"[events] warn: subscriber {getattr(observer, '__name__', observer)} failed: {e}")
+            except Exception:
+                pass
+
+
+# Module-level singleton so every handler in the process feeds the same workers
+_GLOBAL_OBSERVER: Optional[AgentEventObserver] = None
+
+def get_global_event_observer() -> AgentEventObserver:
+    global _GLOBAL_OBSERVER
+    if _GLOBAL_OBSERVER is None:
+        _GLOBAL_OBSERVER = AgentEventObserver()
+    return _GLOBAL_OBSERVER
+
+
+
+def _observer_stat(*keys: str) -> Callable[[], dict]:
+    """Scrape-time reader of the global observer's stats(); one field, or one label value per field."""
+    def collect() -> dict:
+        if _GLOBAL_OBSERVER is None:
+            return {}
+        stats = _GLOBAL_OBSERVER.stats()
+        if len(keys) == 1:
+            return {(): float(stats[keys[0]])}
+        return {(key,): float(stats[key]) for key in keys}
+    return collect
+
+
+_metrics = get_global_metrics()
+_metrics.gauge("agent_events_queue_depth", "Agent events waiting for a delivery worker.", collect=_observer_stat("queue_depth"))
+_metrics.gauge("agent_events_queue_capacity", "Size of the agent event queue.", collect=_observer_stat("queue_capacity"))
+_metrics.gauge("agent_events_lag_seconds", "Queue wait of the most recently dequeued agent event.",
+               collect=_observer_stat("lag_seconds"))
+_metrics.counter(
+    "agent_events_total", "Agent events by outcome (delivered; failed: a subscriber raised; dropped: queue full).",
+    ["outcome"], collect=_observer_stat("delivered", "failed", "dropped"),
+)
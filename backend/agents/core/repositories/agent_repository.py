@@ -1,9 +1,22 @@
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 from ..entities.agent import Agent
 from .base import BaseRepository
 
 
+class StaleAgentError(ValueError):
+    """Raised when an update carries an older version than the stored agent."""
+    pass
+
+
 class AgentRepository(BaseRepository[Agent]):
     async def get_by_name(self, name: str) -> Optional[Agent]:
         # This would be implemented in the concrete repository
         pass
+    
+    async def bulk_create(self, batches: AsyncIterator[List[Agent]]) -> int:
+        # This would be implemented in the concrete repository
+        pass
+    
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[List[Agent]]:
+        # This would be implemented in the concrete repository
+        pass
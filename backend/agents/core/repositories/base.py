@@ -18,4 +18,6 @@ class BaseRepository(Generic[T], ABC):
     async def delete(self, id: str) -> bool: ...
     
     @abstractmethod
-    async def list_all(self, skip: int = 0, limit: int = 100) -> List[T]: ...
+    async def list_all(self, limit: int = 100, after: Optional[str] = None) -> List[T]:
+        """Keyset page ordered by id; `after` is the last id of the previous page."""
+        ...
@@ -1,10 +1,10 @@
-from typing import List
+from typing import List, Optional
 from ..entities.execution import Execution
 from .base import BaseRepository
 
 
 class ExecutionRepository(BaseRepository[Execution]):
-    async def get_by_agent_id(self, agent_id: str) -> List[Execution]:
+    async def get_by_agent_id(self, agent_id: str, limit: int = 100, after: Optional[str] = None) -> List[Execution]:
         # This would be implemented in the concrete repository
         pass
     
@@ -1,11 +1,13 @@
-from typing import Dict, Type, Any, Optional, Callable
+from typing import Dict, Type, Any, Optional, Callable, List, Tuple
 import inspect
-from ...infrastructure.external.base_tool import BaseTool, ToolOutput
+from ...infrastructure.external.base_tool import BaseTool, ToolContext, ToolOutput
 from ...infrastructure.external.web_search_tool import WebSearchTool
 from ...infrastructure.external.calculator_tool import CalculatorTool
 from ...infrastructure.external.summarizer_tool import SummarizerTool
 from ...infrastructure.external.chatbot_tool import ChatbotTool
+from ...infrastructure.external.resilient_call import get_llm_caller
 import ast
+import hashlib
 import os
 import json
 
@@ -21,6 +23,16 @@ class ToolRegistry:
             'summarizer': {'kind': 'class', 'class': SummarizerTool},
             'chatbot': {'kind': 'class', 'class': ChatbotTool},
         }
+        # Persisted form of every runtime tool, as written to registered_tools.json;
+        # this is also what gets shipped to other workers
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Bumped on every change so derived views can tell when they are stale
+        self.version = 0
+        # (version, catalog, etag) of the last list_tools() build
+        self._catalog: Optional[Tuple[int, Dict[str, dict], str]] = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        # Set while applying a change made elsewhere: skip persisting and re-publishing
+        self._applying = False
         # Load any persisted runtime tools
         try:
             self._load_persisted()
@@ -93,10 +105,14 @@ class ToolRegistry:
                 k: v for k, v in kwargs.items()
                 if k in getattr(tool_class.__init__, '__annotations__', {})
             }
-            return tool_class(**filtered_kwargs)
+            tool = tool_class(**filtered_kwargs)
+            tool.context = ToolContext(tool_type)
+            return tool
         elif meta.get('kind') == 'function':
             fn: Callable[..., Any] = meta['callable']
-            description: str = meta.get('description', '')
+            # Not named `description`: the class body below assigns that name,
+            # so it would not see an enclosing local of the same name
+            fn_description: str = meta.get('description', '')
             params: list[str] = meta.get('parameters', [])
 
             # Build a lightweight wrapper tool so the rest of the system can run .run()
@@ -104,7 +120,7 @@ class ToolRegistry:
             # parameters are already tracked in meta for list_tools().
             class FunctionTool(BaseTool):  # type: ignore
                 name = tool_type
-                description = description
+                description = fn_description
                 args_schema = None  # parameters provided by registry list
 
                 def _run(self, **call_kwargs):
@@ -115,9 +131,19 @@ class ToolRegistry:
                         bound = call_kwargs
                     else:
                         bound = {k: v for k, v in call_kwargs.items() if k in sig.parameters}
+                    wants_context = 'context' in sig.parameters
+                    if wants_context:
+                        bound['context'] = self.context
                     res = fn(**bound)
+                    if inspect.isawaitable(res) and wants_context:
+                        # context.http belongs to the pool's loop, so the coroutine must run there
+                        from ...infrastructure.external.http_pool import get_http_pool
+                        try:
+                            res = get_http_pool().run(res)
+                        except Exception as e:
+                            return ToolOutput(content=f"Custom tool async execution error: {e}", error=str(e))
                     # If async, await in a dedicated event loop for this thread
-                    if inspect.isawaitable(res):
+                    elif inspect.isawaitable(res):
                         import asyncio
                         try:
                             # Create a new loop for this worker thread
@@ -129,10 +155,12 @@ class ToolRegistry:
                                 loop.close()
                                 asyncio.set_event_loop(None)
                         except Exception as e:
-                            return ToolOutput(content=f"Custom tool async execution error: {e}")
+                            return ToolOutput(content=f"Custom tool async execution error: {e}", error=str(e))
                     return ToolOutput(content=str(res))
 
-            return FunctionTool()
+            tool = FunctionTool()
+            tool.context = ToolContext(tool_type)
+            return tool
         else:
             raise ValueError(f"Unsupported tool kind for {tool_type}")
     
@@ -156,7 +184,15 @@ class ToolRegistry:
         if tool_class:
             self._tools[tool_name] = {'kind': 'class', 'class': tool_class}
             # Persist class-based tool code as well for reloads
-            self._save_persisted_entry(tool_name, 'class', code, description or '', parameters=[])
+            if not self._applying:
+                self._save_persisted_entry(tool_name, 'class', code, description or '', parameters=[])
+            self._changed({
+                'name': tool_name,
+                'kind': 'class',
+                'code': code,
+                'description': description or '',
+                'parameters': [],
+            })
             return
 
         # 2) Otherwise accept a top-level callable (function)
@@ -179,7 +215,9 @@ class ToolRegistry:
         # Inspect parameters for listing
         try:
             sig = inspect.signature(fn)
-            param_names = [p.name for p in sig.parameters.values() if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)]
+            # `context` is injected by the registry, not supplied by callers
+            param_names = [p.name for p in sig.parameters.values()
+                           if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY) and p.name != 'context']
         except Exception:
             param_names = []
 
@@ -190,7 +228,15 @@ class ToolRegistry:
             'parameters': param_names,
         }
         # Persist function-based tool so it survives reloads
-        self._save_persisted_entry(tool_name, 'function', code, description or '', parameters=param_names)
+        if not self._applying:
+            self._save_persisted_entry(tool_name, 'function', code, description or '', parameters=param_names)
+        self._changed({
+            'name': tool_name,
+            'kind': 'function',
+            'code': code,
+            'description': description or '',
+            'parameters': param_names,
+        })
     
     def register_llm_tool(self, tool_name: str, description: str, parameters: Optional[list[str]] = None) -> None:
         """Register an LLM-proxy tool that forwards input to OpenAI Chat Completions.
@@ -214,8 +260,9 @@ class ToolRegistry:
                     except Exception:
                         main = str(kwargs)
                 from openai import OpenAI
-                client = OpenAI()
-                resp = client.chat.completions.create(
+                from ...infrastructure.external.http_cassette import openai_http_client
+                client = OpenAI(max_retries=0, http_client=openai_http_client())
+                resp = get_llm_caller().call(lambda timeout: client.chat.completions.create(
                     model="gpt-4o",
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -223,7 +270,8 @@ class ToolRegistry:
                     ],
                     temperature=0.0,
                     max_tokens=128,
-                )
+                    timeout=timeout,
+                ))
                 return (resp.choices[0].message.content or "").strip()
             except Exception as e:
                 return f"LLM tool error: {e}"
@@ -235,7 +283,15 @@ class ToolRegistry:
             'parameters': param_names,
         }
         # Persist as a special llm_proxy entry
-        self._save_persisted_llm_entry(tool_name, description, param_names)
+        if not self._applying:
+            self._save_persisted_llm_entry(tool_name, description, param_names)
+        self._changed({
+            'name': tool_name,
+            'kind': 'function',
+            'description': description,
+            'parameters': param_names,
+            'llm_proxy': True,
+        })
 
     def register_llm_code_tool(self, tool_name: str, description: str, code: str) -> None:
         """Register a code-backed LLM execution tool.
@@ -263,7 +319,8 @@ class ToolRegistry:
                     except Exception:
                         user_input = str(kwargs)
                 from openai import OpenAI
-                client = OpenAI()
+                from ...infrastructure.external.http_cassette import openai_http_client
+                client = OpenAI(max_retries=0, http_client=openai_http_client())
                 messages = [
                     {"role": "system", "content": strict_prompt_prefix},
                     {"role": "user", "content": (
@@ -273,12 +330,13 @@ class ToolRegistry:
                         f"INPUT TO THE FUNCTION\n{user_input}"
                     )},
                 ]
-                resp = client.chat.completions.create(
+                resp = get_llm_caller().call(lambda timeout: client.chat.completions.create(
                     model="gpt-4o",
                     messages=messages,
                     temperature=0.0,
                     max_tokens=128,
-                )
+                    timeout=timeout,
+                ))
                 return (resp.choices[0].message.content or "").strip()
             except Exception as e:
                 return f"LLM tool error: {e}"
@@ -289,9 +347,86 @@ class ToolRegistry:
             'description': description,
             'parameters': ["input"],
         }
-        self._save_persisted_llm_code_entry(tool_name, description, code)
+        if not self._applying:
+            self._save_persisted_llm_code_entry(tool_name, description, code)
+        self._changed({
+            'name': tool_name,
+            'kind': 'function',
+            'description': description,
+            'parameters': ["input"],
+            'llm_code': True,
+            'code': code,
+        })
+
+    # --------------------------- Change tracking ---------------------------
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `listener(entry)` after every local registration."""
+        self._listeners.append(listener)
+
+    def apply_change(self, entry: Dict[str, Any]) -> bool:
+        """Apply a registration made by another worker.
+
+        Only the named tool is (re)built; nothing is re-read, persisted or
+        re-published. Returns False if the entry is already in effect, which
+        makes replaying a change (including our own) a no-op.
+        """
+        name = entry.get('name')
+        if not name or self._entries.get(name) == entry:
+            return False
+        self._applying = True
+        try:
+            self._register_entry(entry)
+        finally:
+            self._applying = False
+        return True
+
+    def _changed(self, entry: Dict[str, Any]) -> None:
+        self._entries[entry['name']] = entry
+        self.version += 1
+        if self._applying:
+            return
+        for listener in self._listeners:
+            try:
+                listener(entry)
+            except Exception as e:
+                try:
+                    print(f"[tools] warn: change listener failed for '{entry['name']}': {e}")
+                except Exception:
+                    pass
     
+    def has_tool(self, name: str) -> bool:
+        return name in self._tools
+
     def list_tools(self) -> Dict[str, dict]:
+        """The tool catalog, built once per registry version.
+
+        The same dict is returned until the next change, so callers must
+        not modify it.
+        """
+        return self._current_catalog()[1]
+
+    def catalog(self) -> Tuple[Dict[str, dict], str]:
+        """list_tools() with its content hash, from the same build.
+
+        The hash depends only on the catalog, so workers holding the same
+        tools agree on it.
+        """
+        _, catalog, etag = self._current_catalog()
+        return catalog, etag
+
+    def _current_catalog(self) -> Tuple[int, Dict[str, dict], str]:
+        cached = self._catalog
+        if cached is not None and cached[0] == self.version:
+            return cached
+        # Read the version first: a change landing mid-build leaves this entry stale, not wrong
+        version = self.version
+        catalog = self._build_catalog()
+        body = json.dumps(catalog, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        cached = (version, catalog, hashlib.sha1(body).hexdigest())
+        self._catalog = cached
+        return cached
+
+    def _build_catalog(self) -> Dict[str, dict]:
         info: Dict[str, dict] = {}
         for name, meta in self._tools.items():
             if meta.get('kind') == 'class':
@@ -341,34 +476,37 @@ class ToolRegistry:
         for entry in data:
             try:
                 name = entry.get('name')
-                kind = entry.get('kind')
-                desc = entry.get('description', '')
                 if not name:
                     continue
                 if name in self._tools:
                     continue
-                # Rehydrate special llm_proxy entries
-                if entry.get('llm_proxy') is True:
-                    params = entry.get('parameters') or ["input"]
-                    self.register_llm_tool(name, desc, params)
-                    continue
-                # Rehydrate llm_code entries
-                if entry.get('llm_code') is True:
-                    code = entry.get('code') or ''
-                    if code:
-                        self.register_llm_code_tool(name, desc, code)
-                    continue
-                # Fallback to code-based entries
-                code = entry.get('code')
-                if not code:
-                    continue
-                self.register_from_code(code, name, desc)
+                self._register_entry(entry)
             except Exception as e:
                 try:
                     print(f"[tools] warn: failed to load persisted '{entry}': {e}")
                 except Exception:
                     pass
 
+    def _register_entry(self, entry: Dict[str, Any]) -> None:
+        name = entry['name']
+        desc = entry.get('description', '')
+        # Rehydrate special llm_proxy entries
+        if entry.get('llm_proxy') is True:
+            params = entry.get('parameters') or ["input"]
+            self.register_llm_tool(name, desc, params)
+            return
+        # Rehydrate llm_code entries
+        if entry.get('llm_code') is True:
+            code = entry.get('code') or ''
+            if code:
+                self.register_llm_code_tool(name, desc, code)
+            return
+        # Fallback to code-based entries
+        code = entry.get('code')
+        if not code:
+            return
+        self.register_from_code(code, name, desc)
+
     def _save_persisted_entry(self, name: str, kind: str, code: str, description: str, parameters: list[str]) -> None:
         path = self._persist_path()
         payload = []
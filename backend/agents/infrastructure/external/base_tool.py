@@ -1,6 +1,10 @@
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from pydantic import BaseModel
+from ..monitoring.metrics import get_global_metrics
+
+TOOL_SECONDS = get_global_metrics().histogram("tool_call_seconds", "Tool run latency by tool and outcome.", ["tool", "outcome"])
 
 
 class ToolInput(BaseModel):
@@ -9,8 +13,36 @@ class ToolInput(BaseModel):
 
 
 class ToolOutput(BaseModel):
-    """Base model for tool outputs."""
+    """Base model for tool outputs.
+
+    Tools report failures as content the agent can read; `error` marks the
+    output as one, so metrics and the orchestrator can tell it from a result.
+    """
     content: Any
+    error: Optional[str] = None
+
+
+class ToolContext:
+    """Shared services the registry hands to tools.
+
+    Class tools find it at `self.context`; function tools get it by
+    declaring a `context` parameter. Async function tools that take it
+    run on the HTTP pool's event loop, where `http` can be awaited.
+    """
+
+    def __init__(self, tool_name: str):
+        self.tool_name = tool_name
+
+    @property
+    def http(self) -> Any:
+        """The process-wide httpx.AsyncClient (keep-alive, DNS cache, per-host limits)."""
+        from .http_pool import get_http_pool
+        return get_http_pool().client
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        """Blocking request through the same client, for sync tools."""
+        from .http_pool import get_http_pool
+        return get_http_pool().request(method, url, **kwargs)
 
 
 class BaseTool(ABC):
@@ -18,6 +50,7 @@ class BaseTool(ABC):
     name: str
     description: str
     args_schema: BaseModel = ToolInput
+    context: Optional[ToolContext] = None
 
     @abstractmethod
     def _run(self, *args: Any, **kwargs: Any) -> ToolOutput:
@@ -27,4 +60,14 @@ class BaseTool(ABC):
     def run(self, *args: Any, **kwargs: Any) -> ToolOutput:
         """Public method to run the tool with validation."""
         # In a real system, you'd add validation, logging, etc. here
-        return self._run(*args, **kwargs)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            output = self._run(*args, **kwargs)
+            # Tools catch their own exceptions and return an error output instead
+            outcome = "error" if getattr(output, "error", None) else "ok"
+            return output
+        finally:
+            TOOL_SECONDS.labels(tool=getattr(self, "name", type(self).__name__), outcome=outcome).observe(
+                time.perf_counter() - started
+            )
@@ -1,9 +1,9 @@
 from .base_tool import BaseTool, ToolInput, ToolOutput
+from .resilient_call import get_llm_caller
 from pydantic import Field
 import os
 import json
 from typing import Optional
-from openai import OpenAI
 
 
 class CalculatorInput(ToolInput):
@@ -21,21 +21,24 @@ class CalculatorTool(BaseTool):
             return ToolOutput(content="OpenAI API key not configured. Set OPENAI_API_KEY.")
 
         try:
-            client = OpenAI(api_key=api_key)
+            from openai import OpenAI
+            from .http_cassette import openai_http_client
+            client = OpenAI(api_key=api_key, max_retries=0, http_client=openai_http_client())
             system = (
                 "You are a strict calculator. Evaluate the given mathematical expression "
                 "exactly and return a pure JSON object {\"result\": <number>} with no extra text."
             )
             user = f"Expression: {expression}\nReturn JSON only."
 
-            resp = client.chat.completions.create(
+            resp = get_llm_caller().call(lambda timeout: client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system},
                     {"role": "user", "content": user},
                 ],
                 temperature=0,
-            )
+                timeout=timeout,
+            ))
             content = (resp.choices[0].message.content or "").strip()
 
             value: Optional[str] = None
@@ -48,7 +51,7 @@ class CalculatorTool(BaseTool):
                 value = content
 
             if value is None:
-                return ToolOutput(content="Error: Unable to parse calculator result.")
+                return ToolOutput(content="Error: Unable to parse calculator result.", error="unparseable result")
             return ToolOutput(content=f"Result: {value}")
         except Exception as e:
-            return ToolOutput(content=f"Calculator error: {str(e)}")
+            return ToolOutput(content=f"Calculator error: {str(e)}", error=str(e))
@@ -1,7 +1,7 @@
 from .base_tool import BaseTool, ToolInput, ToolOutput
+from .resilient_call import get_llm_caller
 from pydantic import Field
 from typing import Optional
-from openai import OpenAI
 import os
 
 
@@ -28,19 +28,22 @@ class ChatbotTool(BaseTool):
             return ToolOutput(content="OpenAI API key not configured. Set OPENAI_API_KEY.")
 
         try:
-            client = OpenAI(api_key=api_key)
+            from openai import OpenAI
+            from .http_cassette import openai_http_client
+            client = OpenAI(api_key=api_key, max_retries=0, http_client=openai_http_client())
             sys_prompt = system or "You are a helpful, concise assistant."
             mdl = model or "gpt-4o-mini"
 
-            resp = client.chat.completions.create(
+            resp = get_llm_caller().call(lambda timeout: client.chat.completions.create(
                 model=mdl,
                 messages=[
                     {"role": "system", "content": sys_prompt},
                     {"role": "user", "content": query},
                 ],
                 temperature=0.2,
-            )
+                timeout=timeout,
+            ))
             content = (resp.choices[0].message.content or "").strip()
             return ToolOutput(content=content)
         except Exception as e:
-            return ToolOutput(content=f"Chatbot error: {str(e)}")
+            return ToolOutput(content=f"Chatbot error: {str(e)}", error=str(e))
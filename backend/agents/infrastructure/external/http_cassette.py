@@ -0,0 +1,196 @@
+"""Record and replay upstream HTTP exchanges (OpenAI, DuckDuckGo) via cassettes.
+
+    HTTP_CASSETTE_MODE=record HTTP_CASSETTE_PATH=run.jsonl.gz  -> live calls, saved
+    HTTP_CASSETTE_MODE=replay HTTP_CASSETTE_PATH=run.jsonl.gz  -> no network at all
+
+A cassette is gzipped JSON lines, one exchange per line: a request key,
+method, URL, status, content type, body and the latency it took. Request
+bodies and headers are only hashed into the key, so prompts and API keys
+never land in the file.
+
+Replay serves the exchange recorded for the same request; if there is none,
+one recorded for the same method and path (in rotation), so a run with new
+queries still gets realistic responses. Latency is replayed as recorded, not
+at all, or drawn around a median given in ms (HTTP_CASSETTE_LATENCY).
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import httpx
+
+
+class CassetteMissError(httpx.TransportError):
+    """Raised on replay when nothing recorded matches the request."""
+    pass
+
+
+def _canonical_body(content: bytes) -> bytes:
+    # JSON bodies compare by value so key order and whitespace don't matter
+    try:
+        return json.dumps(json.loads(content), sort_keys=True, separators=(",", ":")).encode()
+    except (ValueError, UnicodeDecodeError):
+        return content
+
+
+def _path_key(request: httpx.Request) -> str:
+    return f"{request.method} {request.url.scheme}://{request.url.host}{request.url.path}"
+
+
+def request_key(request: httpx.Request) -> str:
+    url = urlsplit(str(request.url))
+    query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {url.scheme}://{url.netloc}{url.path}?{query}\n".encode())
+    digest.update(_canonical_body(request.content))
+    return digest.hexdigest()[:32]
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Passes requests to `inner` and appends each exchange to the cassette."""
+
+    def __init__(self, path: str, inner: Optional[httpx.BaseTransport] = None):
+        self.path = path
+        self.inner = inner or httpx.HTTPTransport()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        start = time.perf_counter()
+        response = self.inner.handle_request(request)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        latency = time.perf_counter() - start
+        content_type = response.headers.get("content-type", "")
+        entry = {
+            "key": request_key(request),
+            "method": request.method,
+            "url": f"{request.url.scheme}://{request.url.host}{request.url.path}",
+            "status": response.status_code,
+            "content_type": content_type,
+            "latency": round(latency, 4),
+        }
+        try:
+            entry["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(body).decode()
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            # One gzip member per exchange: a crash mid-run still leaves a readable cassette
+            with open(self.path, "ab") as f:
+                f.write(gzip.compress(line))
+        headers = {"content-type": content_type} if content_type else {}
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    def close(self) -> None:
+        # Shared by every client in the process; a client closing must not close it
+        pass
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """Serves recorded exchanges; never opens a connection.
+
+    `latency` is "recorded", "none", or a median in ms for synthetic
+    lognormal latency. `strict` disables the same-path fallback.
+    """
+
+    def __init__(self, path: str, latency: str = "recorded", strict: bool = False, seed: int = 7):
+        self.latency = latency
+        self.strict = strict
+        self.random = random.Random(seed)
+        self._by_key: Dict[str, List[dict]] = defaultdict(list)
+        self._by_path: Dict[str, List[dict]] = defaultdict(list)
+        self._turns: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._by_key[entry["key"]].append(entry)
+                    self._by_path[f"{entry['method']} {entry['url']}"].append(entry)
+        self.hits = 0
+        self.fallbacks = 0
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._by_key.values())
+
+    def _next(self, index: str, entries: List[dict]) -> dict:
+        # Repeated requests cycle through their recordings in order
+        with self._lock:
+            turn = self._turns[index]
+            self._turns[index] = turn + 1
+        return entries[turn % len(entries)]
+
+    def _delay(self, entry: dict) -> float:
+        if self.latency == "none":
+            return 0.0
+        if self.latency == "recorded":
+            return entry.get("latency", 0.0)
+        median = float(self.latency) / 1000
+        with self._lock:
+            return median * self.random.lognormvariate(0, 0.25)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        key = request_key(request)
+        entries = self._by_key.get(key)
+        if entries:
+            entry = self._next(key, entries)
+            self.hits += 1
+        else:
+            path = _path_key(request)
+            entries = None if self.strict else self._by_path.get(path)
+            if not entries:
+                raise CassetteMissError(f"No recorded exchange for {request.method} {request.url}", request=request)
+            entry = self._next(path, entries)
+            self.fallbacks += 1
+        delay = self._delay(entry)
+        if delay > 0:
+            time.sleep(delay)
+        if "body_b64" in entry:
+            content = base64.b64decode(entry["body_b64"])
+        else:
+            content = entry.get("body", "").encode("utf-8")
+        headers = {"content-type": entry["content_type"]} if entry.get("content_type") else {}
+        return httpx.Response(entry["status"], headers=headers, content=content, request=request)
+
+
+HTTP_CASSETTE_MODE = os.getenv("HTTP_CASSETTE_MODE", "").lower()  # "", "record" or "replay"
+HTTP_CASSETTE_PATH = os.getenv("HTTP_CASSETTE_PATH", "config/cassettes/upstream.jsonl.gz")
+HTTP_CASSETTE_LATENCY = os.getenv("HTTP_CASSETTE_LATENCY", "recorded")
+
+# Module-level singleton: every upstream client in the process shares one cassette
+_TRANSPORT: Optional[httpx.BaseTransport] = None
+_TRANSPORT_LOCK = threading.Lock()
+
+def get_http_transport() -> Optional[httpx.BaseTransport]:
+    """The cassette transport for upstream clients, or None to use the network as usual."""
+    global _TRANSPORT
+    if not HTTP_CASSETTE_MODE:
+        return None
+    if _TRANSPORT is None:
+        with _TRANSPORT_LOCK:
+            if _TRANSPORT is None:
+                if HTTP_CASSETTE_MODE == "record":
+                    _TRANSPORT = RecordingTransport(HTTP_CASSETTE_PATH)
+                elif HTTP_CASSETTE_MODE == "replay":
+                    _TRANSPORT = ReplayTransport(HTTP_CASSETTE_PATH, latency=HTTP_CASSETTE_LATENCY)
+                else:
+                    raise ValueError(f"HTTP_CASSETTE_MODE must be record or replay, not {HTTP_CASSETTE_MODE!r}")
+    return _TRANSPORT
+
+
+def openai_http_client() -> Optional[httpx.Client]:
+    """An httpx client for OpenAI(http_client=...) when a cassette is active, else None (SDK default)."""
+    transport = get_http_transport()
+    return httpx.Client(transport=transport) if transport is not None else None
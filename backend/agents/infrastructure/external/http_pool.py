@@ -0,0 +1,383 @@
+"""One outbound HTTP client for every tool in the process.
+
+An `httpx.AsyncClient` lives on its own event loop thread, so its
+keep-alive connections outlast any one tool call or request handler:
+
+    get_http_pool().request("GET", url)     # sync code: blocks this thread only
+    await get_http_pool().client.get(url)   # coroutines running on pool.loop
+
+Around the connection pool sit a DNS cache (addresses are reused for
+HTTP_POOL_DNS_TTL seconds; a failed connect drops them) and a cap on
+requests in flight per host. HTTP/2 is used when HTTP_POOL_HTTP2=on and
+the h2 package is installed. While a cassette is active (see
+http_cassette), requests go to it instead of the network.
+
+Requests and newly opened connections are counted per host; their ratio
+is exported as http_pool_connection_reuse_ratio.
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import ssl
+import threading
+import time
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple, TypeVar, Union
+import httpcore
+import httpx
+from ..monitoring.metrics import get_global_metrics
+from .http_cassette import get_http_transport
+
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))
+HTTP_POOL_CONNECT_TIMEOUT = float(os.getenv("HTTP_POOL_CONNECT_TIMEOUT", "5"))
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+HTTP_POOL_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "30"))
+HTTP_POOL_MAX_PER_HOST = int(os.getenv("HTTP_POOL_MAX_PER_HOST", "10"))
+HTTP_POOL_HTTP2 = os.getenv("HTTP_POOL_HTTP2", "").lower() == "on"
+HTTP_POOL_DNS_TTL = float(os.getenv("HTTP_POOL_DNS_TTL", "60"))
+
+USER_AGENT = "AgentSystem/1.0"
+
+# Tools may fetch arbitrary URLs; hosts past this many share the "other" label
+_MAX_HOST_LABELS = 50
+
+T = TypeVar("T")
+
+
+class _HostLabels:
+    def __init__(self, limit: int = _MAX_HOST_LABELS):
+        self.limit = limit
+        self._seen: Set[str] = set()
+
+    def __call__(self, host: str) -> str:
+        if host in self._seen:
+            return host
+        if len(self._seen) >= self.limit:
+            return "other"
+        self._seen.add(host)
+        return host
+
+
+_host_label = _HostLabels()
+
+_metrics = get_global_metrics()
+HTTP_POOL_REQUESTS = _metrics.counter("http_pool_requests_total", "Outbound requests sent through the shared client.", ["host"])
+HTTP_POOL_CONNECTIONS = _metrics.counter(
+    "http_pool_connections_opened_total", "New TCP connections opened by the shared client.", ["host"]
+)
+HTTP_POOL_DNS_LOOKUPS = _metrics.counter(
+    "http_pool_dns_lookups_total", "Host resolutions by result (hit: served from the DNS cache).", ["result"]
+)
+
+
+def _reuse_ratio() -> Dict[Tuple[str, ...], float]:
+    opened = HTTP_POOL_CONNECTIONS.values()
+    return {
+        labels: max(0.0, 1.0 - opened.get(labels, 0.0) / sent)
+        for labels, sent in HTTP_POOL_REQUESTS.values().items() if sent
+    }
+
+
+_metrics.gauge(
+    "http_pool_connection_reuse_ratio", "Share of requests per host served on an already open connection.", ["host"],
+    collect=_reuse_ratio,
+)
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Resolves each host at most once per `ttl` and counts every connection it opens.
+
+    TLS still verifies and sends SNI for the hostname: httpcore takes it
+    from the request origin, not from the address connected to.
+    """
+
+    def __init__(self, ttl: float = 60.0, inner: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.ttl = ttl
+        self.inner = inner or httpcore.AnyIOBackend()
+        self._addresses: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        cached = self._addresses.get((host, port))
+        if cached is not None and cached[0] > time.monotonic():
+            HTTP_POOL_DNS_LOOKUPS.labels(result="hit").inc()
+            return cached[1]
+        HTTP_POOL_DNS_LOOKUPS.labels(result="miss").inc()
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._addresses[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None, socket_options: Any = None) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self.resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+        HTTP_POOL_CONNECTIONS.labels(host=_host_label(host)).inc()
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self.inner.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        # The host may have moved; resolve again on the next attempt
+        self._addresses.pop((host, port), None)
+        raise error or httpcore.ConnectError(f"No addresses for {host}")
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None,
+                                  socket_options: Any = None) -> httpcore.AsyncNetworkStream:
+        return await self.inner.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self.inner.sleep(seconds)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, inner: httpx.AsyncByteStream, release: Callable[[], None]):
+        self.inner = inner
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self):
+        async for chunk in self.inner:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self.inner.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Caps requests in flight per host; a slot is held until the response body is closed.
+
+    Only ever used from the pool's loop, so plain asyncio semaphores suffice.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, max_per_host: int):
+        self.inner = inner
+        self.max_per_host = max_per_host
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slots = self._slots.get(host)
+        if slots is None:
+            slots = self._slots[host] = asyncio.Semaphore(self.max_per_host)
+        await slots.acquire()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except BaseException:
+            slots.release()
+            raise
+        HTTP_POOL_REQUESTS.labels(host=_host_label(host)).inc()
+        if response.is_closed:
+            # Built from bytes (cassettes, mocks): there is no body left to wait for
+            slots.release()
+        else:
+            response.stream = _ReleasingStream(response.stream, slots.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class CassetteAwareTransport(httpx.AsyncBaseTransport):
+    """Sends requests to the network, or to the process-wide cassette whenever one is active."""
+
+    def __init__(self, network: httpx.AsyncBaseTransport):
+        self.network = network
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cassette = get_http_transport()
+        if cassette is None:
+            return await self.network.handle_async_request(request)
+        await request.aread()
+        # Cassettes are sync, and replay may sleep to mimic recorded latency: keep that off the loop
+        response = await asyncio.to_thread(cassette.handle_request, request)
+        await response.aread()
+        return response
+
+    async def aclose(self) -> None:
+        await self.network.aclose()
+
+
+# httpcore errors as the httpx ones callers catch, most specific first
+_HTTPCORE_ERRORS: Tuple[Tuple[type, type], ...] = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+
+@contextlib.contextmanager
+def _httpx_errors() -> Iterator[None]:
+    try:
+        yield
+    except Exception as e:
+        for source, target in _HTTPCORE_ERRORS:
+            if isinstance(e, source):
+                raise target(str(e)) from e
+        raise
+
+
+class _PoolStream(httpx.AsyncByteStream):
+    def __init__(self, inner: AsyncIterable[bytes]):
+        self.inner = inner
+
+    async def __aiter__(self):
+        with _httpx_errors():
+            async for chunk in self.inner:
+                yield chunk
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """An httpx transport over an httpcore connection pool that resolves through the DNS cache.
+
+    httpx.AsyncHTTPTransport cannot be given a network backend, so this
+    builds the pool itself and does the same request and response
+    conversion, using only the public httpx and httpcore APIs. TLS settings,
+    limits, retries, local_address and socket_options all reach the pool.
+    """
+
+    def __init__(
+        self,
+        limits: httpx.Limits,
+        http2: bool = False,
+        verify: Union[ssl.SSLContext, str, bool] = True,
+        cert: Any = None,
+        trust_env: bool = True,
+        retries: int = 0,
+        local_address: Optional[str] = None,
+        socket_options: Any = None,
+        dns_ttl: float = HTTP_POOL_DNS_TTL,
+    ):
+        self.pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(verify=verify, cert=cert, trust_env=trust_env),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            retries=retries,
+            local_address=local_address,
+            socket_options=socket_options,
+            network_backend=CachingNetworkBackend(dns_ttl),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(scheme=request.url.raw_scheme, host=request.url.raw_host,
+                             port=request.url.port, target=request.url.raw_path),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors():
+            response = await self.pool.handle_async_request(core_request)
+        return httpx.Response(response.status, headers=response.headers, stream=_PoolStream(response.stream),
+                              extensions=response.extensions)
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        try:
+            print("[http_pool] warn: HTTP_POOL_HTTP2=on but the h2 package is missing; using HTTP/1.1")
+        except Exception:
+            pass
+        return False
+    return True
+
+
+class HTTPPool:
+    def __init__(
+        self,
+        timeout: float = HTTP_POOL_TIMEOUT,
+        connect_timeout: float = HTTP_POOL_CONNECT_TIMEOUT,
+        max_connections: int = HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive: int = HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry: float = HTTP_POOL_KEEPALIVE_EXPIRY,
+        max_per_host: int = HTTP_POOL_MAX_PER_HOST,
+        http2: bool = HTTP_POOL_HTTP2,
+        dns_ttl: float = HTTP_POOL_DNS_TTL,
+        verify: Union[ssl.SSLContext, str, bool] = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.http2 = http2 and _http2_available()
+        if transport is None:
+            limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                                  keepalive_expiry=keepalive_expiry)
+            transport = CassetteAwareTransport(PooledTransport(limits, self.http2, verify=verify, dns_ttl=dns_ttl))
+        self.client = httpx.AsyncClient(
+            transport=HostLimitedTransport(transport, max_per_host),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            headers={"User-Agent": USER_AGENT},
+        )
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="http-pool", daemon=True)
+        self._thread.start()
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run `coro` on the pool's loop and wait for it; callable from any other thread."""
+        if threading.current_thread() is self._thread:
+            getattr(coro, "close", lambda: None)()
+            raise RuntimeError("HTTPPool.run() called from the pool's own loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Blocking request through the shared client; the body is read before this returns."""
+        return self.run(self.client.request(method, url, **kwargs))
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        try:
+            self.run(self.client.aclose(), timeout=5)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+            self.loop.close()
+
+
+# Module-level singleton: one connection pool (and one DNS cache) per process
+_GLOBAL_HTTP_POOL: Optional[HTTPPool] = None
+_HTTP_POOL_LOCK = threading.Lock()
+
+def get_http_pool() -> HTTPPool:
+    global _GLOBAL_HTTP_POOL
+    if _GLOBAL_HTTP_POOL is None:
+        with _HTTP_POOL_LOCK:
+            if _GLOBAL_HTTP_POOL is None:
+                _GLOBAL_HTTP_POOL = HTTPPool()
+    return _GLOBAL_HTTP_POOL
+
+
+def close_http_pool() -> None:
+    """Close the shared pool if one was created (app shutdown)."""
+    global _GLOBAL_HTTP_POOL
+    with _HTTP_POOL_LOCK:
+        pool, _GLOBAL_HTTP_POOL = _GLOBAL_HTTP_POOL, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,221 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Optional, TypeVar
+from ..monitoring.metrics import get_global_metrics
+from .upstream_limiter import AdaptiveLimiter, error_retry_after, error_status_code, get_upstream_limiter
+
+T = TypeVar("T")
+
+# Attempts run here so the caller can stop waiting at the deadline
+_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_CALL_THREADS", "64")), thread_name_prefix="llm-call")
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transient failures worth another attempt: 408/409/429/5xx, timeouts, dropped connections."""
+    code = error_status_code(exc)
+    if code is not None:
+        return code in (408, 409, 429) or code >= 500
+    name = type(exc).__name__
+    return isinstance(exc, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connection" in name
+
+
+class ResilientCaller:
+    """Retries, per-attempt deadlines and hedging for calls to one upstream.
+
+    `call(fn)` runs `fn(timeout)` (pass the timeout on to the client so the
+    abandoned attempt also stops) and returns the first successful result.
+
+    Retries: a retryable failure, or an attempt outliving `attempt_timeout`,
+    is retried up to `max_attempts` in total after a full-jitter backoff (or
+    the upstream's Retry-After, if longer).
+
+    Hedging: once `min_samples` latencies are known, an attempt still running
+    after the `hedge_quantile` latency gets a duplicate; whichever answers
+    first wins. Each call earns `hedge_budget` of a hedge, so at most that
+    fraction of calls is duplicated, and none are while the upstream limiter
+    already has callers queued.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limiter: Optional[AdaptiveLimiter] = None,
+        attempt_timeout: float = 30.0,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        hedge_quantile: Optional[float] = 0.95,
+        hedge_budget: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.name = name
+        self.limiter = limiter
+        self.attempt_timeout = attempt_timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_quantile = hedge_quantile
+        self.hedge_budget = hedge_budget
+        self.min_samples = min_samples
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._hedge_tokens = 0.0
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay": self.hedge_delay(),
+        }
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there is too little data."""
+        if self.hedge_quantile is None or len(self._latencies) < self.min_samples:
+            return None
+        with self._lock:
+            ordered = sorted(self._latencies)
+        return ordered[min(int(self.hedge_quantile * len(ordered)), len(ordered) - 1)]
+
+    def _take_hedge_token(self) -> bool:
+        if self.limiter is not None and self.limiter.queued:
+            return False
+        with self._lock:
+            if self._hedge_tokens < 1.0:
+                return False
+            self._hedge_tokens -= 1.0
+            self.hedges += 1
+            return True
+
+    def _attempt(self, fn: Callable[[float], T], abandoned: threading.Event,
+                 started: Optional[Future] = None) -> T:
+        """Run `fn` once the limiter grants a slot; `started` resolves at that moment.
+
+        Queue wait counts towards neither the deadline nor the latency samples.
+        An attempt abandoned while it queued hands its slot straight back.
+        """
+        if self.limiter is None:
+            return self._timed(fn, abandoned, started)
+        with self.limiter.slot():
+            return self._timed(fn, abandoned, started)
+
+    def _timed(self, fn: Callable[[float], T], abandoned: threading.Event, started: Optional[Future]) -> T:
+        if abandoned.is_set():
+            raise CancelledError(f"{self.name} attempt no longer needed")
+        start = time.monotonic()
+        if started is not None:
+            started.set_result(start)
+        result = fn(self.attempt_timeout)
+        latency = time.monotonic() - start
+        # Set before this slot frees, so a hedge queued behind it stands down
+        abandoned.set()
+        with self._lock:
+            self._latencies.append(latency)
+        return result
+
+    def _run_attempt(self, fn: Callable[[float], T]) -> T:
+        """One attempt, possibly hedged; raises TimeoutError past the deadline.
+
+        The deadline and the hedge delay run from when the primary got its
+        limiter slot; waiting for one is bounded by the limiter's queue_timeout.
+        """
+        abandoned = threading.Event()
+        started: Future = Future()
+        primary = _EXECUTOR.submit(self._attempt, fn, abandoned, started)
+        wait({primary, started}, return_when=FIRST_COMPLETED)
+        deadline = time.monotonic() + self.attempt_timeout
+        pending = {primary}
+        try:
+            delay = self.hedge_delay()
+            if delay is not None and delay < self.attempt_timeout:
+                done, _ = wait(pending, timeout=delay)
+                if not done and self._take_hedge_token():
+                    pending.add(_EXECUTOR.submit(self._attempt, fn, abandoned))
+            error: Optional[BaseException] = None
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is not primary:
+                            self.hedge_wins += 1
+                        return future.result()
+                    error = future.exception()
+            if error is not None and not pending:
+                raise error
+            raise TimeoutError(f"{self.name} call exceeded {self.attempt_timeout}s")
+        finally:
+            # Attempts still queued for a slot (or for a thread) never reach the upstream
+            abandoned.set()
+            for future in pending:
+                future.cancel()
+
+    def call(self, fn: Callable[[float], T]) -> T:
+        with self._lock:
+            self.calls += 1
+            self._hedge_tokens = min(self._hedge_tokens + self.hedge_budget, 10.0)
+        with LLM_SECONDS.time(upstream=self.name):
+            return self._call(fn)
+
+    def _call(self, fn: Callable[[float], T]) -> T:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self._run_attempt(fn)
+            except Exception as e:
+                if attempt == self.max_attempts or not is_retryable(e):
+                    raise
+                backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                self.retries += 1
+                time.sleep(max(backoff, error_retry_after(e) or 0.0))
+        raise RuntimeError("unreachable")
+
+
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "30"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+# Fraction of calls that may be duplicated; 0 turns hedging off
+LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.05"))
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+
+# Module-level registry: one caller (and latency history) per upstream per process
+_CALLERS: Dict[str, ResilientCaller] = {}
+_CALLERS_LOCK = threading.Lock()
+
+def _caller_values(attribute: str):
+    return lambda: {(name,): float(getattr(caller, attribute)) for name, caller in list(_CALLERS.items())}
+
+_metrics = get_global_metrics()
+LLM_SECONDS = _metrics.histogram(
+    "llm_call_seconds", "LLM call latency including retries and hedges.", ["upstream", "outcome"]
+)
+_metrics.counter("llm_retries_total", "LLM attempts retried.", ["upstream"], collect=_caller_values("retries"))
+_metrics.counter("llm_hedges_total", "Hedged LLM attempts sent.", ["upstream"], collect=_caller_values("hedges"))
+_metrics.counter("llm_hedge_wins_total", "Hedged attempts that answered first.", ["upstream"], collect=_caller_values("hedge_wins"))
+
+def get_llm_caller(name: str = "openai") -> ResilientCaller:
+    caller = _CALLERS.get(name)
+    if caller is None:
+        with _CALLERS_LOCK:
+            caller = _CALLERS.get(name)
+            if caller is None:
+                caller = ResilientCaller(
+                    name,
+                    limiter=get_upstream_limiter(name),
+                    attempt_timeout=LLM_ATTEMPT_TIMEOUT,
+                    max_attempts=LLM_MAX_ATTEMPTS,
+                    hedge_quantile=LLM_HEDGE_QUANTILE if LLM_HEDGE_BUDGET > 0 else None,
+                    hedge_budget=LLM_HEDGE_BUDGET,
+                )
+                _CALLERS[name] = caller
+    return caller
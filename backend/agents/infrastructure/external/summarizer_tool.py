@@ -1,7 +1,7 @@
 from .base_tool import BaseTool, ToolInput, ToolOutput
+from .resilient_call import get_llm_caller
 from pydantic import Field
 import os
-from openai import OpenAI
 from typing import Optional, List
 
 
@@ -22,7 +22,10 @@ class SummarizerTool(BaseTool):
             return ToolOutput(content="OpenAI API key not configured. Set OPENAI_API_KEY.")
 
         try:
-            client = OpenAI(api_key=api_key)
+            # Imported on first use: the SDK is a large share of the app's import time
+            from openai import OpenAI
+            from .http_cassette import openai_http_client
+            client = OpenAI(api_key=api_key, max_retries=0, http_client=openai_http_client())
             # Normalize
             normalized = (text or "").strip()
             if not normalized:
@@ -52,14 +55,15 @@ class SummarizerTool(BaseTool):
 
             user_content = f"TEXT\n```\n{normalized}\n```"
 
-            resp = client.chat.completions.create(
+            resp = get_llm_caller().call(lambda timeout: client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": sys_prompt},
                     {"role": "user", "content": user_content},
                 ],
                 temperature=0.2,
-            )
+                timeout=timeout,
+            ))
             content = (resp.choices[0].message.content or "").strip()
 
             # Enforce ~200-word cap conservatively
@@ -72,4 +76,4 @@ class SummarizerTool(BaseTool):
             content = cap_words(content, max_length)
             return ToolOutput(content=content)
         except Exception as e:
-            return ToolOutput(content=f"Summarizer error: {str(e)}")
+            return ToolOutput(content=f"Summarizer error: {str(e)}", error=str(e))
@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+from ..monitoring.metrics import get_global_metrics
+
+
+class UpstreamBusyError(TimeoutError):
+    """Raised when a caller waited longer than allowed for an upstream slot."""
+    pass
+
+
+def error_status_code(exc: BaseException) -> Optional[int]:
+    # openai.APIStatusError carries status_code; httpx.HTTPStatusError carries response
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def error_retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_overload(exc: BaseException) -> bool:
+    """True for failures that mean "too much load": 429/503 and timeouts."""
+    if error_status_code(exc) in (429, 503):
+        return True
+    return isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__
+
+
+class AdaptiveLimiter:
+    """Adaptive concurrency limit for one upstream, shared by every thread.
+
+    AIMD on the number of calls allowed in flight: each success that finds
+    the limit in use adds about one slot per limit's worth of calls; a 429,
+    a 503, a timeout, or (when `tolerance` is set) a latency above
+    `tolerance` times the observed baseline cuts the limit by `backoff`, at
+    most once per baseline latency so one burst of failures counts as one
+    signal. A Retry-After pauses new calls until it passes.
+
+    Callers beyond the limit wait in arrival order: a slot goes to the
+    longest-waiting caller, so nobody is starved by newcomers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        tolerance: Optional[float] = 2.0,
+        queue_timeout: Optional[float] = 60.0,
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.queue_timeout = queue_timeout
+        self.baseline_latency: Optional[float] = None
+        self.in_flight = 0
+        self.successes = 0
+        self.overloads = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+        self._waiting: Deque[object] = deque()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "baseline_latency": self.baseline_latency,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "rejected": self.rejected,
+        }
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        """Wait for a slot; returns how many calls were in flight, this one included."""
+        timeout = self.queue_timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if (self._waiting[0] is ticket and self.in_flight < int(self.limit)
+                            and now >= self._paused_until):
+                        self._waiting.popleft()
+                        self.in_flight += 1
+                        # The next in line may fit as well
+                        self._cond.notify_all()
+                        return self.in_flight
+                    wait = None if deadline is None else deadline - now
+                    if wait is not None and wait <= 0:
+                        self.rejected += 1
+                        raise UpstreamBusyError(f"Timed out waiting for {self.name} capacity")
+                    if self._paused_until > now:
+                        wait = min(wait, self._paused_until - now) if wait is not None else self._paused_until - now
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    self._cond.notify_all()
+                raise
+
+    def release(self, latency: float, in_flight: int, overload: bool = False,
+                retry_after: Optional[float] = None, errored: bool = False) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+            if errored and not overload:
+                # A bad request says nothing about upstream load
+                return
+            now = time.monotonic()
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            baseline = self.baseline_latency
+            if (not overload and self.tolerance is not None and baseline is not None
+                    and latency > self.tolerance * baseline):
+                overload = True
+            if overload:
+                self.overloads += 1
+                if now - self._last_decrease >= (baseline or 0.0):
+                    self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                    self._last_decrease = now
+            else:
+                self.successes += 1
+                # Only grow when the limit was actually the constraint
+                if in_flight >= int(self.limit) - 1:
+                    self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+                # Baseline follows drops immediately and rises slowly
+                if baseline is None or latency < baseline:
+                    self.baseline_latency = latency
+                else:
+                    self.baseline_latency = baseline + 0.01 * (latency - baseline)
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """Run the enclosed upstream call under the limit and learn from its outcome.
+
+        Overload is read from the exception the call raises, so the
+        raise_for_status() (or SDK call) must happen inside the block.
+        """
+        in_flight = self.acquire(timeout)
+        start = time.monotonic()
+        overload = errored = False
+        retry_after = None
+        try:
+            yield
+        except BaseException as e:
+            errored = True
+            overload = is_overload(e)
+            retry_after = error_retry_after(e) if overload else None
+            raise
+        finally:
+            latency = time.monotonic() - start
+            self.release(latency, in_flight, overload, retry_after, errored)
+            outcome = "overload" if overload else "error" if errored else "ok"
+            UPSTREAM_SECONDS.labels(upstream=self.name, outcome=outcome).observe(latency)
+
+
+# Starting points per upstream; the limiter adapts from there. Completion latency
+# tracks output length more than load, so OpenAI adapts on 429s and timeouts only.
+UPSTREAM_LIMITS = {
+    "openai": {"initial_limit": int(os.getenv("OPENAI_CONCURRENCY", "8")), "max_limit": 64, "tolerance": None},
+    "duckduckgo": {"initial_limit": int(os.getenv("DUCKDUCKGO_CONCURRENCY", "4")), "max_limit": 16, "tolerance": 3.0},
+}
+
+# Module-level registry so every tool in the process shares one limiter per upstream
+_LIMITERS: Dict[str, AdaptiveLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+def _limiter_values(attribute: str):
+    return lambda: {(name,): float(getattr(limiter, attribute)) for name, limiter in list(_LIMITERS.items())}
+
+_metrics = get_global_metrics()
+UPSTREAM_SECONDS = _metrics.histogram(
+    "upstream_request_seconds", "Upstream request latency by outcome (ok, overload, error).", ["upstream", "outcome"]
+)
+_metrics.gauge("upstream_concurrency_limit", "Current adaptive concurrency limit.", ["upstream"], collect=_limiter_values("limit"))
+_metrics.gauge("upstream_in_flight", "Upstream requests in flight.", ["upstream"], collect=_limiter_values("in_flight"))
+_metrics.gauge("upstream_queued", "Callers waiting for an upstream slot.", ["upstream"], collect=_limiter_values("queued"))
+
+def get_upstream_limiter(name: str) -> AdaptiveLimiter:
+    limiter = _LIMITERS.get(name)
+    if limiter is None:
+        with _LIMITERS_LOCK:
+            limiter = _LIMITERS.get(name)
+            if limiter is None:
+                limiter = AdaptiveLimiter(name, **UPSTREAM_LIMITS.get(name, {}))
+                _LIMITERS[name] = limiter
+    return limiter
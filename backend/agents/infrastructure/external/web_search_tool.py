@@ -1,10 +1,13 @@
 from .base_tool import BaseTool, ToolInput, ToolOutput
+from .upstream_limiter import get_upstream_limiter
 from pydantic import Field
 from typing import Optional
 import os
-import httpx
 from urllib.parse import quote
 
+# Overridable so load tests can point searches at a local stub
+DUCKDUCKGO_URL = os.getenv("DUCKDUCKGO_URL", "https://api.duckduckgo.com/")
+
 
 class WebSearchInput(ToolInput):
     query: str = Field(..., description="The search query to execute.")
@@ -18,7 +21,7 @@ class WebSearchTool(BaseTool):
     def _run(self, query: str) -> ToolOutput:
         # Use DuckDuckGo Instant Answer API (no key needed)
         # https://api.duckduckgo.com/?q=your+query&format=json&no_redirect=1&no_html=1
-        url = "https://api.duckduckgo.com/"
+        url = DUCKDUCKGO_URL
         params = {
             "q": query,
             "format": "json",
@@ -26,10 +29,12 @@ class WebSearchTool(BaseTool):
             "no_html": "1",
         }
         try:
-            with httpx.Client(timeout=10, headers={"User-Agent": "AgentSystem/1.0"}) as client:
-                resp = client.get(url, params=params)
+            # Shared keep-alive client: repeat searches skip DNS, TCP and TLS setup
+            from .http_pool import get_http_pool
+            with get_upstream_limiter("duckduckgo").slot():
+                resp = get_http_pool().request("GET", url, params=params)
                 resp.raise_for_status()
-                data = resp.json()
+            data = resp.json()
 
             results: list[str] = ["[Mock API] Using DuckDuckGo Instant Answer free endpoint."]
             # Prefer direct answers
@@ -68,4 +73,4 @@ class WebSearchTool(BaseTool):
 
             return ToolOutput(content="\n".join(results))
         except Exception as e:
-            return ToolOutput(content=f"Web search error: {str(e)}")
+            return ToolOutput(content=f"Web search error: {str(e)}", error=str(e))
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from ..monitoring.metrics import get_global_metrics
+
+
+class ExecutionLog:
+    """Bounded ring of one execution's events, numbered 1, 2, 3, ...
+
+    Once more than `maxlen` events have been appended, the oldest drop off;
+    a reader resuming from before them gets the events still held.
+    """
+
+    def __init__(self, execution_id: str, agent_id: str, maxlen: int = 500):
+        self.execution_id = execution_id
+        self.agent_id = agent_id
+        self.events: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=maxlen)
+        self.last_seq = 0
+        self.done = False
+        self.updated_at = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def append(self, event: Dict[str, Any]) -> int:
+        self.last_seq += 1
+        self.events.append((self.last_seq, event))
+        self._touch()
+        return self.last_seq
+
+    def finish(self) -> None:
+        self.done = True
+        self._touch()
+
+    def _touch(self) -> None:
+        self.updated_at = time.monotonic()
+        # Wake current readers; later readers wait on a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def since(self, seq: int) -> List[Tuple[int, Dict[str, Any]]]:
+        if seq >= self.last_seq:
+            return []
+        # Sequence numbers are contiguous, so the start position is arithmetic
+        first = self.events[0][0] if self.events else self.last_seq + 1
+        start = max(seq + 1 - first, 0)
+        return [self.events[i] for i in range(start, len(self.events))]
+
+    async def wait(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Wait until there is something after `seq` or the execution ends.
+        Returns False on timeout."""
+        if self.last_seq > seq or self.done:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class ExecutionEventBuffer:
+    """In-process registry of recent executions, so a dropped SSE client can
+    resume one instead of starting it again.
+
+    A finished execution is kept for `ttl_seconds` after its last event, and
+    an unfinished one that has been silent that long is presumed abandoned.
+    Expired logs are swept whenever a new execution starts, and at most
+    `max_executions` are held (oldest evicted first).
+    """
+
+    def __init__(self, maxlen: int = 500, ttl_seconds: float = 600.0, max_executions: int = 10_000):
+        self.maxlen = maxlen
+        self.ttl_seconds = ttl_seconds
+        self.max_executions = max_executions
+        self._logs: "OrderedDict[str, ExecutionLog]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._logs)
+
+    def start(self, execution_id: str, agent_id: str) -> ExecutionLog:
+        self.cleanup()
+        while len(self._logs) >= self.max_executions:
+            _, evicted = self._logs.popitem(last=False)
+            if evicted.task is not None:
+                evicted.task.cancel()
+        log = ExecutionLog(execution_id, agent_id, self.maxlen)
+        self._logs[execution_id] = log
+        return log
+
+    def get(self, execution_id: str) -> Optional[ExecutionLog]:
+        return self._logs.get(execution_id)
+
+    def cleanup(self) -> int:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, log in self._logs.items() if log.updated_at < cutoff]
+        for key in expired:
+            log = self._logs.pop(key)
+            if log.task is not None and not log.task.done():
+                log.task.cancel()
+        return len(expired)
+
+
+# Module-level singleton so every request in the process sees the same executions
+_GLOBAL_BUFFER: Optional[ExecutionEventBuffer] = None
+
+def get_global_execution_buffer() -> ExecutionEventBuffer:
+    global _GLOBAL_BUFFER
+    if _GLOBAL_BUFFER is None:
+        _GLOBAL_BUFFER = ExecutionEventBuffer()
+    return _GLOBAL_BUFFER
+
+
+get_global_metrics().gauge(
+    "execution_buffer_executions", "Executions held in the resumable event buffer.",
+    collect=lambda: {(): float(len(_GLOBAL_BUFFER))} if _GLOBAL_BUFFER is not None else {},
+)
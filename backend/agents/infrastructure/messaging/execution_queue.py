@@ -0,0 +1,166 @@
+import json
+import time
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RedisExecutionQueue:
+    """Durable queue of execution jobs on a Redis Stream with one consumer group.
+
+    A job stays pending from delivery until `ack`, so a worker that dies
+    mid-run loses nothing: its job is picked up again once it has been idle
+    for `claim_idle_ms`. Workers running a long job call `touch` to keep it
+    from looking abandoned. Acknowledged jobs are deleted, so the stream only
+    holds outstanding work and is never trimmed by length.
+
+    A job that cannot be read, or that has been delivered `max_deliveries`
+    times without being acknowledged, moves to the `<stream>:dead` stream so
+    it stops coming back to the workers.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        stream: str = "execution-jobs",
+        group: str = "executors",
+        claim_idle_ms: int = 60_000,
+        max_deliveries: int = 5,
+        dead_letter_maxlen: int = 10_000,
+    ):
+        # Expects decode_responses=True: fields are read back as str
+        self.redis = redis_client
+        self.stream = stream
+        self.group = group
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.dead_letter_stream = f"{stream}:dead"
+        self.dead_letter_maxlen = dead_letter_maxlen
+
+    async def ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def enqueue(self, job: Dict[str, Any]) -> str:
+        return await self.redis.xadd(self.stream, {"job": json.dumps(job, ensure_ascii=False)})
+
+    async def next_job(self, consumer: str, block_ms: Optional[int] = 5000) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """The next job for `consumer`: its own unfinished job first, then an
+        abandoned one, then a new one (waiting up to block_ms). Entries that
+        do not hold a job are dead-lettered on the way."""
+        while True:
+            entry = await self._next_entry(consumer, block_ms)
+            if entry is None:
+                return None
+            entry_id, fields = entry
+            try:
+                job = json.loads(fields["job"])
+                if not isinstance(job, dict) or "execution_id" not in job:
+                    raise ValueError("no execution_id")
+            except (KeyError, ValueError) as e:
+                await self.dead_letter(entry_id, fields.get("job", ""), f"unreadable job: {e}")
+                continue
+            return entry_id, job
+
+    async def _next_entry(self, consumer: str, block_ms: Optional[int]) -> Optional[Tuple[str, Dict[str, str]]]:
+        response = await self.redis.xreadgroup(self.group, consumer, {self.stream: "0"}, count=1)
+        entries = [entry for _, stream_entries in response or [] for entry in stream_entries if entry[1]]
+        if not entries:
+            _, entries, *_ = await self.redis.xautoclaim(
+                self.stream, self.group, consumer, min_idle_time=self.claim_idle_ms, start_id="0-0", count=1
+            )
+            entries = [entry for entry in entries if entry[1]]
+        if not entries:
+            response = await self.redis.xreadgroup(self.group, consumer, {self.stream: ">"}, count=1, block=block_ms)
+            entries = [entry for _, stream_entries in response or [] for entry in stream_entries]
+        return entries[0] if entries else None
+
+    async def deliveries(self, entry_id: str) -> int:
+        """How many times the entry has been handed to a worker, this time included."""
+        pending = await self.redis.xpending_range(self.stream, self.group, min=entry_id, max=entry_id, count=1)
+        return pending[0]["times_delivered"] if pending else 0
+
+    async def touch(self, consumer: str, entry_id: str) -> None:
+        # Re-claiming our own entry resets its idle time
+        await self.redis.xclaim(self.stream, self.group, consumer, 0, [entry_id], justid=True)
+
+    async def depth(self) -> Dict[str, int]:
+        """Jobs waiting for a worker and jobs delivered but not yet acknowledged."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.xlen(self.stream)
+            pipe.xpending(self.stream, self.group)
+            try:
+                length, pending = await pipe.execute()
+            except ResponseError:
+                # No group yet: nothing has been enqueued or consumed
+                return {"waiting": 0, "pending": 0}
+        pending_count = pending.get("pending", 0) if isinstance(pending, dict) else 0
+        # Acknowledged entries are deleted, so everything else is still waiting
+        return {"waiting": max(length - pending_count, 0), "pending": pending_count}
+
+    async def ack(self, entry_id: str) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, entry_id)
+            pipe.xdel(self.stream, entry_id)
+            await pipe.execute()
+
+    async def dead_letter(self, entry_id: str, payload: str, reason: str) -> None:
+        """Move an entry to the dead-letter stream and acknowledge it."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(self.dead_letter_stream, {"entry_id": entry_id, "job": payload, "reason": reason},
+                      maxlen=self.dead_letter_maxlen, approximate=True)
+            pipe.xack(self.stream, self.group, entry_id)
+            pipe.xdel(self.stream, entry_id)
+            await pipe.execute()
+
+
+class RedisExecutionEvents:
+    """Per-execution status record and event channel.
+
+    Events go to a short Redis Stream per execution rather than pub/sub, so a
+    client that subscribes after the worker has started, or reconnects, still
+    reads the execution from its first event. Both keys expire `ttl_seconds`
+    after the last write.
+    """
+
+    def __init__(self, redis_client: redis.Redis, ttl_seconds: int = 3600, maxlen: int = 1000):
+        # Expects decode_responses=True
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.maxlen = maxlen
+
+    def _status_key(self, execution_id: str) -> str:
+        return f"execution:{execution_id}"
+
+    def _events_key(self, execution_id: str) -> str:
+        return f"execution:{execution_id}:events"
+
+    async def set_status(self, execution_id: str, **fields: Any) -> None:
+        key = self._status_key(execution_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={k: "" if v is None else str(v) for k, v in fields.items()})
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def get_status(self, execution_id: str) -> Optional[Dict[str, str]]:
+        return await self.redis.hgetall(self._status_key(execution_id)) or None
+
+    async def publish(self, execution_id: str, event: Dict[str, Any]) -> str:
+        key = self._events_key(execution_id)
+        event = {"timestamp": time.time(), **event}
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(key, {"event": json.dumps(event, ensure_ascii=False)}, maxlen=self.maxlen, approximate=True)
+            pipe.expire(key, self.ttl_seconds)
+            entry_id, _ = await pipe.execute()
+        return entry_id
+
+    async def read(self, execution_id: str, after_id: str = "0", count: int = 100,
+                   block_ms: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        response = await self.redis.xread({self._events_key(execution_id): after_id}, count=count, block=block_ms)
+        return [
+            (entry_id, json.loads(fields["event"]))
+            for _, entries in response or [] for entry_id, fields in entries
+        ]
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from ...core.events.agent_event_observer import AgentEvent, AgentEventType
+
+EventBatchHandler = Callable[[List[AgentEvent]], Awaitable[None]]
+
+
+def encode_event(event: AgentEvent) -> dict:
+    return {
+        "agent_id": event.agent_id,
+        "type": event.event_type.value,
+        "ts": repr(event.timestamp),
+        "data": json.dumps(event.data, ensure_ascii=False),
+    }
+
+
+def decode_event(fields: dict) -> AgentEvent:
+    return AgentEvent(
+        agent_id=fields["agent_id"],
+        event_type=AgentEventType(fields["type"]),
+        timestamp=float(fields["ts"]),
+        data=json.loads(fields["data"]),
+    )
+
+
+def _entry_key(entry_id: str) -> Tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class RedisEventStream:
+    """AgentEvent transport over a Redis Stream shared by every process.
+
+    Producers append with `publish_batch` (one pipelined XADD round trip per
+    batch, so it plugs straight into `AgentEventObserver.subscribe_batch`).
+    Consumers join a consumer group: each entry goes to one consumer in the
+    group and stays pending until acknowledged, so a consumer that dies
+    mid-batch gets its entries back on restart, or another consumer claims
+    them once they have been idle for `claim_idle_ms`.
+
+    Pending entries whose fields MAXLEN already trimmed are acknowledged as
+    they are found. Entries that cannot be decoded, and entries that have
+    been handed out more than `max_deliveries` times without a handler
+    succeeding, go to the `<stream>:dead` stream and are acknowledged, so one
+    poison entry cannot stall its consumer.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        stream: str = "agent-events",
+        maxlen: int = 100_000,
+        claim_idle_ms: int = 60_000,
+        max_deliveries: int = 5,
+        dead_letter_maxlen: int = 10_000,
+    ):
+        # Expects decode_responses=True: fields are read back as str
+        self.redis = redis_client
+        self.stream = stream
+        self.maxlen = maxlen
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.dead_letter_stream = f"{stream}:dead"
+        self.dead_letter_maxlen = dead_letter_maxlen
+
+    async def publish(self, event: AgentEvent) -> str:
+        return await self.redis.xadd(self.stream, encode_event(event), maxlen=self.maxlen, approximate=True)
+
+    async def publish_batch(self, events: List[AgentEvent]) -> List[str]:
+        # Approximate trimming (MAXLEN ~) lets Redis drop whole nodes cheaply
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.xadd(self.stream, encode_event(event), maxlen=self.maxlen, approximate=True)
+            return await pipe.execute()
+
+    async def ensure_group(self, group: str, start_id: str = "$") -> None:
+        try:
+            await self.redis.xgroup_create(self.stream, group, id=start_id, mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(
+        self, group: str, consumer: str, count: int = 100, block_ms: Optional[int] = 1000, pending: bool = False
+    ) -> List[Tuple[str, AgentEvent]]:
+        """Read new entries, or with pending=True this consumer's unacknowledged ones."""
+        response = await self.redis.xreadgroup(
+            group, consumer, {self.stream: "0" if pending else ">"}, count=count, block=None if pending else block_ms
+        )
+        return await self._decode(group, [entry for _, entries in response or [] for entry in entries])
+
+    async def claim_stale(self, group: str, consumer: str, count: int = 100) -> List[Tuple[str, AgentEvent]]:
+        """Take over entries another consumer left pending for too long."""
+        _, entries, *_ = await self.redis.xautoclaim(
+            self.stream, group, consumer, min_idle_time=self.claim_idle_ms, start_id="0-0", count=count
+        )
+        return await self._decode(group, entries)
+
+    async def _decode(self, group: str, entries: List[Tuple[str, Optional[dict]]]) -> List[Tuple[str, AgentEvent]]:
+        batch, trimmed, unreadable = [], [], {}
+        for entry_id, fields in entries:
+            if not fields:
+                # Still pending, but MAXLEN dropped its fields: nothing left to handle
+                trimmed.append(entry_id)
+                continue
+            try:
+                batch.append((entry_id, decode_event(fields)))
+            except (KeyError, ValueError) as e:
+                unreadable[entry_id] = (fields, f"unreadable event: {e}")
+        await self.ack(group, trimmed)
+        await self.dead_letter(group, unreadable)
+        return batch
+
+    async def deliveries(self, group: str, consumer: str, entry_ids: List[str]) -> Dict[str, int]:
+        """How many times each of `consumer`'s pending entries has been handed out, this time included."""
+        if not entry_ids:
+            return {}
+        pending = await self.redis.xpending_range(
+            self.stream, group, min=min(entry_ids, key=_entry_key), max=max(entry_ids, key=_entry_key),
+            count=len(entry_ids), consumername=consumer,
+        )
+        return {p["message_id"]: p["times_delivered"] for p in pending}
+
+    async def dead_letter(self, group: str, entries: Dict[str, Tuple[dict, str]]) -> None:
+        """Copy entries to the dead-letter stream with a reason, then acknowledge them."""
+        if not entries:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for entry_id, (fields, reason) in entries.items():
+                pipe.xadd(self.dead_letter_stream, {**fields, "entry_id": entry_id, "group": group, "reason": reason},
+                          maxlen=self.dead_letter_maxlen, approximate=True)
+            pipe.xack(self.stream, group, *entries)
+            await pipe.execute()
+
+    async def ack(self, group: str, entry_ids: List[str]) -> int:
+        if not entry_ids:
+            return 0
+        return await self.redis.xack(self.stream, group, *entry_ids)
+
+    async def consume_once(self, group: str, consumer: str, handler: EventBatchHandler, count: int = 100,
+                           block_ms: Optional[int] = 1000) -> int:
+        """Handle one batch and acknowledge it only after the handler succeeds.
+
+        Own pending entries come first (left over from a crash), then entries
+        stalled on other consumers, then new ones. Redelivered entries past
+        `max_deliveries` are dead-lettered instead of handled again.
+        """
+        batch = await self.read(group, consumer, count=count, pending=True)
+        if not batch:
+            batch = await self.claim_stale(group, consumer, count=count)
+        if batch:
+            batch = await self._drop_exhausted(group, consumer, batch)
+        else:
+            batch = await self.read(group, consumer, count=count, block_ms=block_ms)
+        if not batch:
+            return 0
+        await handler([event for _, event in batch])
+        await self.ack(group, [entry_id for entry_id, _ in batch])
+        return len(batch)
+
+    async def _drop_exhausted(self, group: str, consumer: str,
+                              batch: List[Tuple[str, AgentEvent]]) -> List[Tuple[str, AgentEvent]]:
+        deliveries = await self.deliveries(group, consumer, [entry_id for entry_id, _ in batch])
+        exhausted = {
+            entry_id: (encode_event(event), f"gave up after {deliveries[entry_id] - 1} deliveries")
+            for entry_id, event in batch if deliveries.get(entry_id, 0) > self.max_deliveries
+        }
+        await self.dead_letter(group, exhausted)
+        return [(entry_id, event) for entry_id, event in batch if entry_id not in exhausted]
+
+    async def consume(self, group: str, consumer: str, handler: EventBatchHandler, count: int = 100,
+                      block_ms: int = 1000) -> None:
+        await self.ensure_group(group)
+        while True:
+            try:
+                await self.consume_once(group, consumer, handler, count=count, block_ms=block_ms)
+            except Exception as e:
+                # The batch stays pending and is retried on the next pass,
+                # up to max_deliveries times
+                try:
+                    print(f"[events] warn: stream consumer {consumer} error: {e}")
+                except Exception:
+                    pass
+                await asyncio.sleep(1.0)
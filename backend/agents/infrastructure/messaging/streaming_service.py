@@ -23,21 +23,23 @@ class AgentStreamingService:
                 ]
                 
                 for i, step in enumerate(steps):
-                    yield f"data: {json.dumps({
+                    event = {
                         'type': 'message',
                         'content': step,
                         'timestamp': time.time(),
                         'step': i+1
-                    })}\n\n"
+                    }
+                    yield f"data: {json.dumps(event)}\n\n"
                     await asyncio.sleep(0.5)  # Simulate processing time
                 
                 # Final result
                 result = f"Answer to '{query}': This is a simulated response from the agent. In a real implementation, this would be generated by LangGraph."
-                yield f"data: {json.dumps({
+                event = {
                     'type': 'result',
                     'content': result,
                     'timestamp': time.time()
-                })}\n\n"
+                }
+                yield f"data: {json.dumps(event)}\n\n"
                 
                 yield "data: {\"type\": \"complete\"}\n\n"
             except Exception as e:
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import redis.asyncio as redis
+from typing import Any, Dict, Optional, Set
+from ...core.services.tool_registry import ToolRegistry
+
+
+class RedisToolRegistrySync:
+    """Keeps the tool registries of every worker in step through a Redis Stream.
+
+    Each local registration is appended to the stream as one change entry.
+    Stream ids increase monotonically, so the last applied id is this
+    worker's registry version. Every worker tails the stream with a blocking
+    XREAD (no consumer group; all of them need every change) and applies
+    entries one by one through `ToolRegistry.apply_change`, which rebuilds
+    only the named tool. Tailing starts from the oldest retained entry:
+    changes already loaded from registered_tools.json, or made by this
+    worker, are recognised and skipped.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        registry: ToolRegistry,
+        stream: str = "tool-registry-changes",
+        maxlen: int = 10_000,
+    ):
+        # Expects decode_responses=True: fields are read back as str
+        self.redis = redis_client
+        self.registry = registry
+        self.stream = stream
+        self.maxlen = maxlen
+        self.last_id = "0"
+        self.applied = 0
+        self._publishing: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, entry: Dict[str, Any]) -> str:
+        return await self.redis.xadd(
+            self.stream, {"entry": json.dumps(entry, ensure_ascii=False)}, maxlen=self.maxlen, approximate=True
+        )
+
+    def _on_local_change(self, entry: Dict[str, Any]) -> None:
+        # Registry listeners are synchronous; registrations come from request handlers
+        # running on the loop, so hand the XADD to a task and keep a reference to it
+        task = asyncio.get_running_loop().create_task(self.publish(entry))
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    async def poll_once(self, count: int = 100, block_ms: Optional[int] = 1000) -> int:
+        """Apply the next batch of changes; returns how many entries were read."""
+        response = await self.redis.xread({self.stream: self.last_id}, count=count, block=block_ms)
+        read = 0
+        for _, entries in response or []:
+            for entry_id, fields in entries:
+                try:
+                    if self.registry.apply_change(json.loads(fields["entry"])):
+                        self.applied += 1
+                except Exception as e:
+                    # A change this worker cannot build must not stall the ones behind it
+                    try:
+                        print(f"[tools] warn: failed to apply registry change {entry_id}: {e}")
+                    except Exception:
+                        pass
+                self.last_id = entry_id
+                read += 1
+        return read
+
+    async def run(self, block_ms: int = 5000) -> None:
+        while True:
+            try:
+                await self.poll_once(block_ms=block_ms)
+            except Exception as e:
+                try:
+                    print(f"[tools] warn: registry sync error: {e}")
+                except Exception:
+                    pass
+                await asyncio.sleep(1.0)
+
+    def start(self) -> None:
+        self.registry.subscribe(self._on_local_change)
+        self._task = asyncio.get_running_loop().create_task(self.run(), name="tool-registry-sync")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.gather(*self._publishing, return_exceptions=True)
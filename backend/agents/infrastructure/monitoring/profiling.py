@@ -0,0 +1,135 @@
+"""Opt-in cProfile capture of single executions, kept in a bounded store.
+
+A request asks for a profile with the X-Profile header, or is picked by
+PROFILE_SAMPLE_RATE. Its orchestrator steps then run under cProfile and the
+resulting pstats data is kept in memory for download from /api/debug/profiles.
+Unprofiled executions never touch this module beyond `should_profile`.
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Off unless set: "on" honours X-Profile and mounts the debug endpoints
+PROFILING = os.getenv("PROFILING", "").lower() == "on"
+# When set, X-Profile must carry this value
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+# Fraction of executions profiled without being asked
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "20"))
+
+
+def should_profile(header: Optional[str]) -> bool:
+    if not PROFILING:
+        return False
+    if header:
+        return not PROFILE_TOKEN or header == PROFILE_TOKEN
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+@dataclass
+class ExecutionProfile:
+    id: str
+    agent_id: str
+    query: str
+    started_at: float = field(default_factory=time.time)
+    duration: float = 0.0
+    stats: bytes = b""  # marshalled pstats dict, the format pstats.Stats.dump_stats writes
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "agent_id": self.agent_id,
+            "query": self.query,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "size": len(self.stats),
+        }
+
+    def text(self, limit: int = 50, sort: str = "cumulative") -> str:
+        """The top `limit` functions by `sort`, as `python -m pstats` prints them."""
+        out = io.StringIO()
+        source = SimpleNamespace(stats=marshal.loads(self.stats), create_stats=lambda: None)
+        pstats.Stats(source, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+class ExecutionProfiler:
+    """Profiles the calls made through `run` for one execution.
+
+    The orchestrator is advanced one step at a time on pool threads, so the
+    profiler is switched on around each step rather than for the whole
+    request. Work a step hands to other threads (hedged LLM attempts) shows
+    up as time spent waiting for it.
+    """
+
+    # One profiled execution at a time: cProfile cannot nest, and debugging
+    # a slow run does not need more
+    _active = threading.Lock()
+
+    def __init__(self, profile: ExecutionProfile):
+        self.profile = profile
+        self._profiler = cProfile.Profile()
+        self._started = time.perf_counter()
+
+    @classmethod
+    def start(cls, execution_id: str, agent_id: str, query: str) -> Optional["ExecutionProfiler"]:
+        """A profiler for this execution, or None while another one is running."""
+        if not cls._active.acquire(blocking=False):
+            return None
+        return cls(ExecutionProfile(execution_id, agent_id, query))
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return self._profiler.runcall(fn, *args)
+
+    def finish(self) -> ExecutionProfile:
+        try:
+            self._profiler.create_stats()
+            self.profile.stats = marshal.dumps(self._profiler.stats)
+            self.profile.duration = time.perf_counter() - self._started
+        finally:
+            ExecutionProfiler._active.release()
+        return self.profile
+
+
+class ProfileStore:
+    """The most recent `maxlen` profiles; older ones are dropped."""
+
+    def __init__(self, maxlen: int = 20):
+        self.maxlen = maxlen
+        self._profiles: "OrderedDict[str, ExecutionProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: ExecutionProfile) -> None:
+        with self._lock:
+            self._profiles[profile.id] = profile
+            self._profiles.move_to_end(profile.id)
+            while len(self._profiles) > self.maxlen:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[ExecutionProfile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[ExecutionProfile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+# Module-level singleton so the debug endpoints see every profile in the process
+_GLOBAL_PROFILES: Optional[ProfileStore] = None
+
+def get_global_profile_store() -> ProfileStore:
+    global _GLOBAL_PROFILES
+    if _GLOBAL_PROFILES is None:
+        _GLOBAL_PROFILES = ProfileStore(PROFILE_STORE_SIZE)
+    return _GLOBAL_PROFILES
@@ -1,11 +1,21 @@
-from typing import Optional, List
+import time
+from datetime import datetime
+from typing import AsyncIterator, Optional, List
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, update as sql_update
 from sqlalchemy.future import select
+from sqlalchemy.sql import func
 from ...core.entities.agent import Agent
-from ...core.repositories.agent_repository import AgentRepository
+from ...core.repositories.agent_repository import AgentRepository, StaleAgentError
 from .models import AgentModel
 
 
+def _to_datetime(timestamp: Optional[str], default: float) -> datetime:
+    # Entities carry epoch seconds as strings; the columns are naive local time
+    return datetime.fromtimestamp(float(timestamp) if timestamp else default)
+
+
 class PostgreSQLAgentRepository(AgentRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -18,10 +28,55 @@ class PostgreSQLAgentRepository(AgentRepository):
             tools=entity.tools
         )
         self.session.add(model)
-        await self.session.commit()
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise ValueError(f"Agent with id {entity.id} already exists")
         await self.session.refresh(model)
         return self._model_to_entity(model)
     
+    async def bulk_create(self, batches: AsyncIterator[List[Agent]]) -> int:
+        """Insert every batch in one transaction; all or nothing.
+
+        Each batch is a single executemany, which SQLAlchemy sends as
+        multi-row INSERT ... VALUES pages rather than one statement per row.
+        Timestamps and version are written as given (now if missing), and
+        each entity is updated to the values get_by_id will read back, so a
+        caller that caches the batch agrees with the stored rows.
+        """
+        count = 0
+        try:
+            async for batch in batches:
+                if not batch:
+                    continue
+                now = time.time()
+                rows = []
+                for a in batch:
+                    created_at, updated_at = _to_datetime(a.created_at, now), _to_datetime(a.updated_at, now)
+                    rows.append({"id": a.id, "name": a.name, "description": a.description, "tools": a.tools,
+                                 "created_at": created_at, "updated_at": updated_at, "version": 1})
+                    # Stored at microsecond precision, read back as in _model_to_entity
+                    a.created_at, a.updated_at, a.version = str(created_at.timestamp()), str(updated_at.timestamp()), 1
+                await self.session.execute(insert(AgentModel), rows)
+                count += len(batch)
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise ValueError("Import contains an agent id that already exists")
+        except BaseException:
+            await self.session.rollback()
+            raise
+        return count
+    
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[List[Agent]]:
+        # Server-side cursor: rows arrive batch_size at a time instead of all at once
+        result = await self.session.stream_scalars(
+            select(AgentModel).order_by(AgentModel.id).execution_options(yield_per=batch_size)
+        )
+        async for models in result.partitions():
+            yield [self._model_to_entity(model) for model in models]
+    
     async def get_by_id(self, id: str) -> Optional[Agent]:
         result = await self.session.execute(select(AgentModel).where(AgentModel.id == id))
         model = result.scalar_one_or_none()
@@ -33,17 +88,30 @@ class PostgreSQLAgentRepository(AgentRepository):
         return self._model_to_entity(model) if model else None
     
     async def update(self, entity: Agent) -> Agent:
-        result = await self.session.execute(select(AgentModel).where(AgentModel.id == entity.id))
+        # One UPDATE ... RETURNING: the version predicate makes it a
+        # compare-and-set, and the returned row already carries the new version.
+        result = await self.session.execute(
+            sql_update(AgentModel)
+            .where(AgentModel.id == entity.id, AgentModel.version == entity.version)
+            .values(
+                name=entity.name,
+                description=entity.description,
+                tools=entity.tools,
+                version=AgentModel.version + 1,
+                updated_at=func.now()
+            )
+            .returning(AgentModel)
+        )
         model = result.scalar_one_or_none()
         if not model:
-            raise ValueError(f"Agent with id {entity.id} not found")
-        
-        model.name = entity.name
-        model.description = entity.description
-        model.tools = entity.tools
+            await self.session.rollback()
+            # Failure path only: tell a missing row apart from a lost race
+            exists = await self.session.execute(select(AgentModel.id).where(AgentModel.id == entity.id))
+            if exists.scalar_one_or_none() is None:
+                raise ValueError(f"Agent with id {entity.id} not found")
+            raise StaleAgentError(f"Agent {entity.id} was modified since version {entity.version}")
         
         await self.session.commit()
-        await self.session.refresh(model)
         return self._model_to_entity(model)
     
     async def delete(self, id: str) -> bool:
@@ -56,8 +124,12 @@ class PostgreSQLAgentRepository(AgentRepository):
         await self.session.commit()
         return True
     
-    async def list_all(self, skip: int = 0, limit: int = 100) -> List[Agent]:
-        result = await self.session.execute(select(AgentModel).offset(skip).limit(limit))
+    async def list_all(self, limit: int = 100, after: Optional[str] = None) -> List[Agent]:
+        # Keyset pagination on the primary key: constant cost regardless of page depth
+        stmt = select(AgentModel).order_by(AgentModel.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(AgentModel.id > after)
+        result = await self.session.execute(stmt)
         models = result.scalars().all()
         return [self._model_to_entity(model) for model in models]
     
@@ -66,5 +138,9 @@ class PostgreSQLAgentRepository(AgentRepository):
             id=model.id,
             name=model.name,
             description=model.description,
-            tools=model.tools or []
+            tools=model.tools or [],
+            # Epoch seconds as strings, like the SQLite store; HTTP ETags are built from updated_at
+            created_at=str(model.created_at.timestamp()) if model.created_at else None,
+            updated_at=str(model.updated_at.timestamp()) if model.updated_at else None,
+            version=model.version or 1
         )
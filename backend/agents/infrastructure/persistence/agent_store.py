@@ -0,0 +1,48 @@
+import os
+from typing import AsyncIterator, Optional
+from ...core.repositories.agent_repository import AgentRepository
+from .sqlite_agent_repository import SQLiteAgentRepository
+
+# Backing store for the live /api/agents endpoints:
+#   "sqlite" - one SQLite file shared by every worker process on this host
+#   "hybrid" - Postgres behind the Redis cache, for multi-host deployments
+AGENT_STORE = os.getenv("AGENT_STORE", "sqlite")
+AGENT_STORE_PATH = os.getenv(
+    "AGENT_STORE_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "config", "agents.db")
+)
+
+_SQLITE_STORE: Optional[SQLiteAgentRepository] = None
+
+def get_sqlite_store() -> SQLiteAgentRepository:
+    global _SQLITE_STORE
+    if _SQLITE_STORE is None:
+        _SQLITE_STORE = SQLiteAgentRepository(os.path.abspath(AGENT_STORE_PATH))
+    return _SQLITE_STORE
+
+async def get_agent_store() -> AsyncIterator[AgentRepository]:
+    """FastAPI dependency yielding the configured agent repository.
+
+    Every worker process reads and writes the same shared store, so
+    `uvicorn --workers N` serves one consistent set of agents.
+    """
+    store = AGENT_STORE.lower()
+    if store == "sqlite":
+        yield get_sqlite_store()
+    elif store == "hybrid":
+        # Imported lazily: these modules build the engine and Redis clients at import
+        from .agent_repository import PostgreSQLAgentRepository
+        from .database import AsyncSessionLocal
+        from .hybrid_agent_repository import HybridAgentRepository
+        from .redis_cache import RedisCache
+        from .redis_client import cache_redis_client
+        async with AsyncSessionLocal() as session:
+            yield HybridAgentRepository(PostgreSQLAgentRepository(session), RedisCache(cache_redis_client))
+    else:
+        raise ValueError(f"Unknown agent store: {AGENT_STORE}")
+
+async def close_agent_store() -> None:
+    global _SQLITE_STORE
+    if _SQLITE_STORE is not None:
+        await _SQLITE_STORE.close()
+        _SQLITE_STORE = None
@@ -0,0 +1,125 @@
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from pydantic import TypeAdapter
+from ...core.entities.agent import Agent
+
+# Which codec RedisCache uses by default: "json" or "msgpack"
+CACHE_CODEC = os.getenv("CACHE_CODEC", "json")
+
+# Field order for positional encodings; bump MSGPACK_SCHEMA_VERSION on any change
+AGENT_FIELDS = ("id", "name", "description", "tools", "created_at", "updated_at", "version")
+MSGPACK_SCHEMA_VERSION = 2
+
+_AGENT_FIELDS_SET = frozenset(AGENT_FIELDS)
+
+
+def trusted_agent(fields: dict) -> Agent:
+    """Build an Agent from fields we serialized ourselves, skipping validation.
+
+    Equivalent to `Agent.model_construct(**fields)` for a complete field set,
+    but without its per-field default handling, which on pydantic 2 costs
+    more than the validation it skips.
+    """
+    agent = Agent.__new__(Agent)
+    object.__setattr__(agent, "__dict__", fields)
+    object.__setattr__(agent, "__pydantic_fields_set__", set(_AGENT_FIELDS_SET))
+    object.__setattr__(agent, "__pydantic_extra__", None)
+    object.__setattr__(agent, "__pydantic_private__", None)
+    return agent
+
+
+class CacheCodec(ABC):
+    """Serializes agents for the cache.
+
+    Cache entries are only ever written by us from already-validated agents,
+    so decoders should take the cheapest path to an Agent rather than
+    re-validating. A decode that returns None is treated as a cache miss.
+    """
+    name: str
+
+    @abstractmethod
+    def encode_agent(self, agent: Agent) -> bytes: ...
+
+    @abstractmethod
+    def decode_agent(self, raw: bytes) -> Optional[Agent]: ...
+
+    @abstractmethod
+    def encode_agents(self, agents: List[Agent]) -> bytes: ...
+
+    @abstractmethod
+    def decode_agents(self, raw: bytes) -> Optional[List[Agent]]: ...
+
+
+class JsonCacheCodec(CacheCodec):
+    """Same wire format as before codecs existed, so old entries stay readable.
+
+    pydantic's one-pass JSON parser is faster than json.loads followed by
+    trusted_agent, so this codec decodes through it.
+    """
+    name = "json"
+
+    def __init__(self):
+        self._list_adapter = TypeAdapter(List[Agent])
+
+    def encode_agent(self, agent: Agent) -> bytes:
+        return agent.__pydantic_serializer__.to_json(agent)
+
+    def decode_agent(self, raw: bytes) -> Optional[Agent]:
+        return Agent.model_validate_json(raw)
+
+    def encode_agents(self, agents: List[Agent]) -> bytes:
+        return self._list_adapter.dump_json(agents)
+
+    def decode_agents(self, raw: bytes) -> Optional[List[Agent]]:
+        return self._list_adapter.validate_json(raw)
+
+
+class MsgpackCacheCodec(CacheCodec):
+    """Positional msgpack rows behind a one-byte schema version.
+
+    Entries written under another schema version decode to None, so a
+    deploy that changes AGENT_FIELDS just misses instead of misreading.
+    """
+    name = "msgpack"
+
+    def __init__(self):
+        import msgpack
+        self._packb = msgpack.packb
+        self._unpackb = msgpack.unpackb
+        self._header = bytes([MSGPACK_SCHEMA_VERSION])
+
+    def _row(self, agent: Agent) -> list:
+        return [getattr(agent, field) for field in AGENT_FIELDS]
+
+    def _payload(self, raw: bytes) -> Optional[memoryview]:
+        if not isinstance(raw, (bytes, bytearray)) or raw[:1] != self._header:
+            return None
+        return memoryview(raw)[1:]
+
+    def encode_agent(self, agent: Agent) -> bytes:
+        return self._header + self._packb(self._row(agent))
+
+    def decode_agent(self, raw: bytes) -> Optional[Agent]:
+        payload = self._payload(raw)
+        if payload is None:
+            return None
+        return trusted_agent(dict(zip(AGENT_FIELDS, self._unpackb(payload))))
+
+    def encode_agents(self, agents: List[Agent]) -> bytes:
+        return self._header + self._packb([self._row(agent) for agent in agents])
+
+    def decode_agents(self, raw: bytes) -> Optional[List[Agent]]:
+        payload = self._payload(raw)
+        if payload is None:
+            return None
+        return [trusted_agent(dict(zip(AGENT_FIELDS, row))) for row in self._unpackb(payload)]
+
+
+def get_cache_codec(name: Optional[str] = None) -> CacheCodec:
+    name = (name or CACHE_CODEC).lower()
+    if name == "json":
+        return JsonCacheCodec()
+    if name == "msgpack":
+        return MsgpackCacheCodec()
+    raise ValueError(f"Unknown cache codec: {name}")
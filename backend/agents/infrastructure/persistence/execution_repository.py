@@ -0,0 +1,113 @@
+from typing import Optional, List
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ...core.entities.execution import Execution, ExecutionStep
+from ...core.repositories.execution_repository import ExecutionRepository
+from .models import ExecutionModel
+
+
+def _to_datetime(ts: Optional[str]) -> Optional[datetime]:
+    # Entities carry epoch-second strings (str(time.time()))
+    if not ts:
+        return None
+    try:
+        return datetime.fromtimestamp(float(ts))
+    except ValueError:
+        return datetime.fromisoformat(ts)
+
+
+def _to_timestamp(dt: Optional[datetime]) -> Optional[str]:
+    return str(dt.timestamp()) if dt else None
+
+
+class PostgreSQLExecutionRepository(ExecutionRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, entity: Execution) -> Execution:
+        model = ExecutionModel(
+            id=entity.id,
+            agent_id=entity.agent_id,
+            query=entity.query,
+            steps=[step.model_dump() for step in entity.steps],
+            result=entity.result,
+            status=entity.status,
+            started_at=_to_datetime(entity.started_at),
+            completed_at=_to_datetime(entity.completed_at)
+        )
+        self.session.add(model)
+        await self.session.commit()
+        await self.session.refresh(model)
+        return self._model_to_entity(model)
+
+    async def get_by_id(self, id: str) -> Optional[Execution]:
+        result = await self.session.execute(select(ExecutionModel).where(ExecutionModel.id == id))
+        model = result.scalar_one_or_none()
+        return self._model_to_entity(model) if model else None
+
+    async def get_by_agent_id(self, agent_id: str, limit: int = 100, after: Optional[str] = None) -> List[Execution]:
+        # Walks ix_executions_agent_id_id; no OFFSET scan on deep pages
+        stmt = (
+            select(ExecutionModel)
+            .where(ExecutionModel.agent_id == agent_id)
+            .order_by(ExecutionModel.id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(ExecutionModel.id > after)
+        result = await self.session.execute(stmt)
+        models = result.scalars().all()
+        return [self._model_to_entity(model) for model in models]
+
+    async def get_recent_executions(self, limit: int = 10) -> List[Execution]:
+        result = await self.session.execute(
+            select(ExecutionModel).order_by(ExecutionModel.started_at.desc()).limit(limit)
+        )
+        models = result.scalars().all()
+        return [self._model_to_entity(model) for model in models]
+
+    async def update(self, entity: Execution) -> Execution:
+        result = await self.session.execute(select(ExecutionModel).where(ExecutionModel.id == entity.id))
+        model = result.scalar_one_or_none()
+        if not model:
+            raise ValueError(f"Execution with id {entity.id} not found")
+
+        model.steps = [step.model_dump() for step in entity.steps]
+        model.result = entity.result
+        model.status = entity.status
+        model.completed_at = _to_datetime(entity.completed_at)
+
+        await self.session.commit()
+        await self.session.refresh(model)
+        return self._model_to_entity(model)
+
+    async def delete(self, id: str) -> bool:
+        result = await self.session.execute(select(ExecutionModel).where(ExecutionModel.id == id))
+        model = result.scalar_one_or_none()
+        if not model:
+            return False
+
+        await self.session.delete(model)
+        await self.session.commit()
+        return True
+
+    async def list_all(self, limit: int = 100, after: Optional[str] = None) -> List[Execution]:
+        stmt = select(ExecutionModel).order_by(ExecutionModel.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(ExecutionModel.id > after)
+        result = await self.session.execute(stmt)
+        models = result.scalars().all()
+        return [self._model_to_entity(model) for model in models]
+
+    def _model_to_entity(self, model: ExecutionModel) -> Execution:
+        return Execution(
+            id=model.id,
+            agent_id=model.agent_id,
+            query=model.query,
+            steps=[ExecutionStep(**step) for step in (model.steps or [])],
+            result=model.result,
+            status=model.status,
+            started_at=_to_timestamp(model.started_at) or "",
+            completed_at=_to_timestamp(model.completed_at)
+        )
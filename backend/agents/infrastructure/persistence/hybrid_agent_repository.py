@@ -1,11 +1,26 @@
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
+import math
+import random
+import time
 from ...core.entities.agent import Agent
 from ...core.repositories.agent_repository import AgentRepository
 from .agent_repository import PostgreSQLAgentRepository
 from .redis_cache import RedisCache
+from .single_flight import SingleFlight
+from ..monitoring.metrics import CACHE_REQUESTS
+
+# Repositories are built per request, so in-flight loads are tracked per process
+_agent_loads = SingleFlight()
 
 
 class HybridAgentRepository(AgentRepository):
+    # Probabilistic early expiration (XFetch): larger beta refreshes earlier
+    early_refresh_beta = 1.0
+    # EWMA of how long a PostgreSQL reload takes, shared across instances
+    _recompute_seconds = 0.005
+    # Bulk imports warm at most this many agents; the rest load on first read
+    bulk_warm_limit = 10000
+
     def __init__(self, postgres_repo: PostgreSQLAgentRepository, redis_cache: RedisCache):
         self.postgres_repo = postgres_repo
         self.redis_cache = redis_cache
@@ -14,31 +29,76 @@ class HybridAgentRepository(AgentRepository):
         # PostgreSQL for durability
         db_agent = await self.postgres_repo.create(entity)
         
-        # Redis for speed
-        await self.redis_cache.set_agent(db_agent)
+        # Redis for speed. Unguarded, like a bulk import: a delete of the same id
+        # pins the version sidecar for an hour, and a guarded write would be
+        # dropped against it, leaving the delete's negative entry in place.
+        await self.redis_cache.warm_agents([db_agent])
+        await self.redis_cache.bump_list_version()
         
         return db_agent
     
+    async def bulk_create(self, batches: AsyncIterator[List[Agent]]) -> int:
+        warm: List[Agent] = []
+        
+        async def collect() -> AsyncIterator[List[Agent]]:
+            async for batch in batches:
+                room = self.bulk_warm_limit - len(warm)
+                if room > 0:
+                    warm.extend(batch[:room])
+                yield batch
+        
+        count = await self.postgres_repo.bulk_create(collect())
+        
+        # Warm only after commit so a rolled-back import never reaches the cache
+        await self.redis_cache.warm_agents(warm)
+        await self.redis_cache.bump_list_version()
+        return count
+    
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[List[Agent]]:
+        async for batch in self.postgres_repo.stream_all(batch_size):
+            yield batch
+    
     async def get_by_id(self, id: str) -> Optional[Agent]:
-        # L1 Cache: Redis
-        cached_agent = await self.redis_cache.get_agent(id)
-        if cached_agent:
-            return cached_agent
+        # L1 Cache: Redis (a hit may be a negative entry for a missing id)
+        cached = await self.redis_cache.lookup_agent(id)
+        if cached.hit and (cached.agent is None or not self._should_refresh_early(cached.ttl)):
+            CACHE_REQUESTS.labels(cache="agents", result="hit").inc()
+            return cached.agent
+        CACHE_REQUESTS.labels(cache="agents", result="miss").inc()
         
-        # L2 Storage: PostgreSQL
+        # L2 Storage: PostgreSQL, one load per key no matter how many callers miss
+        return await _agent_loads.do(id, lambda: self._load_from_db(id))
+    
+    async def _load_from_db(self, id: str) -> Optional[Agent]:
+        started = time.perf_counter()
         db_agent = await self.postgres_repo.get_by_id(id)
+        elapsed = time.perf_counter() - started
+        HybridAgentRepository._recompute_seconds = 0.8 * HybridAgentRepository._recompute_seconds + 0.2 * elapsed
+        
+        # Update cache
         if db_agent:
-            # Update cache
             await self.redis_cache.set_agent(db_agent)
-        
+        else:
+            await self.redis_cache.set_missing(id)
         return db_agent
     
+    def _should_refresh_early(self, ttl: float) -> bool:
+        # -delta * beta * ln(U) grows as expiry nears, so exactly one of many
+        # readers tends to refresh shortly before the key would have expired.
+        if ttl <= 0:
+            return True
+        gap = -self._recompute_seconds * self.early_refresh_beta * math.log(1.0 - random.random())
+        return gap >= ttl
+    
     async def update(self, entity: Agent) -> Agent:
         # Update in PostgreSQL
         updated_agent = await self.postgres_repo.update(entity)
         
-        # Invalidate cache
-        await self.redis_cache.invalidate_agent(entity.id)
+        # Write-through with the returned row. The write is one atomic script
+        # that also replaces any negative entry, and it is dropped if a newer
+        # version is already cached, so a slow writer cannot clobber it.
+        await self.redis_cache.set_agent(updated_agent)
+        await self.redis_cache.bump_list_version()
         
         return updated_agent
     
@@ -46,11 +106,21 @@ class HybridAgentRepository(AgentRepository):
         # Delete from PostgreSQL
         result = await self.postgres_repo.delete(id)
         
-        # Invalidate cache
-        await self.redis_cache.invalidate_agent(id)
+        # Remember the id is gone rather than letting the next read miss
+        await self.redis_cache.mark_deleted(id)
+        if result:
+            await self.redis_cache.bump_list_version()
         
         return result
     
-    async def list_all(self, skip: int = 0, limit: int = 100) -> List[Agent]:
-        # For listing, we'll use PostgreSQL as it's not cacheable
-        return await self.postgres_repo.list_all(skip, limit)
+    async def list_all(self, limit: int = 100, after: Optional[str] = None) -> List[Agent]:
+        # Pages are cached under the collection version; any write bumps it,
+        # so stale pages are simply never looked up again.
+        version = await self.redis_cache.get_list_version()
+        cached_page = await self.redis_cache.get_agent_list(version, after, limit)
+        if cached_page is not None:
+            return cached_page
+        
+        page = await self.postgres_repo.list_all(limit, after)
+        await self.redis_cache.set_agent_list(version, after, limit, page)
+        return page
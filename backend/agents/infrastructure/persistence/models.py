@@ -1,6 +1,8 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, Float, JSON
+from sqlalchemy import Column, String, Text, DateTime, Integer, Float, JSON, Index, text
+from sqlalchemy.schema import CreateIndex, ExecutableDDLElement
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
+from typing import List
 import uuid
 
 Base = declarative_base()
@@ -10,9 +12,10 @@ class AgentModel(Base):
     __tablename__ = 'agents'
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     description = Column(Text, nullable=False)
     tools = Column(JSON, default=[])
+    version = Column(Integer, nullable=False, default=1, server_default='1')
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
@@ -21,9 +24,9 @@ class ToolModel(Base):
     __tablename__ = 'tools'
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     description = Column(Text, nullable=False)
-    type = Column(String, nullable=False)  # e.g., 'prebuilt', 'custom'
+    type = Column(String, nullable=False, index=True)  # e.g., 'prebuilt', 'custom'
     config = Column(JSON)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -31,6 +34,10 @@ class ToolModel(Base):
 
 class ExecutionModel(Base):
     __tablename__ = 'executions'
+    __table_args__ = (
+        # Serves both the agent_id filter and the keyset walk in get_by_agent_id
+        Index('ix_executions_agent_id_id', 'agent_id', 'id'),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     agent_id = Column(String, nullable=False)
@@ -38,5 +45,20 @@ class ExecutionModel(Base):
     steps = Column(JSON, default=[])
     result = Column(Text)
     status = Column(String, nullable=False)  # e.g., 'running', 'completed', 'failed'
-    started_at = Column(DateTime, default=func.now())
+    started_at = Column(DateTime, default=func.now(), index=True)
     completed_at = Column(DateTime)
+
+
+# Columns added to tables after their first release; create_all() never alters an existing table
+ADDED_COLUMNS = [
+    "ALTER TABLE agents ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+]
+
+
+def schema_upgrades() -> List[ExecutableDDLElement]:
+    """Idempotent DDL bringing a database created by an older release up to these models."""
+    statements: List[ExecutableDDLElement] = [text(sql) for sql in ADDED_COLUMNS]
+    for table in Base.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            statements.append(CreateIndex(index, if_not_exists=True))
+    return statements
@@ -1,26 +1,140 @@
-import json
 import redis.asyncio as redis
-from typing import Optional, Any
+from dataclasses import dataclass
+from typing import Optional, Any, List
 from ...core.entities.agent import Agent
+from .cache_codec import CacheCodec, get_cache_codec
+
+# Stored in place of an agent to remember that the id does not exist.
+# A lone NUL byte cannot collide with a JSON or msgpack payload.
+NEGATIVE_ENTRY = b"\x00"
+
+# Sidecar version recorded for deleted agents; larger than any real version
+DELETED_VERSION = 2 ** 53
+
+# Write the agent only if its version is not older than the one last cached.
+# The version lives in a sidecar key so the script never has to decode the
+# codec payload. KEYS: agent key, version key. ARGV: version, payload, ttl.
+SET_IF_NOT_STALE = """
+local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+if tonumber(ARGV[1]) < current then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+
+@dataclass
+class CachedAgent:
+    hit: bool
+    agent: Optional[Agent] = None  # None on a hit means a negative entry
+    ttl: float = 0.0  # seconds until the entry expires
 
 
 class RedisCache:
-    def __init__(self, redis_client: redis.Redis):
+    # Bumped on every agent write; list pages are keyed under the current value
+    # so a single INCR invalidates every cached page at once.
+    LIST_VERSION_KEY = "agents:list:version"
+
+    def __init__(self, redis_client: redis.Redis, codec: Optional[CacheCodec] = None):
+        # Expects a client with decode_responses=False: entries are raw bytes
         self.redis = redis_client
+        self.codec = codec or get_cache_codec()
+        self._set_if_not_stale = redis_client.register_script(SET_IF_NOT_STALE)
         self.cache_ttl = 3600  # 1 hour default TTL
+        self.list_cache_ttl = 300  # orphaned pages from old versions age out quickly
+        self.negative_ttl = 30  # short, so a missed create is never hidden for long
     
     async def get_agent(self, agent_id: str) -> Optional[Agent]:
         cached = await self.redis.get(f"agent:{agent_id}")
-        if cached:
-            return Agent(**json.loads(cached))
+        if cached and cached != NEGATIVE_ENTRY:
+            return self.codec.decode_agent(cached)
         return None
+
+    async def lookup_agent(self, agent_id: str) -> CachedAgent:
+        """Fetch the entry and its remaining TTL in one round trip."""
+        key = f"agent:{agent_id}"
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            cached, pttl = await pipe.execute()
+        if cached is None:
+            return CachedAgent(hit=False)
+        ttl = max(pttl, 0) / 1000.0
+        if cached == NEGATIVE_ENTRY:
+            return CachedAgent(hit=True, ttl=ttl)
+        agent = self.codec.decode_agent(cached)
+        if agent is None:
+            return CachedAgent(hit=False)
+        return CachedAgent(hit=True, agent=agent, ttl=ttl)
+
+    async def set_missing(self, agent_id: str) -> None:
+        # NX: a concurrent create that already cached the real agent must
+        # win over a reader that saw the row missing.
+        await self.redis.set(
+            f"agent:{agent_id}",
+            NEGATIVE_ENTRY,
+            ex=self.negative_ttl,
+            nx=True
+        )
+
+    async def mark_deleted(self, agent_id: str) -> None:
+        # Pin the version sidecar above any real version so an in-flight
+        # read-through fill cannot resurrect the agent after the delete.
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(f"agent:{agent_id}", NEGATIVE_ENTRY, ex=self.negative_ttl)
+            pipe.set(f"agent:{agent_id}:version", DELETED_VERSION, ex=self.cache_ttl)
+            await pipe.execute()
     
-    async def set_agent(self, agent: Agent) -> None:
-        await self.redis.setex(
-            f"agent:{agent.id}",
-            self.cache_ttl,
-            agent.model_dump_json()
+    async def set_agent(self, agent: Agent) -> bool:
+        """Cache the agent unless a newer version is already cached.
+
+        Returns False when the write was dropped as stale, e.g. a slow
+        read-through fill racing a write-through update.
+        """
+        written = await self._set_if_not_stale(
+            keys=[f"agent:{agent.id}", f"agent:{agent.id}:version"],
+            args=[agent.version, self.codec.encode_agent(agent), self.cache_ttl]
         )
+        return bool(written)
+    
+    async def warm_agents(self, agents: List[Agent], batch_size: int = 500) -> None:
+        """Cache freshly inserted agents, one pipelined round trip per batch.
+
+        Only for agents that were just created: it skips the version guard,
+        which has nothing to protect for a first write, and replaces any
+        tombstone a delete of the same id left behind.
+        """
+        for start in range(0, len(agents), batch_size):
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for agent in agents[start:start + batch_size]:
+                    pipe.set(f"agent:{agent.id}", self.codec.encode_agent(agent), ex=self.cache_ttl)
+                    pipe.set(f"agent:{agent.id}:version", agent.version, ex=self.cache_ttl)
+                await pipe.execute()
     
     async def invalidate_agent(self, agent_id: str) -> None:
         await self.redis.delete(f"agent:{agent_id}")
+
+    async def get_list_version(self) -> int:
+        version = await self.redis.get(self.LIST_VERSION_KEY)
+        return int(version) if version else 0
+
+    async def bump_list_version(self) -> int:
+        return await self.redis.incr(self.LIST_VERSION_KEY)
+
+    def _list_key(self, version: int, after: Optional[str], limit: int) -> str:
+        return f"agents:list:v{version}:{after or ''}:{limit}"
+
+    async def get_agent_list(self, version: int, after: Optional[str], limit: int) -> Optional[List[Agent]]:
+        cached = await self.redis.get(self._list_key(version, after, limit))
+        if cached is None:
+            return None
+        return self.codec.decode_agents(cached)
+
+    async def set_agent_list(self, version: int, after: Optional[str], limit: int, agents: List[Agent]) -> None:
+        await self.redis.setex(
+            self._list_key(version, after, limit),
+            self.list_cache_ttl,
+            self.codec.encode_agents(agents)
+        )
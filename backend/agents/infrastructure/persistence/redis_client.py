@@ -1,8 +1,32 @@
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
 import os
+from ..monitoring.metrics import REDIS_SECONDS
 
 # Redis configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        # One round trip for the whole batch; queued commands cost nothing to time
+        with REDIS_SECONDS.time(command="pipeline"):
+            return await super().execute(raise_on_error)
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that times every command into redis_command_seconds."""
+
+    async def execute_command(self, *args, **options):
+        with REDIS_SECONDS.time(command=str(args[0]).lower()):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
 # Create async Redis client
-redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+redis_client = InstrumentedRedis.from_url(REDIS_URL, decode_responses=True)
+
+# Raw-bytes client for RedisCache, whose codecs may produce binary payloads
+cache_redis_client = InstrumentedRedis.from_url(REDIS_URL)
@@ -0,0 +1,246 @@
+"""In-process cache of agent answers, matched by query similarity.
+
+A query is normalized (case, punctuation, word order), cut into character
+trigram shingles, and summarized as a MinHash signature. LSH buckets the
+signatures by band, so a lookup only verifies the few entries sharing a
+band with the query, however many are stored. A hit needs an estimated
+Jaccard similarity of at least `threshold` and the same content words:
+trigrams measure spelling, not meaning, so "population of Paris" and
+"population of Lyon" score well above 0.8 and only the words tell them
+apart. Rewording, reordering and function words ("what's", "the", "of")
+still hit; an added, dropped or swapped content word misses.
+
+Entries are scoped: the same query to a different agent (or a different
+version of it) never matches. The numbers in a query are part of its
+scope too, so "what is 2+2" can never be answered with "what is 2+3", and
+so is how many negations it has: "is it not safe" never matches "is it
+safe", though the two share almost every shingle.
+Memory is bounded by `max_entries` (least recently used go first) and by
+`bucket_cap` entries per LSH bucket.
+"""
+import os
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from operator import eq
+from typing import Dict, FrozenSet, Hashable, List, Optional, Tuple, Union
+from zlib import crc32
+from ..monitoring.metrics import CACHE_REQUESTS, get_global_metrics
+
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "").lower() == "on"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "100000"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+
+_EMPTY = 1 << 32
+_DENSIFY_OFFSET = 0x9E3779B1
+_TOKEN = re.compile(r"[^\W_]+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+# "isn't", "cannot" and "is not" all count as one negation
+_NEGATION = re.compile(r"n['\u2019]t\b|\b(?:not|no|never|without|cannot)\b", re.IGNORECASE)
+# Function words ignored when comparing content words; negations are in the scope instead
+_STOPWORDS = frozenset("""
+    a an the of in on at to for from by with about as into onto over under than then and or but
+    is are was were be been being am do does did has have had will would shall should can could may might must
+    what which who whom whose where when why how it its this that these those there here
+    i me my we our you your he him his she her they them their s d ll re ve m
+    please tell give show
+""".split())
+
+
+def shingles(query: str) -> List[str]:
+    """Character trigrams of each normalized token; order and punctuation don't matter."""
+    grams = set()
+    for token in _TOKEN.findall(query.lower()):
+        padded = f"#{token}#"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return list(grams)
+
+
+def content_words(query: str) -> FrozenSet[str]:
+    """The normalized tokens of a query, without function words."""
+    return frozenset(token for token in _TOKEN.findall(query.lower()) if token not in _STOPWORDS)
+
+
+@dataclass
+class SemanticHit:
+    answer: str
+    query: str
+    similarity: float
+
+
+class _Entry:
+    __slots__ = ("scope", "signature", "words", "query", "answer", "expires")
+
+    def __init__(self, scope: Hashable, signature: array, words: FrozenSet[str], query: str, answer: str,
+                 expires: float):
+        self.scope = scope
+        self.signature = signature
+        self.words = words
+        self.query = query
+        self.answer = answer
+        self.expires = expires
+
+
+class SemanticCache:
+    """MinHash/LSH index of answers, bounded by entry count and age.
+
+    Signatures have `slots` values; the first `bands * rows` of them are
+    banded for LSH and all of them estimate similarity. With 8 bands of 4
+    rows, a pair at similarity 0.8 shares a band 98.5% of the time, one at
+    0.5 only 40%, and each entry costs 8 bucket slots rather than 64.
+    """
+
+    def __init__(self, threshold: float = 0.8, max_entries: int = 100000, ttl: Optional[float] = 3600,
+                 slots: int = 64, bands: int = 8, rows: int = 4, bucket_cap: int = 32):
+        if bands * rows > slots:
+            raise ValueError(f"{bands} bands of {rows} rows need at least {bands * rows} slots, not {slots}")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bands = bands
+        self.rows = rows
+        self.bucket_cap = bucket_cap
+        self._slots = slots
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        # Band key -> entry id, or a list of ids once a bucket holds several (most are singletons)
+        self._buckets: Dict[int, Union[int, List[int]]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, query: str) -> Optional[array]:
+        """One-permutation MinHash: one hash per shingle instead of one per shingle and slot.
+
+        Each shingle's hash picks a slot and competes for its minimum; empty
+        slots borrow from the next filled one (offset by the distance), so
+        equal inputs still agree slot for slot.
+        """
+        grams = shingles(query)
+        if not grams:
+            return None
+        k = self._slots
+        slots = [_EMPTY] * k
+        for gram in grams:
+            # crc32 spread over 64 bits by a Fibonacci multiply: stable across processes, unlike hash()
+            h = (crc32(gram.encode()) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+            i, value = (h >> 32) % k, h & 0xFFFFFFFF
+            if value < slots[i]:
+                slots[i] = value
+        out = list(slots)
+        # Walk right-to-left twice so the nearest filled slot wraps around the end
+        nearest, nearest_at = _EMPTY, 0
+        for at in range(2 * k - 1, -1, -1):
+            value = slots[at % k]
+            if value != _EMPTY:
+                nearest, nearest_at = value, at
+            elif at < k:
+                out[at] = (nearest + (nearest_at - at) * _DENSIFY_OFFSET) & 0xFFFFFFFF
+        return array("I", out)
+
+    def _scope(self, scope: Hashable, query: str) -> Hashable:
+        return (scope, tuple(_NUMBER.findall(query)), len(_NEGATION.findall(query)))
+
+    def _band_keys(self, scope: Hashable, signature: array) -> List[int]:
+        raw = signature.tobytes()
+        width = self.rows * signature.itemsize
+        return [hash((scope, band, raw[band * width:(band + 1) * width])) for band in range(self.bands)]
+
+    def get(self, scope: Hashable, query: str) -> Optional[SemanticHit]:
+        signature = self.signature(query)
+        if signature is None:
+            CACHE_REQUESTS.labels(cache="semantic", result="miss").inc()
+            return None
+        scope = self._scope(scope, query)
+        words = content_words(query)
+        best: Optional[Tuple[float, int]] = None
+        now = time.monotonic()
+        with self._lock:
+            seen = set()
+            for key in self._band_keys(scope, signature):
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                for entry_id in (bucket if isinstance(bucket, list) else (bucket,)):
+                    if entry_id in seen:
+                        continue
+                    seen.add(entry_id)
+                    entry = self._entries.get(entry_id)
+                    if entry is None or entry.scope != scope or entry.expires < now:
+                        continue
+                    # LSH and MinHash only find candidates; a swapped name still scores high
+                    if entry.words != words:
+                        continue
+                    similarity = sum(map(eq, signature, entry.signature)) / len(signature)
+                    if similarity >= self.threshold and (best is None or similarity > best[0]):
+                        best = (similarity, entry_id)
+            if best is None:
+                CACHE_REQUESTS.labels(cache="semantic", result="miss").inc()
+                return None
+            self._entries.move_to_end(best[1])
+            entry = self._entries[best[1]]
+        CACHE_REQUESTS.labels(cache="semantic", result="hit").inc()
+        return SemanticHit(entry.answer, entry.query, best[0])
+
+    def put(self, scope: Hashable, query: str, answer: str) -> bool:
+        signature = self.signature(query)
+        if signature is None:
+            return False
+        scope = self._scope(scope, query)
+        expires = time.monotonic() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(scope, signature, content_words(query), query, answer, expires)
+            for key in self._band_keys(scope, signature):
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    self._buckets[key] = entry_id
+                elif isinstance(bucket, list):
+                    bucket.append(entry_id)
+                    if len(bucket) > self.bucket_cap:
+                        del bucket[0]
+                else:
+                    self._buckets[key] = [bucket, entry_id]
+            while len(self._entries) > self.max_entries:
+                self._evict(*self._entries.popitem(last=False))
+        return True
+
+    def _evict(self, entry_id: int, entry: _Entry) -> None:
+        for key in self._band_keys(entry.scope, entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket == entry_id:
+                del self._buckets[key]
+            elif isinstance(bucket, list) and entry_id in bucket:
+                bucket.remove(entry_id)
+                if len(bucket) == 1:
+                    self._buckets[key] = bucket[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+
+_GLOBAL_SEMANTIC_CACHE: Optional[SemanticCache] = None
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """The process-wide answer cache, or None unless SEMANTIC_CACHE=on."""
+    global _GLOBAL_SEMANTIC_CACHE
+    if not SEMANTIC_CACHE:
+        return None
+    if _GLOBAL_SEMANTIC_CACHE is None:
+        _GLOBAL_SEMANTIC_CACHE = SemanticCache(SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_ENTRIES,
+                                               SEMANTIC_CACHE_TTL or None)
+    return _GLOBAL_SEMANTIC_CACHE
+
+
+get_global_metrics().gauge(
+    "semantic_cache_entries", "Answers held in the semantic cache.",
+    collect=lambda: {(): float(len(_GLOBAL_SEMANTIC_CACHE))} if _GLOBAL_SEMANTIC_CACHE is not None else {},
+)
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional
+from ...core.entities.agent import Agent
+from ...core.repositories.agent_repository import AgentRepository, StaleAgentError
+from ..monitoring.metrics import DB_SECONDS
+
+_COLUMNS = "id, name, description, tools, created_at, updated_at, version"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    tools TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT,
+    updated_at TEXT,
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS ix_agents_name ON agents (name);
+"""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    # Autocommit: every statement is its own transaction unless we BEGIN
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+    # WAL: readers never block the writer and always see the last commit,
+    # whichever process made it
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class SQLiteAgentRepository(AgentRepository):
+    """Agents in a single SQLite file shared by every worker on the host.
+
+    Each instance owns one connection driven from one background thread, so
+    queries never block the event loop and statements from concurrent
+    requests never interleave inside a transaction. Open one instance per
+    process and reuse it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-store")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, fn, *args)
+
+    @staticmethod
+    def _timed(fn, *args):
+        # Timed on the store thread: query time only, not the wait for the thread
+        with DB_SECONDS.time(store="sqlite", operation=fn.__name__.lstrip("_")):
+            return fn(*args)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = _connect(self.path)
+        return self._conn
+
+    async def create(self, entity: Agent) -> Agent:
+        now = entity.created_at or str(time.time())
+        row = (entity.id, entity.name, entity.description, json.dumps(entity.tools), now, now, 1)
+        await self._run(self._insert, row)
+        return self._row_to_entity(row)
+
+    def _insert(self, row: tuple) -> None:
+        try:
+            self._connection().execute(f"INSERT INTO agents ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Agent with id {row[0]} already exists")
+
+    async def bulk_create(self, batches: AsyncIterator[List[Agent]]) -> int:
+        """Insert every batch in one transaction; all or nothing.
+
+        The import runs on its own connection so requests served meanwhile
+        don't end up inside its transaction. SQLite has a single writer per
+        file: other workers' writes wait (up to busy_timeout) until it commits.
+        """
+        conn = await asyncio.to_thread(_connect, self.path)
+        count = 0
+        try:
+            await asyncio.to_thread(conn.execute, "BEGIN")
+            async for batch in batches:
+                if not batch:
+                    continue
+                now = str(time.time())
+                rows = [
+                    (a.id, a.name, a.description, json.dumps(a.tools), a.created_at or now, a.updated_at or now, 1)
+                    for a in batch
+                ]
+                try:
+                    await asyncio.to_thread(
+                        self._timed, conn.executemany, f"INSERT INTO agents ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                    )
+                except sqlite3.IntegrityError:
+                    raise ValueError("Import contains an agent id that already exists")
+                count += len(batch)
+            await asyncio.to_thread(conn.execute, "COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return count
+
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[List[Agent]]:
+        # Keyset pages rather than one long-lived cursor on the shared connection
+        after = None
+        while True:
+            page = await self.list_all(batch_size, after)
+            if page:
+                yield page
+            if len(page) < batch_size:
+                return
+            after = page[-1].id
+
+    async def get_by_id(self, id: str) -> Optional[Agent]:
+        row = await self._run(self._fetch_one, f"SELECT {_COLUMNS} FROM agents WHERE id = ?", (id,))
+        return self._row_to_entity(row) if row else None
+
+    async def get_by_name(self, name: str) -> Optional[Agent]:
+        row = await self._run(self._fetch_one, f"SELECT {_COLUMNS} FROM agents WHERE name = ? LIMIT 1", (name,))
+        return self._row_to_entity(row) if row else None
+
+    def _fetch_one(self, sql: str, params: tuple) -> Optional[tuple]:
+        return self._connection().execute(sql, params).fetchone()
+
+    async def update(self, entity: Agent) -> Agent:
+        row = await self._run(self._update, entity)
+        return self._row_to_entity(row)
+
+    def _update(self, entity: Agent) -> tuple:
+        # Same compare-and-set as the Postgres repository: one UPDATE ... RETURNING
+        conn = self._connection()
+        row = conn.execute(
+            "UPDATE agents SET name = ?, description = ?, tools = ?, version = version + 1, updated_at = ? "
+            f"WHERE id = ? AND version = ? RETURNING {_COLUMNS}",
+            (entity.name, entity.description, json.dumps(entity.tools), str(time.time()), entity.id, entity.version)
+        ).fetchone()
+        if row:
+            return row
+        if conn.execute("SELECT 1 FROM agents WHERE id = ?", (entity.id,)).fetchone() is None:
+            raise ValueError(f"Agent with id {entity.id} not found")
+        raise StaleAgentError(f"Agent {entity.id} was modified since version {entity.version}")
+
+    async def delete(self, id: str) -> bool:
+        return await self._run(self._delete, id)
+
+    def _delete(self, id: str) -> bool:
+        return self._connection().execute("DELETE FROM agents WHERE id = ?", (id,)).rowcount > 0
+
+    async def list_all(self, limit: int = 100, after: Optional[str] = None) -> List[Agent]:
+        rows = await self._run(self._list, limit, after)
+        return [self._row_to_entity(row) for row in rows]
+
+    def _list(self, limit: int, after: Optional[str]) -> List[tuple]:
+        # Keyset pagination on the primary key, as in PostgreSQLAgentRepository
+        if after is None:
+            sql, params = f"SELECT {_COLUMNS} FROM agents ORDER BY id LIMIT ?", (limit,)
+        else:
+            sql, params = f"SELECT {_COLUMNS} FROM agents WHERE id > ? ORDER BY id LIMIT ?", (after, limit)
+        return self._connection().execute(sql, params).fetchall()
+
+    async def close(self) -> None:
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(_close)
+        self._executor.shutdown(wait=False)
+
+    def _row_to_entity(self, row: tuple) -> Agent:
+        id, name, description, tools, created_at, updated_at, version = row
+        return Agent(
+            id=id,
+            name=name,
+            description=description,
+            tools=json.loads(tools),
+            created_at=created_at,
+            updated_at=updated_at,
+            version=version
+        )
@@ -63,8 +63,12 @@ class PostgreSQLToolRepository(ToolRepository):
         await self.session.commit()
         return True
     
-    async def list_all(self, skip: int = 0, limit: int = 100) -> List[Tool]:
-        result = await self.session.execute(select(ToolModel).offset(skip).limit(limit))
+    async def list_all(self, limit: int = 100, after: Optional[str] = None) -> List[Tool]:
+        # Keyset pagination on the primary key: constant cost regardless of page depth
+        stmt = select(ToolModel).order_by(ToolModel.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(ToolModel.id > after)
+        result = await self.session.execute(stmt)
         models = result.scalars().all()
         return [self._model_to_entity(model) for model in models]
     
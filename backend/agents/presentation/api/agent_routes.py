@@ -1,29 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from ..schemas.agent_schemas import AgentCreateRequest, AgentResponse, AgentListResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import List, Optional
+from ..schemas.agent_schemas import (
+    AgentCreateRequest,
+    AgentResponse,
+    AgentListResponse,
+    AgentImportRecord,
+    AgentImportResponse,
+)
+from .pagination import encode_cursor, decode_cursor
+from .ndjson import iter_ndjson_lines
 from ...application.commands.create_agent_command import CreateAgentCommand
 from ...application.commands.create_agent_handler import CreateAgentHandler
+from ...application.commands.import_agents_command import ImportAgentsCommand
+from ...application.commands.import_agents_handler import ImportAgentsHandler
 from ...application.queries.get_agent_query import GetAgentQuery
 from ...application.queries.get_agent_handler import GetAgentHandler
 from ...application.queries.list_agents_query import ListAgentsQuery
 from ...application.queries.list_agents_handler import ListAgentsHandler
+from ...application.queries.export_agents_query import ExportAgentsQuery
+from ...application.queries.export_agents_handler import ExportAgentsHandler
+from ...core.entities.agent import Agent
+from ...core.events.agent_event_observer import get_global_event_observer
 from ...infrastructure.persistence.hybrid_agent_repository import HybridAgentRepository
 from ...infrastructure.persistence.agent_repository import PostgreSQLAgentRepository
 from ...infrastructure.persistence.redis_cache import RedisCache
-from ...infrastructure.persistence.database import get_db
-from ...infrastructure.persistence.redis_client import redis_client
+from ...infrastructure.persistence.database import get_db, AsyncSessionLocal
+from ...infrastructure.persistence.redis_client import cache_redis_client
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
+def build_agent_repository(db: AsyncSession) -> HybridAgentRepository:
+    postgres_repo = PostgreSQLAgentRepository(db)
+    redis_cache = RedisCache(cache_redis_client)
+    return HybridAgentRepository(postgres_repo, redis_cache)
+
 async def get_agent_handlers(db: AsyncSession = Depends(get_db)):
     # Initialize repositories
-    postgres_repo = PostgreSQLAgentRepository(db)
-    redis_cache = RedisCache(redis_client)
-    hybrid_repo = HybridAgentRepository(postgres_repo, redis_cache)
+    hybrid_repo = build_agent_repository(db)
     
     # Initialize handlers
-    create_handler = CreateAgentHandler(hybrid_repo, None)  # TODO: Add event observer
+    create_handler = CreateAgentHandler(hybrid_repo, get_global_event_observer())
     get_handler = GetAgentHandler(hybrid_repo)
     list_handler = ListAgentsHandler(hybrid_repo)
     
@@ -43,6 +62,46 @@ async def create_agent(
     agent = await create_handler.handle(command)
     return agent
 
+@router.post("/agents/import", response_model=AgentImportResponse, status_code=201)
+async def import_agents(
+    request: Request,
+    batch_size: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk-create agents from an NDJSON body, one agent object per line.
+
+    The body is streamed and written in batches inside one transaction:
+    a bad line or duplicate id rejects the whole import.
+    """
+    async def records():
+        line_no = 0
+        async for line in iter_ndjson_lines(request.stream()):
+            line_no += 1
+            try:
+                record = AgentImportRecord.model_validate_json(line)
+            except ValidationError as e:
+                raise HTTPException(status_code=400, detail=f"Line {line_no}: {e.errors()[0]['msg']}")
+            fields = record.model_dump(exclude_none=True)
+            yield Agent(**fields)
+
+    handler = ImportAgentsHandler(build_agent_repository(db))
+    try:
+        imported = await handler.handle(ImportAgentsCommand(records=records(), batch_size=batch_size))
+    except ValueError:
+        raise HTTPException(status_code=409, detail="Import contains an agent id that already exists")
+    return AgentImportResponse(imported=imported)
+
+@router.get("/agents/export", summary="Stream all agents as NDJSON")
+async def export_agents(batch_size: int = Query(1000, ge=1, le=10000)):
+    async def body():
+        # Own session: it has to outlive the request handler while the body streams
+        async with AsyncSessionLocal() as session:
+            handler = ExportAgentsHandler(build_agent_repository(session))
+            async for batch in handler.handle(ExportAgentsQuery(batch_size=batch_size)):
+                yield "".join(agent.model_dump_json() + "\n" for agent in batch)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
 @router.get("/agents/{agent_id}", response_model=AgentResponse)
 async def get_agent(
     agent_id: str,
@@ -57,11 +116,13 @@ async def get_agent(
 
 @router.get("/agents", response_model=AgentListResponse)
 async def list_agents(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
     handlers: tuple = Depends(get_agent_handlers)
 ):
     _, _, list_handler = handlers
-    query = ListAgentsQuery(skip=skip, limit=limit)
+    query = ListAgentsQuery(limit=limit, after=decode_cursor(cursor))
     agents = await list_handler.handle(query)
-    return AgentListResponse(agents=agents)
+    # A full page means there may be more; the client stops when next_cursor is null
+    next_cursor = encode_cursor(agents[-1].id) if len(agents) == limit else None
+    return AgentListResponse(agents=agents, next_cursor=next_cursor)
@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from ..schemas.execution_schemas import ExecutionCreateRequest, ExecutionResponse
 from ...application.commands.execute_agent_command import ExecuteAgentCommand
 from ...application.commands.execute_agent_handler import ExecuteAgentHandler
+from ...core.events.agent_event_observer import get_global_event_observer
 from ...infrastructure.persistence.hybrid_agent_repository import HybridAgentRepository
 from ...infrastructure.persistence.agent_repository import PostgreSQLAgentRepository
 from ...infrastructure.persistence.redis_cache import RedisCache
 from ...infrastructure.persistence.database import get_db
-from ...infrastructure.persistence.redis_client import redis_client
+from ...infrastructure.persistence.redis_client import cache_redis_client
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
@@ -14,13 +15,13 @@ router = APIRouter()
 async def get_execution_handlers(db: AsyncSession = Depends(get_db)):
     # Initialize repositories
     postgres_repo = PostgreSQLAgentRepository(db)
-    redis_cache = RedisCache(redis_client)
+    redis_cache = RedisCache(cache_redis_client)
     hybrid_repo = HybridAgentRepository(postgres_repo, redis_cache)
     
     # TODO: Initialize execution repository when it's available
     
     # Initialize handlers
-    execute_handler = ExecuteAgentHandler(hybrid_repo, None, None)  # TODO: Add execution repo and event observer
+    execute_handler = ExecuteAgentHandler(hybrid_repo, None, get_global_event_observer())  # TODO: Add execution repo
     
     return execute_handler
 
@@ -0,0 +1,88 @@
+import gzip
+import hashlib
+import os
+from typing import Dict, Iterable, Optional
+from fastapi import Response
+
+# Bodies smaller than this go out uncompressed: gzip would barely shrink them
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+# Clients may keep a copy but must revalidate it (cheap with If-None-Match) before each use
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison, as RFC 9110 asks for GETs)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == wanted:
+            return True
+    return False
+
+
+def gzip_etag(etag: str) -> str:
+    # A strong ETag names one representation, so the gzipped body gets its own
+    return etag[:-1] + '-gzip"'
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    qualities: Dict[str, float] = {}
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[name.strip().lower()] = q
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+
+def not_modified(if_none_match: Optional[str], etag: str) -> Optional[Response]:
+    """A 304 if the client already holds either representation of `etag`, else None."""
+    for candidate in (etag, gzip_etag(etag)):
+        if etag_matches(if_none_match, candidate):
+            return Response(status_code=304, headers=cache_headers(candidate))
+    return None
+
+
+def json_response(body: bytes, etag: str, accept_encoding: Optional[str],
+                  gzipped: Optional[bytes] = None) -> Response:
+    """Serialized JSON with cache headers, gzipped when large and accepted.
+
+    Pass `gzipped` to reuse a body compressed earlier.
+    """
+    if not should_gzip(body, accept_encoding):
+        return Response(body, media_type="application/json", headers=cache_headers(etag))
+    headers = cache_headers(gzip_etag(etag))
+    headers["Content-Encoding"] = "gzip"
+    return Response(gzipped or gzip_body(body), media_type="application/json", headers=headers)
+
+
+def should_gzip(body: bytes, accept_encoding: Optional[str]) -> bool:
+    return len(body) >= GZIP_MIN_BYTES and accepts_gzip(accept_encoding)
+
+
+def gzip_body(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=6)
+
+
+def version_etag(parts: Iterable[str]) -> str:
+    """A strong ETag over version markers (e.g. id, version and updated_at of each row)."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
@@ -0,0 +1,21 @@
+import base64
+from typing import Optional
+from fastapi import HTTPException
+
+# Cursors are opaque to clients; today they wrap the last id of the page.
+# Keeping them encoded lets us change the keyset (e.g. to (created_at, id))
+# without breaking callers.
+
+
+def encode_cursor(last_id: str) -> str:
+    return base64.urlsafe_b64encode(last_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, constr, validator
 from typing import Dict, Any, Optional, List
 from ...core.services.tool_registry import get_global_registry
+from .http_cache import etag_matches
 
 router = APIRouter()
 
-tool_registry = get_global_registry()
+# The registry is built in the app's lifespan (main.py), not when this module is imported
 
 class ToolRegistrationIn(BaseModel):
     """Schema aligned with API spec: accepts tool_name and code"""
@@ -39,25 +41,29 @@ class LLMToolRegistrationIn(BaseModel):
     description: constr(min_length=5, max_length=120)  # type: ignore
 
 @router.get("/tools", summary="List available tools")
-async def list_tools():
-    """List all available tools and their specifications."""
-    tools = tool_registry.list_tools()
-    # Debug: log current tool keys
-    try:
-        print(f"[tools] list -> {list(tools.keys())}")
-    except Exception:
-        pass
-    return tools
+async def list_tools(if_none_match: Optional[str] = Header(None)):
+    """List all available tools and their specifications.
+
+    The catalog carries an ETag; pollers sending it back in If-None-Match
+    get a 304 until a tool is registered.
+    """
+    tools, etag = get_global_registry().catalog()
+    # Revalidate every time, but only download when the catalog changed
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(tools, headers=headers)
 
 @router.post("/tools/register", status_code=200, summary="Register a new tool (async function or BaseTool)")
 async def register_tool(payload: ToolRegistrationIn) -> str:
     """Register a new tool from Python code with strict validation.
     Returns tool name string on success.
     """
+    tool_registry = get_global_registry()
     try:
         name = payload.tool_name.strip()
         # Ensure unique name
-        if name in tool_registry.list_tools().keys():
+        if tool_registry.has_tool(name):
             raise HTTPException(status_code=409, detail="Tool name already exists")
 
         # Basic line limit safety (approx ~60 lines)
@@ -82,9 +88,10 @@ async def register_llm_tool(payload: LLMToolRegistrationIn) -> ToolRegistrationO
     """Register an LLM-backed tool using only name/description/parameters.
     The tool forwards input to OpenAI Chat Completions with a system prompt built from description.
     """
+    tool_registry = get_global_registry()
     try:
         name = payload.name.strip()
-        if name in tool_registry.list_tools().keys():
+        if tool_registry.has_tool(name):
             raise HTTPException(status_code=409, detail="Tool name already exists")
 
         # Parameters are fixed as ["input"] for all LLM tools
@@ -99,7 +106,7 @@ async def register_llm_tool(payload: LLMToolRegistrationIn) -> ToolRegistrationO
 async def execute_tool(request: ToolExecutionRequest):
     """Execute a tool with the provided parameters."""
     try:
-        tool = tool_registry.create_tool(request.tool_type, **request.parameters)
+        tool = get_global_registry().create_tool(request.tool_type, **request.parameters)
         result = tool.run(**request.parameters)
         return {"result": result.content}
     except Exception as e:
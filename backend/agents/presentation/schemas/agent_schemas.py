@@ -15,7 +15,23 @@ class AgentResponse(BaseModel):
     tools: List[str]
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
+    version: int = 1
+
+
+class AgentImportRecord(BaseModel):
+    id: Optional[str] = None
+    name: str
+    description: str
+    tools: List[str] = []
+    # Present in GET /agents/export lines, so an export re-imports with its timestamps
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+class AgentImportResponse(BaseModel):
+    imported: int
 
 
 class AgentListResponse(BaseModel):
     agents: List[AgentResponse]
+    next_cursor: Optional[str] = None
@@ -25,3 +25,23 @@ class ExecutionResponse(BaseModel):
     status: str
     started_at: str
     completed_at: Optional[str] = None
+
+
+class ExecutionQueuedResponse(BaseModel):
+    id: str
+    agent_id: str
+    status: str
+    stream_url: str
+
+
+class ExecutionStatusResponse(BaseModel):
+    id: str
+    agent_id: str
+    query: str
+    status: str  # 'queued', 'running', 'completed' or 'failed'
+    steps: List[ExecutionStepResponse] = []
+    result: Optional[str] = None
+    error: Optional[str] = None
+    enqueued_at: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
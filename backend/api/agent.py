@@ -1,92 +1,284 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
-from typing import List
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional, Tuple
 import json
 import time
+import uuid
 import asyncio
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from models.agent import Agent
+from agents.core.entities.agent import Agent as AgentEntity
+from agents.core.events.agent_event_observer import AgentEvent, AgentEventType, get_global_event_observer
+from agents.core.repositories.agent_repository import AgentRepository
 from agents.core.services.tool_registry import get_global_registry
+from agents.application.commands.import_agents_command import ImportAgentsCommand
+from agents.application.commands.import_agents_handler import ImportAgentsHandler
+from agents.application.queries.export_agents_query import ExportAgentsQuery
+from agents.application.queries.export_agents_handler import ExportAgentsHandler
 from agents.application.orchestrator import stream_agent_events
+from agents.infrastructure.messaging.execution_buffer import ExecutionLog, get_global_execution_buffer
+from agents.infrastructure.monitoring.metrics import STREAMS_IN_FLIGHT
+from agents.infrastructure.monitoring.profiling import ExecutionProfiler, get_global_profile_store, should_profile
+from agents.infrastructure.persistence.agent_store import get_agent_store
+from agents.presentation.api.http_cache import gzip_body, json_response, not_modified, should_gzip, version_etag
+from agents.presentation.api.ndjson import iter_ndjson_lines
+from agents.presentation.api.pagination import decode_cursor, encode_cursor
+from agents.presentation.schemas.agent_schemas import AgentImportRecord, AgentImportResponse
 
 router = APIRouter()
 
-# In-memory storage for agents (will be replaced with a database)
-agents_db: dict[str, Agent] = {}
+# Agents live in the shared store selected by AGENT_STORE (see agent_store.py),
+# so every worker process serves the same set.
+LIST_PAGE_SIZE = 100
+LIST_PAGE_MAX = 500
+
+# Seconds of silence on a stream before a keep-alive comment is sent
+KEEPALIVE_SECONDS = 15.0
+
+# The fields of the API model; entities also carry version and timestamps
+_PUBLIC_FIELDS = set(Agent.model_fields)
+_AGENT_LIST = TypeAdapter(List[AgentEntity])
+# etag -> (body, gzipped body) of recent GET /agents pages, most recent last
+_LIST_BODIES: "OrderedDict[str, Tuple[bytes, Optional[bytes]]]" = OrderedDict()
+_LIST_BODIES_MAX = 64
 
 # Tools endpoints are defined in agents.presentation.api.tool_routes
 
 @router.post("/agents", response_model=Agent, status_code=201)
-async def create_agent(agent: Agent):
+async def create_agent(agent: Agent, store: AgentRepository = Depends(get_agent_store)):
     """Create a new agent."""
-    if agent.id in agents_db:
+    if await store.get_by_id(agent.id):
         raise HTTPException(status_code=400, detail="Agent with this ID already exists")
-    agents_db[agent.id] = agent
-    return agent
+    try:
+        # The store's primary key settles a race between two workers
+        created = await store.create(AgentEntity(**agent.model_dump()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Agent with this ID already exists")
+    # Queued for the observer's workers (and EVENT_STREAM=redis), not delivered inline
+    await get_global_event_observer().notify(AgentEvent(
+        agent_id=created.id,
+        event_type=AgentEventType.CREATED,
+        timestamp=time.time(),
+        data={"name": created.name},
+    ))
+    return created
 
 @router.get("/agents", response_model=List[Agent])
-async def list_agents():
-    """List all available agents."""
-    return list(agents_db.values())
+async def list_agents(
+    cursor: Optional[str] = None,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_PAGE_MAX),
+    store: AgentRepository = Depends(get_agent_store),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """List agents one keyset page at a time, ordered by id.
+
+    The body stays a plain list; when more agents may follow, the cursor for
+    the next page is in the X-Next-Cursor header. Each page has its own ETag
+    over its agents' ids, versions and update times, so a poll whose
+    If-None-Match still matches gets a 304 without a body being serialized.
+    Large pages are gzipped for clients that accept it.
+    """
+    agents = await store.list_all(limit, decode_cursor(cursor))
+    # A full page means there may be more; the client stops when the header is absent
+    next_cursor = encode_cursor(agents[-1].id) if len(agents) == limit else None
+    etag = _agents_etag(agents)
+    response = not_modified(if_none_match, etag)
+    if response is None:
+        body, gzipped = _list_body(etag, agents, accept_encoding)
+        response = json_response(body, etag, accept_encoding, gzipped)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+@router.post("/agents/import", response_model=AgentImportResponse, status_code=201)
+async def import_agents(
+    request: Request,
+    batch_size: int = Query(1000, ge=1, le=10000),
+    store: AgentRepository = Depends(get_agent_store),
+):
+    """Bulk-create agents from an NDJSON body, one agent object per line.
+
+    The body is streamed and written in batches inside one transaction:
+    a bad line or duplicate id rejects the whole import.
+    """
+    async def records():
+        line_no = 0
+        async for line in iter_ndjson_lines(request.stream()):
+            line_no += 1
+            try:
+                record = AgentImportRecord.model_validate_json(line)
+            except ValidationError as e:
+                raise HTTPException(status_code=400, detail=f"Line {line_no}: {e.errors()[0]['msg']}")
+            yield AgentEntity(**record.model_dump(exclude_none=True))
+
+    handler = ImportAgentsHandler(store, get_global_event_observer())
+    try:
+        imported = await handler.handle(ImportAgentsCommand(records=records(), batch_size=batch_size))
+    except ValueError:
+        raise HTTPException(status_code=409, detail="Import contains an agent id that already exists")
+    return AgentImportResponse(imported=imported)
+
+@router.get("/agents/export", summary="Stream all agents as NDJSON")
+async def export_agents(
+    batch_size: int = Query(1000, ge=1, le=10000),
+    store: AgentRepository = Depends(get_agent_store),
+):
+    """Every agent as one NDJSON line, timestamps included, read from the store in keyset batches."""
+    async def body():
+        # The store dependency stays open until the streamed body is finished
+        async for batch in ExportAgentsHandler(store).handle(ExportAgentsQuery(batch_size=batch_size)):
+            yield "".join(agent.model_dump_json() + "\n" for agent in batch)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
 
 @router.get("/agents/{agent_id}", response_model=Agent)
-async def get_agent(agent_id: str):
+async def get_agent(
+    agent_id: str,
+    store: AgentRepository = Depends(get_agent_store),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """Retrieve a single agent by its ID."""
-    agent = agents_db.get(agent_id)
+    agent = await store.get_by_id(agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
-    return agent
+    etag = _agents_etag([agent])
+    cached = not_modified(if_none_match, etag)
+    if cached is not None:
+        return cached
+    return json_response(agent.model_dump_json(include=_PUBLIC_FIELDS).encode(), etag, accept_encoding)
 
 
-@router.get("/agents/{agent_id}/stream")
-async def stream_agent_execution(agent_id: str, query: str):
-    """Server-Sent Events streaming execution for an agent.
-    Executes the agent's attached tools in sequence and streams progress + final result.
-    """
-    # Validate agent exists
-    agent = agents_db.get(agent_id)
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
+def _agents_etag(agents: List[AgentEntity]) -> str:
+    # Every persisted update bumps version; updated_at tells a re-created id apart
+    return version_etag(f"{a.id}:{a.version}:{a.updated_at}" for a in agents)
 
-    # Normalize query
-    q = (query or "").strip()
 
-    # Greeting / small-talk bypass
-    greetings = {"hi", "hello", "hey", "hola", "yo", "sup", "good morning", "good afternoon", "good evening"}
-    q_l = q.lower().strip()
+def _list_body(etag: str, agents: List[AgentEntity],
+               accept_encoding: Optional[str]) -> Tuple[bytes, Optional[bytes]]:
+    body, gzipped = _LIST_BODIES.pop(etag, (None, None))
+    if body is None:
+        body = _AGENT_LIST.dump_json(agents, include={"__all__": _PUBLIC_FIELDS})
+    if gzipped is None and should_gzip(body, accept_encoding):
+        # Compressed once per version of a page, however many clients poll it
+        gzipped = gzip_body(body)
+    _LIST_BODIES[etag] = (body, gzipped)
+    while len(_LIST_BODIES) > _LIST_BODIES_MAX:
+        _LIST_BODIES.popitem(last=False)
+    return body, gzipped
 
-    async def event_generator():
-        try:
-            # Connection ack
-            yield "data: {\"type\": \"connection\", \"status\": \"connected\"}\n\n"
 
-            # Greeting short-circuit
-            if q_l in greetings or any(q_l.startswith(g + " ") for g in greetings):
-                msg = "Hello! How can I help you today?"
-                yield f"data: {json.dumps({'type':'message','content': msg,'timestamp': time.time()})}\n\n"
-                yield f"data: {json.dumps({'type':'result','content': msg,'timestamp': time.time()})}\n\n"
-                yield "data: {\"type\": \"complete\"}\n\n"
+def _parse_last_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    # Event ids are "<execution_id>:<seq>"
+    if not value:
+        return None
+    execution_id, _, seq = value.rpartition(":")
+    if not execution_id or not seq.isdigit():
+        return None
+    return execution_id, int(seq)
+
+async def run_execution(log: ExecutionLog, agent, q: str, profiler: Optional[ExecutionProfiler] = None) -> None:
+    """Run one execution to completion, appending its events to `log`.
+
+    Runs as its own task, independent of any connection, so a client that
+    drops mid-execution can pick the rest up from the log. With a profiler,
+    each orchestrator step runs under it; the task's creator stores the profile.
+    """
+    try:
+        # Orchestrated execution with LangGraph, behind the query router (greetings
+        # are answered there); the generator blocks on tool I/O, so it is advanced
+        # on a worker thread
+        events = stream_agent_events(agent, q)
+        while True:
+            if profiler is None:
+                ev = await asyncio.to_thread(next, events, None)
+            else:
+                ev = await asyncio.to_thread(profiler.run, next, events, None)
+            if ev is None:
+                break
+            etype = ev.get('type')
+            content = ev.get('content')
+            if etype in {"message", "result"} and content is not None:
+                payload = {'type': etype, 'content': content, 'timestamp': time.time()}
+                step = ev.get('step')
+                if step:
+                    payload['tool'] = step['tool_name']
+                    payload['duration'] = step['duration']
+                if ev.get('route'):
+                    payload['route'] = ev['route']
+                if ev.get('cache'):
+                    payload['cache'] = ev['cache']
+                log.append(payload)
+        # Complete
+        log.append({'type': 'complete'})
+    except Exception as e:
+        log.append({'type': 'error', 'message': str(e)})
+    finally:
+        log.finish()
+
+async def execution_frames(log: ExecutionLog, last_seq: int) -> AsyncIterator[str]:
+    """SSE frames for everything in `log` after `last_seq`, following it live until it ends."""
+    with STREAMS_IN_FLIGHT.track(endpoint="agent_stream"):
+        # Connection ack
+        yield "data: {\"type\": \"connection\", \"status\": \"connected\"}\n\n"
+        while True:
+            for seq, payload in log.since(last_seq):
+                last_seq = seq
+                yield f"id: {log.execution_id}:{seq}\ndata: {json.dumps(payload)}\n\n"
+            if log.done and last_seq >= log.last_seq:
                 return
+            if not await log.wait(last_seq, timeout=KEEPALIVE_SECONDS):
+                # Comment frame: keeps idle proxies from closing a long tool call
+                yield ": keep-alive\n\n"
+
+@router.get("/agents/{agent_id}/stream")
+async def stream_agent_execution(
+    agent_id: str,
+    query: str,
+    last_event_id: Optional[str] = Header(None),
+    x_profile: Optional[str] = Header(None),
+    store: AgentRepository = Depends(get_agent_store),
+):
+    """Server-Sent Events streaming execution for an agent.
+    Executes the agent's attached tools in sequence and streams progress + final result.
+    A reconnect carrying Last-Event-ID resumes the same execution from the
+    buffered events instead of starting it again. With PROFILING=on, an
+    X-Profile header profiles the execution; X-Profile-Id names the result.
+    """
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+    }
+    buffer = get_global_execution_buffer()
+    resume = _parse_last_event_id(last_event_id)
+    log = buffer.get(resume[0]) if resume else None
+    if log is not None and log.agent_id == agent_id:
+        last_seq = resume[1]
+    else:
+        # Validate agent exists
+        agent = await store.get_by_id(agent_id)
+        if not agent:
+            raise HTTPException(status_code=404, detail="Agent not found")
 
-            # Orchestrated execution with LangGraph
-            for ev in stream_agent_events(agent, q):
-                etype = ev.get('type')
-                content = ev.get('content')
-                if etype in {"message", "result"} and content is not None:
-                    payload = {'type': etype, 'content': content, 'timestamp': time.time()}
-                    yield f"data: {json.dumps(payload)}\n\n"
-            # Complete
-            yield "data: {\"type\": \"complete\"}\n\n"
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+        # Normalize query
+        q = (query or "").strip()
+        log = buffer.start(str(uuid.uuid4()), agent_id)
+        profiler = ExecutionProfiler.start(log.execution_id, agent_id, q) if should_profile(x_profile) else None
+        if profiler is not None:
+            headers["X-Profile-Id"] = log.execution_id
+        log.task = asyncio.create_task(run_execution(log, agent, q, profiler))
+        if profiler is not None:
+            # A done-callback also runs for a task cancelled before its first step,
+            # which would otherwise hold the one-profile-at-a-time lock for good
+            log.task.add_done_callback(lambda _: get_global_profile_store().add(profiler.finish()))
+        last_seq = 0
 
     return StreamingResponse(
-        event_generator(),
+        execution_frames(log, last_seq),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+        headers=headers,
     )
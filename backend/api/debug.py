@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse, Response
+from typing import List
+
+from agents.infrastructure.monitoring.profiling import get_global_profile_store
+
+router = APIRouter()
+
+# Mounted only with PROFILING=on. Profiles come from executions started with
+# the X-Profile header (or picked by PROFILE_SAMPLE_RATE); the stream response
+# names its profile in X-Profile-Id.
+
+@router.get("/debug/profiles")
+async def list_profiles() -> List[dict]:
+    """Recent execution profiles, newest first."""
+    return [profile.summary() for profile in get_global_profile_store().list()]
+
+@router.get("/debug/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "pstats", sort: str = "cumulative", limit: int = 50):
+    """Download a profile: pstats (load with `python -m pstats` or snakeviz) or text."""
+    profile = get_global_profile_store().get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "text":
+        try:
+            return PlainTextResponse(profile.text(limit, sort))
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Unknown sort key: {sort}")
+    if format != "pstats":
+        raise HTTPException(status_code=400, detail="format must be pstats or text")
+    return Response(
+        profile.stats,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+    )
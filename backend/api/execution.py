@@ -0,0 +1,136 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+import json
+import re
+import time
+import uuid
+
+from agents.core.repositories.agent_repository import AgentRepository
+from agents.infrastructure.messaging.execution_queue import RedisExecutionQueue, RedisExecutionEvents
+from agents.infrastructure.monitoring.metrics import STREAMS_IN_FLIGHT, get_global_metrics
+from agents.infrastructure.persistence.agent_store import get_agent_store
+from agents.presentation.schemas.execution_schemas import (
+    ExecutionCreateRequest,
+    ExecutionQueuedResponse,
+    ExecutionStatusResponse,
+)
+
+router = APIRouter()
+
+# Redis stream ids, as sent in our `id:` lines
+_STREAM_ID = re.compile(r"\d+(?:-\d+)?")
+
+QUEUE_DEPTH = get_global_metrics().gauge("execution_queue_depth", "Queued executions by state (waiting, pending).", ["state"])
+
+# Executions are queued here and run by agents.application.execution_worker,
+# so the web tier only enqueues and relays events
+_QUEUE: Optional[RedisExecutionQueue] = None
+_EVENTS: Optional[RedisExecutionEvents] = None
+
+def get_execution_queue() -> RedisExecutionQueue:
+    global _QUEUE
+    if _QUEUE is None:
+        from agents.infrastructure.persistence.redis_client import redis_client
+        _QUEUE = RedisExecutionQueue(redis_client)
+    return _QUEUE
+
+def get_execution_events() -> RedisExecutionEvents:
+    global _EVENTS
+    if _EVENTS is None:
+        from agents.infrastructure.persistence.redis_client import redis_client
+        _EVENTS = RedisExecutionEvents(redis_client)
+    return _EVENTS
+
+@router.post("/executions", response_model=ExecutionQueuedResponse, status_code=202)
+async def enqueue_execution(
+    request: ExecutionCreateRequest,
+    store: AgentRepository = Depends(get_agent_store),
+    queue: RedisExecutionQueue = Depends(get_execution_queue),
+    events: RedisExecutionEvents = Depends(get_execution_events),
+):
+    """Queue an agent execution and return where to follow it."""
+    agent = await store.get_by_id(request.agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    execution_id = str(uuid.uuid4())
+    await events.set_status(
+        execution_id,
+        id=execution_id,
+        agent_id=agent.id,
+        query=request.query,
+        status="queued",
+        enqueued_at=time.time(),
+    )
+    await events.publish(execution_id, {"type": "status", "status": "queued"})
+    # The job carries the agent as it is now, so workers need no access to the agent store;
+    # version included, as the orchestrator scopes cached answers by (id, version)
+    await queue.enqueue({
+        "execution_id": execution_id,
+        "agent": agent.model_dump(include={"id", "name", "description", "tools", "version"}),
+        "query": request.query,
+    })
+    return ExecutionQueuedResponse(
+        id=execution_id,
+        agent_id=agent.id,
+        status="queued",
+        stream_url=f"/api/executions/{execution_id}/stream",
+    )
+
+@router.get("/executions/{execution_id}", response_model=ExecutionStatusResponse)
+async def get_execution(execution_id: str, events: RedisExecutionEvents = Depends(get_execution_events)):
+    status = await events.get_status(execution_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    fields = {k: v or None for k, v in status.items()}
+    fields["steps"] = json.loads(fields.get("steps") or "[]")
+    return ExecutionStatusResponse(**fields)
+
+async def refresh_queue_metrics() -> None:
+    """Read the queue depth into its gauge; called on each /metrics scrape."""
+    for state, count in (await get_execution_queue().depth()).items():
+        QUEUE_DEPTH.labels(state=state).set(count)
+
+async def execution_event_frames(
+    events: RedisExecutionEvents, execution_id: str, block_ms: int = 15000, last_id: str = "0"
+) -> AsyncIterator[str]:
+    """SSE frames for an execution after `last_id` (from the start by default) until it finishes."""
+    with STREAMS_IN_FLIGHT.track(endpoint="execution_stream"):
+        yield "data: {\"type\": \"connection\", \"status\": \"connected\"}\n\n"
+        while True:
+            batch = await events.read(execution_id, last_id, block_ms=block_ms)
+            if not batch:
+                # Keep idle proxies from closing the connection while the job waits
+                yield ": keep-alive\n\n"
+                if not await events.get_status(execution_id):
+                    return
+                continue
+            for entry_id, event in batch:
+                last_id = entry_id
+                yield f"id: {entry_id}\ndata: {json.dumps(event)}\n\n"
+                if event.get("type") in {"complete", "error"}:
+                    return
+
+@router.get("/executions/{execution_id}/stream")
+async def stream_execution(
+    execution_id: str,
+    last_event_id: Optional[str] = Header(None),
+    events: RedisExecutionEvents = Depends(get_execution_events),
+):
+    """Server-Sent Events for a queued execution, relayed from the worker running it.
+    Event ids are the Redis stream ids, so a reconnect resumes after Last-Event-ID.
+    """
+    if not await events.get_status(execution_id):
+        raise HTTPException(status_code=404, detail="Execution not found")
+    # Checked here: XREAD would reject a malformed id mid-stream, after the 200 went out.
+    # Like the in-process stream, an id we could not have sent replays from the start.
+    last_id = last_event_id if last_event_id and _STREAM_ID.fullmatch(last_event_id) else "0"
+    return StreamingResponse(
+        execution_event_frames(events, execution_id, last_id=last_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
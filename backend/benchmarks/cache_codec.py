@@ -0,0 +1,59 @@
+"""Encode/decode cost and stored bytes per agent for each cache codec.
+
+Usage:
+    python -m benchmarks.cache_codec --iterations 20000
+
+"json+validate" is the pre-codec read path (json.loads + Agent(**data)),
+kept as the baseline. Output is one JSON object per codec.
+"""
+import argparse
+import json
+import time
+
+from agents.core.entities.agent import Agent
+from agents.infrastructure.persistence.cache_codec import JsonCacheCodec, MsgpackCacheCodec
+
+
+def sample_agent() -> Agent:
+    return Agent(
+        name="Research Assistant",
+        description="Helps with research tasks by searching the web and summarizing results.",
+        tools=["web_search", "summarizer", "calculator"],
+        created_at="1730000000.123456",
+        updated_at="1730000000.123456",
+    )
+
+
+def timed(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    agent = sample_agent()
+    legacy = agent.model_dump_json()
+    print(json.dumps({
+        "codec": "json+validate",
+        "bytes": len(legacy.encode("utf-8")),
+        "encode_us": round(timed(agent.model_dump_json, args.iterations), 3),
+        "decode_us": round(timed(lambda: Agent(**json.loads(legacy)), args.iterations), 3),
+    }))
+
+    for codec in (JsonCacheCodec(), MsgpackCacheCodec()):
+        raw = codec.encode_agent(agent)
+        print(json.dumps({
+            "codec": codec.name,
+            "bytes": len(raw),
+            "encode_us": round(timed(lambda: codec.encode_agent(agent), args.iterations), 3),
+            "decode_us": round(timed(lambda: codec.decode_agent(raw), args.iterations), 3),
+        }))
+
+
+if __name__ == "__main__":
+    main()
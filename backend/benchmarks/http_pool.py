@@ -0,0 +1,94 @@
+"""Outbound request cost: a new httpx.Client per call (the old web_search) vs the shared pool.
+
+Usage:
+    python -m benchmarks.http_pool
+    python -m benchmarks.http_pool --requests 500 --threads 1,8
+
+A local keep-alive HTTP server answers every request. Each level sends
+--requests GETs from --threads threads, the way concurrent orchestrator
+steps would. One JSON object per (mode, threads) with the per-request
+median, p99 and throughput; pooled rows add the connections opened and
+the reuse ratio.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+import httpx
+
+from agents.infrastructure.external.http_pool import HTTP_POOL_CONNECTIONS, HTTP_POOL_REQUESTS, HTTPPool
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"AbstractText": "benchmark"}'
+        self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+                         % (len(body), body))
+
+    def log_message(self, *args):
+        pass
+
+
+def run_level(call: Callable[[], None], requests: int, threads: int) -> dict:
+    def timed(_: int) -> float:
+        start = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        samples: List[float] = list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+    samples.sort()
+    return {
+        "threads": threads,
+        "median_ms": round(statistics.median(samples) * 1e3, 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(0.99 * len(samples)))] * 1e3, 3),
+        "requests_per_second": round(requests / elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--threads", default="1,8")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{server.server_port}/"
+
+    def client_per_call() -> None:
+        with httpx.Client(timeout=10) as client:
+            client.get(url, params={"q": "x"}).raise_for_status()
+
+    pool = HTTPPool()
+
+    def pooled() -> None:
+        pool.request("GET", url, params={"q": "x"}).raise_for_status()
+
+    try:
+        for threads in (int(t) for t in args.threads.split(",")):
+            print(json.dumps({"mode": "client_per_call", **run_level(client_per_call, args.requests, threads)}),
+                  flush=True)
+            opened = HTTP_POOL_CONNECTIONS.labels(host="localhost").value
+            sent = HTTP_POOL_REQUESTS.labels(host="localhost").value
+            result = run_level(pooled, args.requests, threads)
+            opened = HTTP_POOL_CONNECTIONS.labels(host="localhost").value - opened
+            sent = HTTP_POOL_REQUESTS.labels(host="localhost").value - sent
+            result.update({"connections_opened": int(opened), "reuse_ratio": round(1 - opened / sent, 4)})
+            print(json.dumps({"mode": "pooled", **result}), flush=True)
+    finally:
+        pool.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Tail latency of LLM-style calls with and without hedging.
+
+Usage:
+    python -m benchmarks.llm_hedging --calls 2000 --concurrency 8
+
+The stub upstream has a lognormal body (~20ms) and a heavy Pareto tail on
+a few percent of calls, the shape of real completion latencies. Each
+configuration runs the same workload through a ResilientCaller; output is
+one JSON object per configuration with latency percentiles in ms and the
+extra load hedging added.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.infrastructure.external.resilient_call import ResilientCaller
+
+
+class HeavyTailedStub:
+    def __init__(self, median_ms: float, tail_probability: float, seed: int):
+        self.median = median_ms / 1000
+        self.tail_probability = tail_probability
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def __call__(self, timeout: float) -> str:
+        with self.lock:
+            self.requests += 1
+            latency = self.median * self.random.lognormvariate(0, 0.25)
+            if self.random.random() < self.tail_probability:
+                latency *= 5 * self.random.paretovariate(1.5)
+        time.sleep(min(latency, timeout))
+        return "ok"
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def run(label: str, caller: ResilientCaller, args) -> dict:
+    stub = HeavyTailedStub(args.median_ms, args.tail_probability, args.seed)
+
+    def one(_):
+        start = time.perf_counter()
+        caller.call(stub)
+        return time.perf_counter() - start
+
+    # Warm the latency history so hedging is armed from the first measured call
+    for _ in range(caller.min_samples):
+        caller.call(stub)
+    stub.requests = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = sorted(pool.map(one, range(args.calls)))
+    return {
+        "config": label,
+        "calls": args.calls,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "p999_ms": round(percentile(latencies, 0.999) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1),
+        "extra_requests_pct": round((stub.requests - args.calls) / args.calls * 100, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--median-ms", type=float, default=20.0)
+    parser.add_argument("--tail-probability", type=float, default=0.03)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    configs = [
+        ("no_hedge", dict(hedge_quantile=None)),
+        ("hedge_p95_budget_5pct", dict(hedge_quantile=0.95, hedge_budget=0.05)),
+        ("hedge_p90_budget_10pct", dict(hedge_quantile=0.90, hedge_budget=0.10)),
+    ]
+    for label, options in configs:
+        caller = ResilientCaller(label, attempt_timeout=5.0, max_attempts=1, **options)
+        print(json.dumps(run(label, caller, args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""Concurrent /agents/{id}/stream executions against the real app, offline.
+
+Usage:
+    python -m benchmarks.load_sse --clients 1,8,32 --requests 200
+    python -m benchmarks.load_sse --output runs.jsonl --baseline last.jsonl
+    python -m benchmarks.load_sse --record run.jsonl.gz --clients 1 --requests 20
+    python -m benchmarks.load_sse --cassette run.jsonl.gz --cassette-latency recorded
+
+Boots main.app under uvicorn on a background thread, with OpenAI and
+DuckDuckGo replaced by local stubs (benchmarks.upstream_stubs) and a
+throwaway SQLite agent store. Each level runs N closed-loop SSE clients
+until --requests executions have completed.
+
+--record runs against the live services instead (OPENAI_API_KEY required)
+and saves every exchange to a cassette; --cassette replays one with no
+network, so real responses can be benchmarked reproducibly
+(agents.infrastructure.external.http_cassette).
+
+Output is one JSON object per level: throughput, time to first event (the
+first event after the connection ack), total latency percentiles in ms,
+event-loop lag of the server's loop, and process RSS. --output appends the
+same lines with run metadata; --baseline adds ratios against a previous
+file's matching levels. Clients and server share one process (and GIL), so
+compare runs on the same machine rather than reading absolute numbers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.upstream_stubs import LatencyModel, UpstreamStubs
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        # ru_maxrss: peak, not current; KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if platform.system() == "Darwin" else peak / 1024
+
+
+class LoopMonitor:
+    """Samples event-loop lag (how late a short sleep wakes up) and RSS."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self.rss: List[float] = []
+
+    def reset(self) -> None:
+        self.lags, self.rss = [], []
+
+    async def run(self) -> None:
+        ticks = 0
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - start - self.interval, 0.0))
+            ticks += 1
+            if ticks % 10 == 0:
+                self.rss.append(rss_mb())
+
+
+class AppServer:
+    """main.app under uvicorn on its own thread and event loop."""
+
+    def __init__(self):
+        import uvicorn
+        import main
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        config = uvicorn.Config(main.app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.monitor = LoopMonitor()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread = threading.Thread(target=self._serve, name="app-server", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def _serve(self) -> None:
+        async def main():
+            self.loop = asyncio.get_running_loop()
+            self.loop.create_task(self.monitor.run())
+            await self.server.serve()
+        asyncio.run(main())
+
+    def start(self) -> "AppServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(10)
+
+
+async def one_execution(client, url: str, query: str) -> Dict[str, float]:
+    start = time.perf_counter()
+    first = None
+    events = 0
+    outcome = "incomplete"
+    async with client.stream("GET", url, params={"query": query}) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event.get("type") == "connection":
+                continue
+            events += 1
+            if first is None:
+                first = time.perf_counter() - start
+            if event.get("type") in ("complete", "error"):
+                outcome = event["type"]
+                break
+    return {"ttfe": first or 0.0, "total": time.perf_counter() - start, "events": events, "ok": outcome == "complete"}
+
+
+async def run_level(server: AppServer, agent_id: str, clients: int, requests: int) -> dict:
+    import httpx
+
+    url = f"{server.url}/api/agents/{agent_id}/stream"
+    results: List[Dict[str, float]] = []
+    errors = 0
+    issued = 0
+
+    async def client_loop(client):
+        nonlocal issued, errors
+        while issued < requests:
+            issued += 1
+            try:
+                results.append(await one_execution(client, url, f"load test query {issued}"))
+            except Exception:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        server.monitor.reset()
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if r["ok"]]
+    totals = sorted(r["total"] for r in ok)
+    ttfe = sorted(r["ttfe"] for r in ok)
+    lags = sorted(server.monitor.lags)
+    ms = lambda seconds: round(seconds * 1000, 1)
+    return {
+        "clients": clients,
+        "requests": requests,
+        "completed": len(ok),
+        "errors": errors + len(results) - len(ok),
+        "duration_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2),
+        "events_per_s": round(sum(r["events"] for r in ok) / elapsed, 1),
+        "ttfe_p50_ms": ms(percentile(ttfe, 0.50)),
+        "ttfe_p95_ms": ms(percentile(ttfe, 0.95)),
+        "ttfe_p99_ms": ms(percentile(ttfe, 0.99)),
+        "total_p50_ms": ms(percentile(totals, 0.50)),
+        "total_p95_ms": ms(percentile(totals, 0.95)),
+        "total_p99_ms": ms(percentile(totals, 0.99)),
+        "total_max_ms": ms(totals[-1] if totals else 0.0),
+        "loop_lag_p50_ms": ms(percentile(lags, 0.50)),
+        "loop_lag_p99_ms": ms(percentile(lags, 0.99)),
+        "loop_lag_max_ms": ms(lags[-1] if lags else 0.0),
+        "rss_start_mb": round(rss_before, 1),
+        "rss_peak_mb": round(max(server.monitor.rss + [rss_before]), 1),
+    }
+
+
+def run_metadata(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "benchmark": "load_sse",
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "tools": args.tools,
+        "llm_median_ms": args.llm_median_ms,
+        "search_median_ms": args.search_median_ms,
+        "tail_probability": args.tail_probability,
+        "cassette": args.cassette or args.record,
+        "cassette_latency": args.cassette_latency if args.cassette else None,
+    }
+
+
+def compare(result: dict, baseline: Dict[int, dict]) -> dict:
+    """Ratios against the baseline run at the same client count (>1 means higher now)."""
+    previous = baseline.get(result["clients"])
+    if not previous:
+        return {}
+    keys = ("throughput_rps", "ttfe_p99_ms", "total_p50_ms", "total_p99_ms", "loop_lag_p99_ms", "rss_peak_mb")
+    return {f"{k}_ratio": round(result[k] / previous[k], 3) for k in keys if previous.get(k)}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="executions per level")
+    parser.add_argument("--tools", default="web_search", help="the agent's tools (web_search adds summarizer)")
+    parser.add_argument("--llm-median-ms", type=float, default=300.0)
+    parser.add_argument("--search-median-ms", type=float, default=80.0)
+    parser.add_argument("--tail-probability", type=float, default=0.02)
+    parser.add_argument("--output", help="append results as JSON lines to this file")
+    parser.add_argument("--baseline", help="a previous --output file to compare against")
+    parser.add_argument("--record", help="call the live services and record them to this cassette")
+    parser.add_argument("--cassette", help="replay this cassette instead of the stubs")
+    parser.add_argument("--cassette-latency", default="recorded", help='"recorded", "none" or a median in ms')
+    args = parser.parse_args()
+    if args.record and args.cassette:
+        parser.error("--record and --cassette are exclusive")
+
+    stubs: Optional[UpstreamStubs] = None
+    # Must be in place before main (and the tools) are imported
+    if args.record:
+        os.environ.update({"HTTP_CASSETTE_MODE": "record", "HTTP_CASSETTE_PATH": args.record})
+    elif args.cassette:
+        os.environ.update({"HTTP_CASSETTE_MODE": "replay", "HTTP_CASSETTE_PATH": args.cassette,
+                           "HTTP_CASSETTE_LATENCY": args.cassette_latency})
+        # The SDK insists on a key; replay never sends it anywhere
+        os.environ.setdefault("OPENAI_API_KEY", "replay-key")
+    else:
+        stubs = UpstreamStubs(
+            LatencyModel(args.llm_median_ms, tail_probability=args.tail_probability),
+            LatencyModel(args.search_median_ms, tail_probability=args.tail_probability, seed=11),
+        ).start()
+        os.environ.update(stubs.environ())
+    workdir = tempfile.mkdtemp(prefix="load-sse-")
+    os.environ.update({"AGENT_STORE": "sqlite", "AGENT_STORE_PATH": os.path.join(workdir, "agents.db")})
+    os.environ.pop("EXECUTION_QUEUE", None)
+
+    import httpx
+
+    server = AppServer().start()
+    agent = {"id": "load-agent", "name": "Load", "description": "Load test agent",
+             "tools": [t for t in args.tools.split(",") if t]}
+    httpx.post(f"{server.url}/api/agents", json=agent).raise_for_status()
+
+    baseline: Dict[int, dict] = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            for line in f:
+                row = json.loads(line)
+                baseline[row["clients"]] = row
+
+    metadata = run_metadata(args)
+    levels = [int(c) for c in args.clients.split(",")]
+    # Warm-up: imports, first connections, tool construction
+    await run_level(server, agent["id"], max(levels), max(levels))
+    try:
+        for clients in levels:
+            before = dict(stubs.requests) if stubs else {}
+            result = await run_level(server, agent["id"], clients, args.requests)
+            if stubs:
+                result["upstream_requests"] = {k: v - before[k] for k, v in stubs.requests.items()}
+            result.update(compare(result, baseline))
+            print(json.dumps(result))
+            if args.output:
+                with open(args.output, "a") as f:
+                    f.write(json.dumps({**metadata, **result}) + "\n")
+    finally:
+        server.stop()
+        if stubs:
+            stubs.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+"""Microbenchmarks for ToolRegistry and orchestrator internals.
+
+Usage:
+    python -m benchmarks.registry_internals
+    python -m benchmarks.registry_internals --sizes 10,1000 --case create_tool
+    python -m benchmarks.registry_internals --save benchmarks/baselines/registry_internals.json
+    python -m benchmarks.registry_internals --compare benchmarks/baselines/registry_internals.json
+
+Each case runs against a registry holding N function tools (and a
+registered_tools.json of N entries) in a scratch directory. Timings are
+timeit-style: the loop count is grown until one round takes --min-time,
+then --rounds rounds are taken. One JSON object per (case, size) with the
+per-call median and minimum in microseconds.
+
+--save writes the results as a baseline; --compare adds each case's ratio
+to the baseline median and marks it a regression above --threshold. Only
+compare baselines recorded on the same machine.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from agents.application.orchestrator import _make_graph
+from agents.core.services.tool_registry import ToolRegistry
+
+NOOP_CODE = "def {name}(query=None, text=None):\n    return ''\n"
+LLM_CODE = "async def run(input):\n    return input[::-1]\n"
+
+
+class ScratchRegistry(ToolRegistry):
+    """A ToolRegistry persisting to its own file instead of config/."""
+
+    def __init__(self, path: str):
+        self.path = path
+        super().__init__()
+
+    def _persist_path(self) -> str:
+        return self.path
+
+
+def build_registry(size: int, workdir: str) -> ScratchRegistry:
+    """A registry with `size` no-op function tools and a matching persisted file."""
+    path = os.path.join(workdir, f"tools-{size}.json")
+    if os.path.exists(path):
+        os.remove(path)
+    registry = ScratchRegistry(path)
+    entries = []
+    for i in range(size):
+        name = f"noop_{i}"
+        entry = {"name": name, "kind": "function", "code": NOOP_CODE.format(name=name),
+                 "description": "No-op tool", "parameters": ["query", "text"]}
+        # apply_change builds the tool without rewriting the file each time
+        registry.apply_change(entry)
+        entries.append(entry)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+    return registry
+
+
+def measure(fn: Callable[[], object], min_time: float, rounds: int) -> Tuple[float, float, int]:
+    """Per-call (median, min) seconds over `rounds` rounds of an auto-ranged loop."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    samples = [elapsed / loops]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return statistics.median(samples), min(samples), loops
+
+
+def cases(registry: ScratchRegistry, size: int) -> Dict[str, Callable[[], object]]:
+    last = f"noop_{size - 1}"
+    graph = _make_graph(registry)
+    steps = 20
+    state = {"query": "q", "tools": [last] * steps, "index": 0, "context": "", "last_output": "", "step": None}
+    return {
+        "create_tool": lambda: registry.create_tool(last),
+        "create_tool_class": lambda: registry.create_tool("calculator"),
+        "list_tools": registry.list_tools,
+        # Re-registering an existing name keeps the registry at `size`
+        "register_from_code": lambda: registry.register_from_code(NOOP_CODE.format(name=last), last, "No-op tool"),
+        "save_persisted_entry": lambda: registry._save_persisted_entry(
+            last, "function", NOOP_CODE.format(name=last), "No-op tool", ["query", "text"]),
+        "save_persisted_llm_entry": lambda: registry._save_persisted_llm_entry("llm_tool", "Echoes", ["input"]),
+        "save_persisted_llm_code_entry": lambda: registry._save_persisted_llm_code_entry(
+            "llm_code_tool", "Reverses", LLM_CODE),
+        "make_graph": lambda: _make_graph(registry),
+        # One invoke runs `steps` no-op steps; reported per step below
+        "run_next_tool": lambda: graph.invoke(dict(state)),
+    }
+
+
+PER_CALL_DIVISOR = {"run_next_tool": 20}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,1000,10000")
+    parser.add_argument("--case", action="append", help="run only these cases (repeatable)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--save", help="write results to this baseline file")
+    parser.add_argument("--compare", help="baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="ratio above which a case is a regression")
+    args = parser.parse_args()
+
+    baseline: Dict[str, dict] = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {f"{r['case']}@{r['size']}": r for r in json.load(f)["results"]}
+
+    results: List[dict] = []
+    regressions = 0
+    with tempfile.TemporaryDirectory(prefix="registry-bench-") as workdir:
+        for size in (int(s) for s in args.sizes.split(",")):
+            registry = build_registry(size, workdir)
+            for case, fn in cases(registry, size).items():
+                if args.case and case not in args.case:
+                    continue
+                median, fastest, loops = measure(fn, args.min_time, args.rounds)
+                divisor = PER_CALL_DIVISOR.get(case, 1)
+                result = {
+                    "case": case,
+                    "size": size,
+                    "loops": loops,
+                    "median_us": round(median / divisor * 1e6, 2),
+                    "min_us": round(fastest / divisor * 1e6, 2),
+                }
+                previous = baseline.get(f"{case}@{size}")
+                if previous:
+                    result["ratio"] = round(result["median_us"] / previous["median_us"], 3)
+                    result["regression"] = result["ratio"] > args.threshold
+                    regressions += result["regression"]
+                print(json.dumps(result), flush=True)
+                results.append(result)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({"python": sys.version.split()[0], "recorded": time.strftime("%Y-%m-%d"),
+                       "results": results}, f, indent=2)
+            f.write("\n")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Lookup latency and memory of the semantic answer cache as it fills.
+
+Usage:
+    python -m benchmarks.semantic_cache
+    python -m benchmarks.semantic_cache --sizes 10000,100000,1000000 --lookups 2000
+
+Queries are synthetic: six to ten words drawn from a 5000-word made-up
+vocabulary, spread over 100 agent scopes. For each size the cache is filled, then
+--lookups reworded queries (hits: stored queries with two words swapped)
+and --lookups unseen queries (misses) are timed one by one. One JSON
+object per size with the median and p99 lookup in microseconds, the hit
+rate, and the traced memory per entry in bytes.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from typing import List
+
+from agents.infrastructure.persistence.semantic_cache import SemanticCache
+
+
+def vocabulary(rng: random.Random, size: int = 5000) -> List[str]:
+    letters = "etaoinshrdlcumwfgypbvk"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def synthetic_query(rng: random.Random, words: List[str]) -> str:
+    return " ".join(rng.choice(words) for _ in range(rng.randint(6, 10)))
+
+
+def reworded(query: str, rng: random.Random) -> str:
+    words = query.split()
+    i, j = rng.sample(range(len(words)), 2)
+    words[i], words[j] = words[j], words[i]
+    return " ".join(words)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(size: int, lookups: int, threshold: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    words = vocabulary(rng)
+    stored = [(f"agent-{i % 100}", synthetic_query(rng, words)) for i in range(size)]
+
+    tracemalloc.start()
+    cache = SemanticCache(threshold=threshold, max_entries=size, ttl=None)
+    for scope, query in stored:
+        cache.put(scope, query, "answer")
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    hit_times, miss_times, hits = [], [], 0
+    for scope, query in rng.sample(stored, min(lookups, size)):
+        query = reworded(query, rng)
+        start = time.perf_counter()
+        found = cache.get(scope, query)
+        hit_times.append(time.perf_counter() - start)
+        hits += found is not None
+    for _ in range(lookups):
+        scope, query = f"agent-{rng.randrange(100)}", synthetic_query(rng, words)
+        start = time.perf_counter()
+        cache.get(scope, query)
+        miss_times.append(time.perf_counter() - start)
+
+    return {
+        "entries": len(cache),
+        "hit_rate": round(hits / len(hit_times), 3),
+        "hit_median_us": round(statistics.median(hit_times) * 1e6, 1),
+        "hit_p99_us": round(percentile(hit_times, 0.99) * 1e6, 1),
+        "miss_median_us": round(statistics.median(miss_times) * 1e6, 1),
+        "miss_p99_us": round(percentile(miss_times, 0.99) * 1e6, 1),
+        "bytes_per_entry": round(memory / size),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(json.dumps(run(size, args.lookups, args.threshold, args.seed)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Cold-start time of the backend: `import main` plus the app's lifespan startup.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget-ms 700 --output startup.jsonl
+    python -m benchmarks.startup --runs 10 --top 20
+
+Each run is a fresh interpreter (`python -X importtime`), so nothing is
+cached in-process. Reported per run and as medians: interpreter-to-ready
+wall time, `import main`, and the lifespan (tool registry construction).
+The breakdown sums -X importtime self time by top-level package, which
+shows what an eager import costs.
+
+Exits 1 when the median import + lifespan time exceeds --budget-ms, or when
+`import main` loads any --forbid module: heavy SDKs (openai, langgraph,
+SQLAlchemy, httpx, redis) must only load on first use.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+FORBID = "openai,langgraph,langchain_core,sqlalchemy,httpx,redis"
+
+CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+forbidden = [m for m in sys.argv[1].split(",") if m and m in sys.modules]
+async def boot():
+    async with main.lifespan(main.app):
+        return time.perf_counter()
+ready = asyncio.run(boot())
+print(json.dumps({"import_s": imported - start, "lifespan_s": ready - imported, "forbidden": forbidden}))
+"""
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Self time in seconds by top-level package from -X importtime output."""
+    totals: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return totals
+
+
+def run_once(forbid: str) -> dict:
+    # Optional backends stay off so the default deployment is what gets measured
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("EXECUTION_QUEUE", "EVENT_STREAM", "TOOL_SYNC", "PROFILING")}
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD, forbid],
+                          cwd=BACKEND, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_s"] = wall
+    result["packages"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="packages shown in the breakdown")
+    parser.add_argument("--budget-ms", type=float, default=700.0, help="median import + lifespan budget")
+    parser.add_argument("--forbid", default=FORBID, help="modules `import main` must not load")
+    parser.add_argument("--output", help="append the summary as a JSON line to this file")
+    args = parser.parse_args()
+
+    runs: List[dict] = [run_once(args.forbid) for _ in range(args.runs)]
+    ms = lambda seconds: round(seconds * 1000, 1)
+    for i, r in enumerate(runs):
+        print(json.dumps({"run": i, "process_ms": ms(r["process_s"]), "import_ms": ms(r["import_s"]),
+                          "lifespan_ms": ms(r["lifespan_s"])}))
+
+    packages: Dict[str, List[float]] = defaultdict(list)
+    for r in runs:
+        for name, seconds in r["packages"].items():
+            packages[name].append(seconds)
+    breakdown = sorted(((name, statistics.median(v)) for name, v in packages.items()), key=lambda p: -p[1])
+    startup = statistics.median(r["import_s"] + r["lifespan_s"] for r in runs)
+    forbidden = sorted({m for r in runs for m in r["forbidden"]})
+    summary = {
+        "benchmark": "startup",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "process_ms": ms(statistics.median(r["process_s"] for r in runs)),
+        "import_ms": ms(statistics.median(r["import_s"] for r in runs)),
+        "lifespan_ms": ms(statistics.median(r["lifespan_s"] for r in runs)),
+        "startup_ms": ms(startup),
+        "budget_ms": args.budget_ms,
+        "over_budget": startup * 1000 > args.budget_ms,
+        "forbidden_loaded": forbidden,
+        "top_packages_ms": {name: ms(seconds) for name, seconds in breakdown[:args.top]},
+    }
+    print(json.dumps(summary))
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+    if summary["over_budget"] or forbidden:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
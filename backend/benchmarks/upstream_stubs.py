@@ -0,0 +1,125 @@
+"""Local stand-ins for OpenAI and DuckDuckGo with configurable latency.
+
+    stubs = UpstreamStubs(LatencyModel(400, tail_probability=0.02), LatencyModel(80))
+    stubs.start()
+    os.environ.update(stubs.environ())   # before the app is imported
+
+Serves POST /v1/chat/completions (OpenAI's response shape) and GET /duckduckgo
+(an Instant Answer payload) from a threaded HTTP server, sleeping for a
+latency drawn per request. Nothing leaves the machine.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+
+class LatencyModel:
+    """Lognormal body around `median_ms`, with a Pareto tail on `tail_probability` of requests."""
+
+    def __init__(self, median_ms: float, sigma: float = 0.25, tail_probability: float = 0.0, seed: int = 7):
+        self.median = median_ms / 1000
+        self.sigma = sigma
+        self.tail_probability = tail_probability
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self.lock:
+            latency = self.median * self.random.lognormvariate(0, self.sigma)
+            if self.tail_probability and self.random.random() < self.tail_probability:
+                latency *= 5 * self.random.paretovariate(1.5)
+        return latency
+
+
+SEARCH_RESULT = {
+    "AbstractText": "A stubbed abstract used for load testing.",
+    "AbstractURL": "https://example.com/abstract",
+    "Results": [{"Text": "Stub result", "FirstURL": "https://example.com/result"}],
+    "RelatedTopics": [{"Text": f"Related topic {i}"} for i in range(4)],
+}
+
+
+def completion(text: str) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 40, "total_tokens": 140},
+    }
+
+
+class UpstreamStubs:
+    def __init__(self, llm: LatencyModel, search: LatencyModel, host: str = "127.0.0.1", port: int = 0):
+        self.llm = llm
+        self.search = search
+        self.requests: Dict[str, int] = {"llm": 0, "search": 0}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environ(self) -> Dict[str, str]:
+        """Environment that points the app's clients at these stubs."""
+        return {
+            "OPENAI_API_KEY": "stub-key",
+            "OPENAI_BASE_URL": f"{self.url}/v1",
+            "DUCKDUCKGO_URL": f"{self.url}/duckduckgo",
+        }
+
+    def start(self) -> "UpstreamStubs":
+        threading.Thread(target=self.server.serve_forever, name="upstream-stubs", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _handler(self):
+        stubs = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                stubs._count("llm")
+                time.sleep(stubs.llm.sample())
+                self._reply(completion("A stubbed summary of the search results."))
+
+            def do_GET(self):
+                if not self.path.startswith("/duckduckgo"):
+                    self.send_error(404)
+                    return
+                stubs._count("search")
+                time.sleep(stubs.search.sample())
+                self._reply(SEARCH_RESULT)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
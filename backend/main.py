@@ -1,10 +1,54 @@
 # FastAPI main backend app entry point
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Importing this module stays cheap (see benchmarks/startup.py); the
+    # tool registry, Redis clients and sync listeners are built here instead
+    from agents.core.services.tool_registry import get_global_registry
+    registry = get_global_registry()
+
+    # Postgres schema: create_all() plus the idempotent column/index upgrades for older databases
+    if os.getenv("AGENT_STORE", "sqlite").lower() == "hybrid":
+        from agents.infrastructure.persistence.database import init_db
+        await init_db()
+
+    # Cross-process event fan-out: every worker appends its events to one Redis Stream
+    if os.getenv("EVENT_STREAM", "").lower() == "redis":
+        from agents.core.events.agent_event_observer import get_global_event_observer
+        from agents.infrastructure.messaging.redis_event_stream import RedisEventStream
+        from agents.infrastructure.persistence.redis_client import redis_client
+        get_global_event_observer().subscribe_batch(RedisEventStream(redis_client).publish_batch)
+
+    # Cross-worker tool registry: registrations on any worker reach the others via Redis
+    tool_registry_sync = None
+    if os.getenv("TOOL_SYNC", "").lower() == "redis":
+        from agents.infrastructure.messaging.tool_registry_sync import RedisToolRegistrySync
+        from agents.infrastructure.persistence.redis_client import redis_client
+        tool_registry_sync = RedisToolRegistrySync(redis_client, registry)
+        tool_registry_sync.start()
+
+    yield
+
+    # Deliver the events still queued while the Redis clients their subscribers
+    # write to are open; the queue workers are cancelled afterwards
+    from agents.core.events.agent_event_observer import get_global_event_observer
+    await get_global_event_observer().close()
+    if tool_registry_sync is not None:
+        await tool_registry_sync.stop()
+    from agents.infrastructure.persistence.agent_store import close_agent_store
+    await close_agent_store()
+    from agents.infrastructure.external.http_pool import close_http_pool
+    close_http_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS: allow local frontend dev server
 origins = [
@@ -17,6 +61,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paged GET /api/agents returns the next page's cursor in a header
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Import routers
@@ -28,6 +74,16 @@ app.include_router(agent_router, prefix="/api", tags=["Agents"])
 app.include_router(streaming_router, prefix="/api", tags=["Streaming"])
 app.include_router(tool_router, prefix="/api", tags=["Tools"])
 
+# Queued executions: POST /api/executions hands work to agents.application.execution_worker
+if os.getenv("EXECUTION_QUEUE", "").lower() == "redis":
+    from api.execution import router as execution_router
+    app.include_router(execution_router, prefix="/api", tags=["Executions"])
+
+# Execution profiles captured on request (X-Profile header) at /api/debug/profiles
+if os.getenv("PROFILING", "").lower() == "on":
+    from api.debug import router as debug_router
+    app.include_router(debug_router, prefix="/api", tags=["Debug"])
+
 @app.get("/", tags=["Root"])
 async def root():
     return {
@@ -40,3 +96,20 @@ async def root():
 @app.get('/health')
 async def health_check():
     return {'status': 'ok'}
+
+@app.get('/metrics', include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    from fastapi.responses import Response
+    from agents.infrastructure.monitoring.metrics import CONTENT_TYPE, get_global_metrics
+    if os.getenv("EXECUTION_QUEUE", "").lower() == "redis":
+        from api.execution import refresh_queue_metrics
+        try:
+            await refresh_queue_metrics()
+        except Exception as e:
+            # Report the rest even when Redis is unreachable
+            try:
+                print(f"[metrics] warn: queue depth unavailable: {e}")
+            except Exception:
+                pass
+    return Response(get_global_metrics().render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,133 @@
+import asyncio
+import time
+import pytest
+from agents.core.events.agent_event_observer import (
+    AgentEvent,
+    AgentEventObserver,
+    AgentEventType,
+    OverflowPolicy,
+)
+
+
+def make_event(i: int = 0) -> AgentEvent:
+    return AgentEvent(agent_id=f"agent-{i}", event_type=AgentEventType.CREATED, timestamp=time.time(), data={"i": i})
+
+
+class TestAgentEventObserver:
+    @pytest.mark.asyncio
+    async def test_notify_does_not_wait_for_subscribers(self):
+        """Test that a slow subscriber adds no latency to notify."""
+        observer = AgentEventObserver()
+        received = []
+        
+        async def slow(event):
+            await asyncio.sleep(0.2)
+            received.append(event)
+        
+        observer.subscribe(slow)
+        
+        started = time.perf_counter()
+        await observer.notify(make_event())
+        assert time.perf_counter() - started < 0.05
+        
+        await observer.close()
+        assert len(received) == 1
+    
+    @pytest.mark.asyncio
+    async def test_failing_subscriber_is_isolated(self):
+        """Test that one failing subscriber neither raises nor starves the others."""
+        observer = AgentEventObserver()
+        received = []
+        
+        async def broken(event):
+            raise RuntimeError("boom")
+        
+        async def healthy(event):
+            received.append(event)
+        
+        observer.subscribe(broken)
+        observer.subscribe(healthy)
+        
+        for i in range(3):
+            await observer.notify(make_event(i))
+        await observer.close()
+        
+        assert len(received) == 3
+        assert observer.stats()["failed"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_batch_subscriber_receives_lists(self):
+        """Test that batch subscribers get queued events grouped into one call."""
+        observer = AgentEventObserver(batch_size=10)
+        batches = []
+        
+        async def on_batch(events):
+            batches.append(len(events))
+        
+        observer.subscribe_batch(on_batch)
+        
+        for i in range(25):
+            await observer.notify(make_event(i))
+        await observer.close()
+        
+        assert sum(batches) == 25
+        assert max(batches) <= 10
+        assert len(batches) < 25
+    
+    @pytest.mark.asyncio
+    async def test_overflow_drop_oldest(self):
+        """Test that a full queue discards the oldest event and counts the drop."""
+        observer = AgentEventObserver(max_queue_size=2, overflow=OverflowPolicy.DROP_OLDEST)
+        received = []
+        
+        async def record(event):
+            received.append(event.data["i"])
+        
+        observer.subscribe(record)
+        
+        # No await between notifies, so the worker cannot drain in between
+        for i in range(4):
+            await observer.notify(make_event(i))
+        assert observer.queue_depth == 2
+        await observer.close()
+        
+        assert received == [2, 3]
+        assert observer.stats()["dropped"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_overflow_drop_newest(self):
+        """Test that DROP_NEWEST keeps the queued events and rejects the new one."""
+        observer = AgentEventObserver(max_queue_size=2, overflow=OverflowPolicy.DROP_NEWEST)
+        received = []
+        
+        async def record(event):
+            received.append(event.data["i"])
+        
+        observer.subscribe(record)
+        
+        for i in range(4):
+            await observer.notify(make_event(i))
+        await observer.close()
+        
+        assert received == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_stats_are_exported_as_metrics(self, monkeypatch):
+        """Test that the global observer's stats() shows up on /metrics."""
+        from agents.core.events import agent_event_observer
+        from agents.infrastructure.monitoring.metrics import get_global_metrics
+
+        async def handle(event):
+            pass
+
+        observer = AgentEventObserver(max_queue_size=8)
+        observer.subscribe(handle)
+        monkeypatch.setattr(agent_event_observer, "_GLOBAL_OBSERVER", observer)
+        for i in range(3):
+            await observer.notify(make_event(i))
+        await observer.close()
+
+        text = get_global_metrics().render()
+        assert "agent_events_queue_capacity 8" in text
+        assert 'agent_events_total{outcome="delivered"} 3' in text
+        assert 'agent_events_total{outcome="dropped"} 0' in text
@@ -1,10 +1,12 @@
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, Mock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
 from agents.core.entities.agent import Agent
 from agents.core.repositories.agent_repository import AgentRepository
 from agents.infrastructure.persistence.agent_repository import PostgreSQLAgentRepository
 from agents.infrastructure.persistence.hybrid_agent_repository import HybridAgentRepository
-from agents.infrastructure.persistence.redis_cache import RedisCache
+from agents.infrastructure.persistence.redis_cache import RedisCache, CachedAgent
 
 
 class TestPostgreSQLAgentRepository:
@@ -127,3 +129,255 @@ class TestHybridAgentRepository:
         
         # Verify the result
         assert result is expected_agent
+
+
+class TestKeysetPagination:
+    @pytest.fixture
+    def mock_db_session(self):
+        session = AsyncMock()
+        mock_result = Mock()
+        mock_result.scalars = Mock(return_value=Mock(all=Mock(return_value=[])))
+        session.execute = AsyncMock(return_value=mock_result)
+        return session
+    
+    def _compiled_sql(self, mock_db_session) -> str:
+        stmt = mock_db_session.execute.await_args.args[0]
+        return str(stmt.compile(compile_kwargs={"literal_binds": True}))
+    
+    @pytest.mark.asyncio
+    async def test_first_page_has_no_offset(self, mock_db_session):
+        """Test that the first page orders by id and never uses OFFSET."""
+        repo = PostgreSQLAgentRepository(mock_db_session)
+        
+        await repo.list_all(limit=10)
+        
+        sql = self._compiled_sql(mock_db_session)
+        assert "ORDER BY agents.id" in sql
+        assert "OFFSET" not in sql
+        assert "WHERE" not in sql
+    
+    @pytest.mark.asyncio
+    async def test_next_page_seeks_past_cursor(self, mock_db_session):
+        """Test that later pages seek past the previous page's last id."""
+        repo = PostgreSQLAgentRepository(mock_db_session)
+        
+        await repo.list_all(limit=10, after="abc")
+        
+        sql = self._compiled_sql(mock_db_session)
+        assert "agents.id > 'abc'" in sql
+        assert "OFFSET" not in sql
+    
+    def test_cursor_round_trip(self):
+        """Test that cursors are opaque but decode back to the last id."""
+        from agents.presentation.api.pagination import encode_cursor, decode_cursor
+        
+        cursor = encode_cursor("3f2c-uuid")
+        
+        assert cursor != "3f2c-uuid"
+        assert decode_cursor(cursor) == "3f2c-uuid"
+        assert decode_cursor(None) is None
+
+
+class TestCachedAgentListing:
+    @pytest.fixture
+    def mock_postgres_repo(self):
+        return AsyncMock()
+    
+    @pytest.fixture
+    def mock_redis_cache(self):
+        cache = AsyncMock()
+        cache.get_list_version = AsyncMock(return_value=7)
+        return cache
+    
+    @pytest.fixture
+    def repo(self, mock_postgres_repo, mock_redis_cache):
+        return HybridAgentRepository(mock_postgres_repo, mock_redis_cache)
+    
+    @pytest.mark.asyncio
+    async def test_list_served_from_cache(self, repo, mock_postgres_repo, mock_redis_cache):
+        """Test that a cached page for the current version skips PostgreSQL."""
+        page = [Agent(name="Test Agent", description="A test agent")]
+        mock_redis_cache.get_agent_list = AsyncMock(return_value=page)
+        
+        result = await repo.list_all(limit=10, after="cursor-id")
+        
+        mock_redis_cache.get_agent_list.assert_awaited_once_with(7, "cursor-id", 10)
+        mock_postgres_repo.list_all.assert_not_awaited()
+        assert result is page
+    
+    @pytest.mark.asyncio
+    async def test_list_miss_populates_cache(self, repo, mock_postgres_repo, mock_redis_cache):
+        """Test that a miss reads PostgreSQL and stores the page under the read version."""
+        page = [Agent(name="Test Agent", description="A test agent")]
+        mock_redis_cache.get_agent_list = AsyncMock(return_value=None)
+        mock_postgres_repo.list_all = AsyncMock(return_value=page)
+        
+        result = await repo.list_all(limit=10)
+        
+        mock_postgres_repo.list_all.assert_awaited_once_with(10, None)
+        mock_redis_cache.set_agent_list.assert_awaited_once_with(7, None, 10, page)
+        assert result is page
+    
+    @pytest.mark.asyncio
+    async def test_writes_bump_list_version(self, repo, mock_postgres_repo, mock_redis_cache):
+        """Test that create, update and delete each invalidate listings with one bump."""
+        agent = Agent(name="Test Agent", description="A test agent")
+        mock_postgres_repo.create = AsyncMock(return_value=agent)
+        mock_postgres_repo.update = AsyncMock(return_value=agent)
+        mock_postgres_repo.delete = AsyncMock(return_value=True)
+        
+        await repo.create(agent)
+        await repo.update(agent)
+        await repo.delete(agent.id)
+        
+        assert mock_redis_cache.bump_list_version.await_count == 3
+
+
+class TestHybridStampedeProtection:
+    @pytest.fixture
+    def mock_redis_cache(self):
+        cache = AsyncMock()
+        cache.lookup_agent = AsyncMock(return_value=CachedAgent(hit=False))
+        return cache
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self, mock_redis_cache):
+        """Test that concurrent misses for one id share a single PostgreSQL load."""
+        agent = Agent(name="Test Agent", description="A test agent")
+        
+        async def slow_get(_id):
+            await asyncio.sleep(0.01)
+            return agent
+        
+        mock_postgres_repo = AsyncMock()
+        mock_postgres_repo.get_by_id = AsyncMock(side_effect=slow_get)
+        repos = [HybridAgentRepository(mock_postgres_repo, mock_redis_cache) for _ in range(20)]
+        
+        results = await asyncio.gather(*[r.get_by_id(agent.id) for r in repos])
+        
+        assert mock_postgres_repo.get_by_id.await_count == 1
+        assert all(r is agent for r in results)
+        mock_redis_cache.set_agent.assert_awaited_once_with(agent)
+    
+    @pytest.mark.asyncio
+    async def test_missing_id_is_negatively_cached(self, mock_redis_cache):
+        """Test that a missing id writes a negative entry and later hits skip PostgreSQL."""
+        mock_postgres_repo = AsyncMock()
+        mock_postgres_repo.get_by_id = AsyncMock(return_value=None)
+        repo = HybridAgentRepository(mock_postgres_repo, mock_redis_cache)
+        
+        assert await repo.get_by_id("missing") is None
+        mock_redis_cache.set_missing.assert_awaited_once_with("missing")
+        
+        mock_redis_cache.lookup_agent = AsyncMock(return_value=CachedAgent(hit=True, ttl=25.0))
+        assert await repo.get_by_id("missing") is None
+        assert mock_postgres_repo.get_by_id.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_early_refresh_near_expiry(self, mock_redis_cache):
+        """Test that an entry about to expire is refreshed before it falls out."""
+        agent = Agent(name="Test Agent", description="A test agent")
+        mock_postgres_repo = AsyncMock()
+        mock_postgres_repo.get_by_id = AsyncMock(return_value=agent)
+        repo = HybridAgentRepository(mock_postgres_repo, mock_redis_cache)
+        
+        mock_redis_cache.lookup_agent = AsyncMock(return_value=CachedAgent(hit=True, agent=agent, ttl=3600.0))
+        await repo.get_by_id(agent.id)
+        mock_postgres_repo.get_by_id.assert_not_awaited()
+        
+        mock_redis_cache.lookup_agent = AsyncMock(return_value=CachedAgent(hit=True, agent=agent, ttl=0.0001))
+        with patch("agents.infrastructure.persistence.hybrid_agent_repository.random.random", return_value=0.999):
+            await repo.get_by_id(agent.id)
+        mock_postgres_repo.get_by_id.assert_awaited_once_with(agent.id)
+    
+    @pytest.mark.asyncio
+    async def test_update_overwrites_negative_entry(self, mock_redis_cache):
+        """Test that an update writes the agent with a plain SET instead of deleting."""
+        agent = Agent(name="Test Agent", description="A test agent")
+        mock_postgres_repo = AsyncMock()
+        mock_postgres_repo.update = AsyncMock(return_value=agent)
+        repo = HybridAgentRepository(mock_postgres_repo, mock_redis_cache)
+        
+        await repo.update(agent)
+        
+        mock_redis_cache.set_agent.assert_awaited_once_with(agent)
+        mock_redis_cache.invalidate_agent.assert_not_awaited()
+
+
+class TestVersionedUpdate:
+    @pytest.mark.asyncio
+    async def test_update_is_single_returning_statement(self):
+        """Test that update is one compare-and-set UPDATE ... RETURNING with no refresh."""
+        agent = Agent(name="Test Agent", description="A test agent", version=3)
+        returned = SimpleNamespace(id=agent.id, name="Test Agent", description="A test agent", tools=[], version=4,
+                                   created_at=None, updated_at=None)
+        mock_db_session = AsyncMock()
+        mock_result = Mock()
+        mock_result.scalar_one_or_none = Mock(return_value=returned)
+        mock_db_session.execute = AsyncMock(return_value=mock_result)
+        repo = PostgreSQLAgentRepository(mock_db_session)
+        
+        result = await repo.update(agent)
+        
+        mock_db_session.execute.assert_awaited_once()
+        mock_db_session.refresh.assert_not_awaited()
+        sql = str(mock_db_session.execute.await_args.args[0])
+        assert sql.startswith("UPDATE agents")
+        assert "WHERE agents.id = :id_1 AND agents.version = :version_2" in sql
+        assert "RETURNING" in sql
+        assert result.version == 4
+    
+    @pytest.mark.asyncio
+    async def test_stale_update_raises(self):
+        """Test that a version mismatch on an existing row raises StaleAgentError."""
+        from agents.core.repositories.agent_repository import StaleAgentError
+        
+        no_row = Mock(scalar_one_or_none=Mock(return_value=None))
+        exists = Mock(scalar_one_or_none=Mock(return_value="test-id"))
+        mock_db_session = AsyncMock()
+        mock_db_session.execute = AsyncMock(side_effect=[no_row, exists])
+        repo = PostgreSQLAgentRepository(mock_db_session)
+        
+        with pytest.raises(StaleAgentError):
+            await repo.update(Agent(id="test-id", name="Test Agent", description="A test agent"))
+        mock_db_session.commit.assert_not_awaited()
+
+
+class TestRecreateAfterDelete:
+    @pytest.fixture
+    def cache(self):
+        import fakeredis
+        return RedisCache(fakeredis.FakeAsyncRedis())
+
+    @pytest.mark.asyncio
+    async def test_delete_create_get(self, cache):
+        """Test that an id re-created after a delete is served, not hidden by the tombstone."""
+        agent = Agent(id="a1", name="Test Agent", description="A test agent")
+        mock_postgres_repo = AsyncMock()
+        mock_postgres_repo.delete = AsyncMock(return_value=True)
+        mock_postgres_repo.create = AsyncMock(return_value=agent)
+        repo = HybridAgentRepository(mock_postgres_repo, cache)
+
+        await repo.delete("a1")
+        await repo.create(agent)
+        found = await repo.get_by_id("a1")
+
+        assert found == agent
+        mock_postgres_repo.get_by_id.assert_not_awaited()
+        # Later read-through fills compare against the real version again
+        assert int(await cache.redis.get("agent:a1:version")) == agent.version
+
+
+class TestSchemaUpgrades:
+    def test_upgrades_cover_model_columns_and_indexes(self):
+        """Test that databases from older releases get the version column and every model index, idempotently."""
+        from sqlalchemy.dialects import postgresql
+        from agents.infrastructure.persistence.models import Base, schema_upgrades
+
+        statements = [str(s.compile(dialect=postgresql.dialect())) for s in schema_upgrades()]
+
+        assert "ALTER TABLE agents ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1" in statements
+        assert "CREATE INDEX IF NOT EXISTS ix_executions_agent_id_id ON executions (agent_id, id)" in statements
+        indexes = {index.name for table in Base.metadata.tables.values() for index in table.indexes}
+        assert {name for name in indexes if any(f" {name} " in s for s in statements)} == indexes
+        assert all("IF NOT EXISTS" in s for s in statements)
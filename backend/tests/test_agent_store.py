@@ -0,0 +1,304 @@
+import asyncio
+import json
+import multiprocessing
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from agents.core.entities.agent import Agent
+from agents.core.repositories.agent_repository import StaleAgentError
+from agents.infrastructure.persistence.agent_store import get_agent_store
+from agents.infrastructure.persistence.sqlite_agent_repository import SQLiteAgentRepository
+
+
+async def aiter_of(items):
+    for item in items:
+        yield item
+
+
+def create_in_other_process(path, agent_id):
+    async def run():
+        repo = SQLiteAgentRepository(path)
+        await repo.create(Agent(id=agent_id, name="Remote", description="Created by another worker"))
+        await repo.close()
+    asyncio.run(run())
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = SQLiteAgentRepository(str(tmp_path / "agents.db"))
+    yield repo
+    asyncio.run(repo.close())
+
+
+class TestSQLiteAgentRepository:
+    @pytest.mark.asyncio
+    async def test_create_and_get(self, repo):
+        """Test that a created agent round-trips with its tools and version."""
+        await repo.create(Agent(id="a1", name="Alpha", description="First", tools=["calc", "search"]))
+
+        agent = await repo.get_by_id("a1")
+
+        assert agent.name == "Alpha"
+        assert agent.tools == ["calc", "search"]
+        assert agent.version == 1
+        assert (await repo.get_by_name("Alpha")).id == "a1"
+        assert await repo.get_by_id("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_duplicate_id_rejected(self, repo):
+        """Test that the primary key rejects a second agent with the same id."""
+        await repo.create(Agent(id="a1", name="Alpha", description="First"))
+
+        with pytest.raises(ValueError):
+            await repo.create(Agent(id="a1", name="Again", description="Second"))
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages(self, repo):
+        """Test that list_all pages in id order from the cursor."""
+        await repo.bulk_create(aiter_of([[Agent(id=f"a{i:02d}", name=f"A{i}", description="d") for i in range(25)]]))
+
+        first = await repo.list_all(10)
+        second = await repo.list_all(10, first[-1].id)
+        streamed = [a.id async for page in repo.stream_all(10) for a in page]
+
+        assert [a.id for a in first] == [f"a{i:02d}" for i in range(10)]
+        assert second[0].id == "a10"
+        assert len(streamed) == 25
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_all_or_nothing(self, repo):
+        """Test that a duplicate in a later batch rolls back the whole import."""
+        batches = [[Agent(id="b1", name="B1", description="d")], [Agent(id="b1", name="B1", description="d")]]
+
+        with pytest.raises(Exception):
+            await repo.bulk_create(aiter_of(batches))
+
+        assert await repo.list_all() == []
+
+    @pytest.mark.asyncio
+    async def test_versioned_update(self, repo):
+        """Test that update bumps the version and rejects a stale writer."""
+        created = await repo.create(Agent(id="a1", name="Alpha", description="First"))
+
+        updated = await repo.update(created.model_copy(update={"name": "Renamed"}))
+
+        assert updated.version == 2
+        assert updated.name == "Renamed"
+        with pytest.raises(StaleAgentError):
+            await repo.update(created.model_copy(update={"name": "Lost race"}))
+        with pytest.raises(ValueError):
+            await repo.update(Agent(id="missing", name="x", description="y"))
+
+    @pytest.mark.asyncio
+    async def test_writes_visible_across_processes(self, repo):
+        """Test that an agent written by another process is read back here."""
+        await repo.list_all()  # open this side's connection first
+        process = multiprocessing.get_context("spawn").Process(
+            target=create_in_other_process, args=(repo.path, "remote-1")
+        )
+        process.start()
+        process.join(30)
+
+        assert process.exitcode == 0
+        assert (await repo.get_by_id("remote-1")).name == "Remote"
+
+
+class TestLiveAgentApi:
+    @pytest.fixture
+    def client(self, tmp_path):
+        from api.agent import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/api")
+        store = SQLiteAgentRepository(str(tmp_path / "agents.db"))
+
+        async def override():
+            yield store
+
+        app.dependency_overrides[get_agent_store] = override
+        with TestClient(app) as client:
+            yield client
+
+    def test_create_list_get(self, client):
+        """Test that the live endpoints keep their response shapes on the shared store."""
+        response = client.post("/api/agents", json={"id": "a1", "name": "Alpha", "description": "First", "tools": ["calc"]})
+
+        assert response.status_code == 201
+        assert response.json() == {"id": "a1", "name": "Alpha", "description": "First", "tools": ["calc"]}
+        assert client.post("/api/agents", json={"id": "a1", "name": "Dup", "description": "x"}).status_code == 400
+        assert [a["id"] for a in client.get("/api/agents").json()] == ["a1"]
+        assert client.get("/api/agents/a1").json()["name"] == "Alpha"
+        assert client.get("/api/agents/missing").status_code == 404
+
+    def test_create_emits_an_agent_event(self, client, monkeypatch):
+        """Test that creating an agent through the live API notifies the global event observer."""
+        from agents.core.events import agent_event_observer
+        received = []
+
+        async def handle(event):
+            received.append((event.agent_id, event.event_type, event.data["name"]))
+
+        observer = agent_event_observer.AgentEventObserver()
+        observer.subscribe(handle)
+        monkeypatch.setattr(agent_event_observer, "_GLOBAL_OBSERVER", observer)
+
+        client.post("/api/agents", json={"id": "a1", "name": "Alpha", "description": "First"})
+        client.post("/api/agents", json={"id": "a1", "name": "Dup", "description": "x"})
+        client.portal.call(observer.close)
+
+        assert received == [("a1", agent_event_observer.AgentEventType.CREATED, "Alpha")]
+
+    def test_list_is_paged_by_cursor(self, client):
+        """Test that GET /agents returns a page at a time and the next cursor walks the rest."""
+        for i in range(5):
+            client.post("/api/agents", json={"id": f"a{i}", "name": f"Agent {i}", "description": "x"})
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/agents", params=params)
+            seen += [a["id"] for a in response.json()]
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert seen == [f"a{i}" for i in range(5)]
+        assert pages == 3
+        assert client.get("/api/agents", params={"cursor": "_w"}).status_code == 400
+        assert client.get("/api/agents", params={"limit": 501}).status_code == 422
+
+    def test_each_page_revalidates(self, client):
+        """Test that a page answers 304 with its cursor until an agent on it changes."""
+        for i in range(3):
+            client.post("/api/agents", json={"id": f"a{i}", "name": f"Agent {i}", "description": "x"})
+        first = client.get("/api/agents", params={"limit": 2})
+
+        unchanged = client.get("/api/agents", params={"limit": 2}, headers={"If-None-Match": first.headers["ETag"]})
+        client.post("/api/agents", json={"id": "a0a", "name": "Inserted", "description": "x"})
+        changed = client.get("/api/agents", params={"limit": 2}, headers={"If-None-Match": first.headers["ETag"]})
+
+        assert unchanged.status_code == 304
+        assert unchanged.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+        assert changed.status_code == 200
+        assert [a["id"] for a in changed.json()] == ["a0", "a0a"]
+
+
+class TestConditionalGets:
+    @pytest.fixture
+    def api(self, tmp_path):
+        from api.agent import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/api")
+        store = SQLiteAgentRepository(str(tmp_path / "agents.db"))
+
+        async def override():
+            yield store
+
+        app.dependency_overrides[get_agent_store] = override
+        with TestClient(app) as client:
+            client.post("/api/agents", json={"id": "a1", "name": "Alpha", "description": "First", "tools": []})
+            yield client, store
+
+    def test_agent_etag_revalidates_until_updated(self, api):
+        """Test that GET /agents/{id} answers 304 until the agent's version changes."""
+        client, store = api
+        first = client.get("/api/agents/a1")
+        etag = first.headers["ETag"]
+
+        unchanged = client.get("/api/agents/a1", headers={"If-None-Match": etag})
+        agent = client.portal.call(store.get_by_id, "a1")
+        client.portal.call(store.update, agent.model_copy(update={"name": "Renamed"}))
+        changed = client.get("/api/agents/a1", headers={"If-None-Match": etag})
+
+        assert first.headers["Cache-Control"] == "private, no-cache"
+        assert unchanged.status_code == 304 and unchanged.content == b""
+        assert changed.status_code == 200 and changed.json()["name"] == "Renamed"
+        assert changed.headers["ETag"] != etag
+
+    def test_list_etag_changes_when_an_agent_is_added(self, api):
+        """Test that GET /agents revalidates against the whole set."""
+        client, _ = api
+        etag = client.get("/api/agents").headers["ETag"]
+
+        assert client.get("/api/agents", headers={"If-None-Match": etag}).status_code == 304
+        client.post("/api/agents", json={"id": "a2", "name": "Beta", "description": "Second"})
+        resp = client.get("/api/agents", headers={"If-None-Match": etag})
+
+        assert resp.status_code == 200
+        assert [a["id"] for a in resp.json()] == ["a1", "a2"]
+
+    def test_large_list_is_gzipped(self, api):
+        """Test that big lists are compressed for gzip clients, with their own ETag."""
+        client, _ = api
+        for i in range(40):
+            client.post("/api/agents", json={"id": f"bulk-{i:02d}", "name": "Bulk", "description": "x" * 40})
+
+        gz = client.get("/api/agents", headers={"Accept-Encoding": "gzip"})
+        plain = client.get("/api/agents", headers={"Accept-Encoding": "identity"})
+
+        assert gz.headers["Content-Encoding"] == "gzip"
+        assert gz.headers["Vary"] == "Accept-Encoding"
+        assert "content-encoding" not in plain.headers
+        assert gz.json() == plain.json() and len(plain.json()) == 41
+        assert gz.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+        revalidated = client.get("/api/agents", headers={"Accept-Encoding": "gzip", "If-None-Match": gz.headers["ETag"]})
+        assert revalidated.status_code == 304
+
+
+class TestBulkEndpoints:
+    @pytest.fixture
+    def client(self, tmp_path):
+        from main import app
+
+        store = SQLiteAgentRepository(str(tmp_path / "agents.db"))
+
+        async def override():
+            yield store
+
+        app.dependency_overrides[get_agent_store] = override
+        try:
+            yield TestClient(app)
+        finally:
+            app.dependency_overrides.clear()
+            asyncio.run(store.close())
+
+    def test_import_then_export(self, client):
+        """Test that the mounted app imports NDJSON and streams it back out."""
+        body = "".join(f'{{"id": "a{i}", "name": "Agent {i}", "description": "d", "tools": ["calc"]}}\n'
+                       for i in range(5))
+
+        imported = client.post("/api/agents/import?batch_size=2", content=body)
+        exported = client.get("/api/agents/export")
+
+        assert imported.status_code == 201 and imported.json() == {"imported": 5}
+        assert exported.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in exported.text.splitlines()]
+        assert [a["id"] for a in lines] == [f"a{i}" for i in range(5)]
+        assert client.get("/api/agents/a3").json()["tools"] == ["calc"]
+
+    def test_export_round_trip_keeps_timestamps(self, client):
+        """Test that re-importing an export keeps created_at and updated_at apart."""
+        line = json.dumps({"id": "a1", "name": "A", "description": "d", "created_at": "100.0", "updated_at": "200.0"})
+        client.post("/api/agents/import", content=line)
+
+        exported = json.loads(client.get("/api/agents/export").text)
+
+        assert (exported["created_at"], exported["updated_at"]) == ("100.0", "200.0")
+
+    def test_duplicate_id_rejects_whole_import(self, client):
+        """Test that a duplicate id answers 409 and imports nothing."""
+        body = '{"id": "dup", "name": "A", "description": "d"}\n{"id": "dup", "name": "B", "description": "d"}\n'
+
+        response = client.post("/api/agents/import", content=body)
+
+        assert response.status_code == 409
+        assert client.get("/api/agents/export").text == ""
+
+    def test_bad_line_is_reported(self, client):
+        """Test that a malformed line names its line number."""
+        response = client.post("/api/agents/import", content='{"name": "A", "description": "d"}\n{"name": 1}\n')
+
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Line 2:")
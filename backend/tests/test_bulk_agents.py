@@ -0,0 +1,155 @@
+import fakeredis
+import pytest
+from unittest.mock import AsyncMock, Mock
+from agents.core.entities.agent import Agent
+from agents.core.events.agent_event_observer import AgentEventObserver
+from agents.application.commands.import_agents_command import ImportAgentsCommand
+from agents.application.commands.import_agents_handler import ImportAgentsHandler
+from agents.infrastructure.persistence.agent_repository import PostgreSQLAgentRepository
+from agents.infrastructure.persistence.hybrid_agent_repository import HybridAgentRepository
+from agents.infrastructure.persistence.models import AgentModel
+from agents.infrastructure.persistence.redis_cache import RedisCache
+from agents.presentation.api.ndjson import iter_ndjson_lines
+
+
+async def aiter_of(items):
+    for item in items:
+        yield item
+
+
+async def collect(aiterable):
+    return [item async for item in aiterable]
+
+
+def make_agents(n):
+    return [Agent(name=f"Agent {i}", description="Bulk agent") for i in range(n)]
+
+
+class TestNdjsonLines:
+    @pytest.mark.asyncio
+    async def test_lines_split_across_chunks(self):
+        """Test that lines are reassembled regardless of chunk boundaries."""
+        chunks = [b'{"a": 1}\n{"b"', b': 2}\n\n', b'{"c": 3}']
+        
+        lines = await collect(iter_ndjson_lines(aiter_of(chunks)))
+        
+        assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+class TestImportAgentsHandler:
+    @pytest.mark.asyncio
+    async def test_records_are_batched(self):
+        """Test that records reach the repository in batch_size chunks."""
+        seen = []
+        
+        async def bulk_create(batches):
+            async for batch in batches:
+                seen.append(len(batch))
+            return sum(seen)
+        
+        mock_repo = AsyncMock()
+        mock_repo.bulk_create = bulk_create
+        handler = ImportAgentsHandler(mock_repo)
+        
+        imported = await handler.handle(ImportAgentsCommand(records=aiter_of(make_agents(25)), batch_size=10))
+        
+        assert imported == 25
+        assert seen == [10, 10, 5]
+
+
+    @pytest.mark.asyncio
+    async def test_events_follow_the_committed_import(self):
+        """Test that each imported agent is announced, and a failed import announces nothing."""
+        received = []
+
+        async def handle(event):
+            received.append(event.agent_id)
+
+        async def bulk_create(batches):
+            return sum([len(batch) async for batch in batches])
+
+        async def failing_bulk_create(batches):
+            async for _ in batches:
+                pass
+            raise ValueError("duplicate id")
+
+        observer = AgentEventObserver()
+        observer.subscribe(handle)
+        mock_repo = AsyncMock()
+        mock_repo.bulk_create = failing_bulk_create
+        with pytest.raises(ValueError):
+            await ImportAgentsHandler(mock_repo, observer).handle(ImportAgentsCommand(records=aiter_of(make_agents(2))))
+        agents = make_agents(3)
+        mock_repo.bulk_create = bulk_create
+        await ImportAgentsHandler(mock_repo, observer).handle(ImportAgentsCommand(records=aiter_of(agents), batch_size=2))
+        await observer.close()
+
+        assert received == [a.id for a in agents]
+
+class TestBulkRepositories:
+    @pytest.mark.asyncio
+    async def test_postgres_bulk_create_single_transaction(self):
+        """Test that each batch is one executemany and the import commits once."""
+        mock_db_session = AsyncMock()
+        repo = PostgreSQLAgentRepository(mock_db_session)
+        
+        count = await repo.bulk_create(aiter_of([make_agents(3), [], make_agents(2)]))
+        
+        assert count == 5
+        assert mock_db_session.execute.await_count == 2
+        assert len(mock_db_session.execute.await_args_list[0].args[1]) == 3
+        mock_db_session.commit.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_postgres_bulk_create_rolls_back_on_error(self):
+        """Test that a failing record stream rolls back the whole import."""
+        async def failing():
+            yield make_agents(2)
+            raise ValueError("bad line")
+        
+        mock_db_session = AsyncMock()
+        repo = PostgreSQLAgentRepository(mock_db_session)
+        
+        with pytest.raises(ValueError):
+            await repo.bulk_create(failing())
+        mock_db_session.commit.assert_not_awaited()
+        mock_db_session.rollback.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_hybrid_warms_cache_after_commit(self):
+        """Test that the cache is warmed once, after the insert, up to the warm limit."""
+        async def bulk_create(batches):
+            return sum([len(b) async for b in batches])
+        
+        mock_postgres_repo = Mock()
+        mock_postgres_repo.bulk_create = bulk_create
+        mock_redis_cache = AsyncMock()
+        repo = HybridAgentRepository(mock_postgres_repo, mock_redis_cache)
+        repo.bulk_warm_limit = 4
+        
+        count = await repo.bulk_create(aiter_of([make_agents(3), make_agents(3)]))
+        
+        assert count == 6
+        assert len(mock_redis_cache.warm_agents.await_args.args[0]) == 4
+        mock_redis_cache.bump_list_version.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_hybrid_import_caches_the_stored_timestamps(self):
+        """Test that agents warmed by an import match the rows a database load returns."""
+        mock_db_session = AsyncMock()
+        postgres_repo = PostgreSQLAgentRepository(mock_db_session)
+        cache = RedisCache(fakeredis.FakeAsyncRedis())
+        repo = HybridAgentRepository(postgres_repo, cache)
+        agents = [Agent(id="a1", name="Exported", description="x", created_at="1700000000.1234567",
+                        updated_at="1700000100.7654321", version=4), Agent(id="a2", name="New", description="y")]
+
+        await repo.bulk_create(aiter_of([agents]))
+
+        rows = mock_db_session.execute.await_args.args[1]
+        stored = {row["id"]: postgres_repo._model_to_entity(AgentModel(**row)) for row in rows}
+        for agent_id in ("a1", "a2"):
+            cached = (await cache.lookup_agent(agent_id)).agent
+            assert cached.created_at == stored[agent_id].created_at is not None
+            assert cached.updated_at == stored[agent_id].updated_at is not None
+            assert cached.version == stored[agent_id].version == 1
+        assert float(stored["a1"].updated_at) == pytest.approx(1700000100.765432)
@@ -0,0 +1,104 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from agents.core.entities.agent import Agent
+from agents.infrastructure.persistence.cache_codec import (
+    JsonCacheCodec,
+    MsgpackCacheCodec,
+    MSGPACK_SCHEMA_VERSION,
+    get_cache_codec,
+)
+from agents.infrastructure.persistence.redis_cache import RedisCache, NEGATIVE_ENTRY
+
+
+@pytest.fixture
+def agent():
+    return Agent(
+        name="Test Agent",
+        description="A test agent",
+        tools=["web_search", "summarizer"],
+        created_at="1730000000.0",
+    )
+
+
+class TestCacheCodecs:
+    @pytest.mark.parametrize("codec", [JsonCacheCodec(), MsgpackCacheCodec()])
+    def test_agent_round_trip(self, codec, agent):
+        """Test that every codec decodes exactly what it encoded."""
+        decoded = codec.decode_agent(codec.encode_agent(agent))
+        
+        assert isinstance(decoded, Agent)
+        assert decoded == agent
+        assert decoded.model_dump() == agent.model_dump()
+    
+    @pytest.mark.parametrize("codec", [JsonCacheCodec(), MsgpackCacheCodec()])
+    def test_list_round_trip(self, codec, agent):
+        """Test that list pages round-trip, including the empty page."""
+        other = Agent(name="Other", description="Another agent")
+        
+        assert codec.decode_agents(codec.encode_agents([agent, other])) == [agent, other]
+        assert codec.decode_agents(codec.encode_agents([])) == []
+    
+    def test_msgpack_is_smaller_than_json(self, agent):
+        """Test that the positional binary encoding stores fewer bytes."""
+        assert len(MsgpackCacheCodec().encode_agent(agent)) < len(JsonCacheCodec().encode_agent(agent))
+    
+    def test_msgpack_schema_version_mismatch_is_a_miss(self, agent):
+        """Test that entries written under another schema version are ignored."""
+        codec = MsgpackCacheCodec()
+        raw = codec.encode_agent(agent)
+        
+        assert raw[0] == MSGPACK_SCHEMA_VERSION
+        assert codec.decode_agent(bytes([MSGPACK_SCHEMA_VERSION + 1]) + raw[1:]) is None
+        assert codec.decode_agent(JsonCacheCodec().encode_agent(agent)) is None
+    
+    def test_unknown_codec_raises_error(self):
+        """Test that an unknown codec name is rejected."""
+        with pytest.raises(ValueError, match="Unknown cache codec"):
+            get_cache_codec("pickle")
+
+
+class TestRedisCacheCodec:
+    @pytest.mark.asyncio
+    async def test_set_and_get_use_codec(self, agent):
+        """Test that RedisCache stores codec bytes and decodes them on read."""
+        store = {}
+        
+        async def set_if_not_stale(keys, args):
+            store[keys[0]] = args[1]
+            return 1
+        
+        mock_redis = AsyncMock()
+        mock_redis.register_script = Mock(return_value=set_if_not_stale)
+        mock_redis.get = AsyncMock(side_effect=lambda key: store.get(key))
+        cache = RedisCache(mock_redis, MsgpackCacheCodec())
+        
+        await cache.set_agent(agent)
+        
+        assert store[f"agent:{agent.id}"][0] == MSGPACK_SCHEMA_VERSION
+        assert await cache.get_agent(agent.id) == agent
+    
+    @pytest.mark.asyncio
+    async def test_negative_entry_reads_as_none(self):
+        """Test that the negative sentinel is never handed to the codec."""
+        mock_redis = AsyncMock()
+        mock_redis.register_script = Mock()
+        mock_redis.get = AsyncMock(return_value=NEGATIVE_ENTRY)
+        cache = RedisCache(mock_redis, JsonCacheCodec())
+        
+        assert await cache.get_agent("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_set_agent_is_version_guarded(self, agent):
+        """Test that cache writes pass the agent version to the compare-and-set script."""
+        script = AsyncMock(return_value=0)
+        mock_redis = AsyncMock()
+        mock_redis.register_script = Mock(return_value=script)
+        cache = RedisCache(mock_redis, JsonCacheCodec())
+        agent.version = 4
+        
+        written = await cache.set_agent(agent)
+        
+        assert written is False
+        kwargs = script.await_args.kwargs
+        assert kwargs["keys"] == [f"agent:{agent.id}", f"agent:{agent.id}:version"]
+        assert kwargs["args"][0] == 4
@@ -0,0 +1,114 @@
+import json
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from agents.infrastructure.messaging.execution_buffer import ExecutionEventBuffer
+from agents.infrastructure.persistence.agent_store import get_agent_store
+from agents.infrastructure.persistence.sqlite_agent_repository import SQLiteAgentRepository
+
+
+def sse_events(body: str):
+    """Parse an SSE body into (id, payload) pairs, skipping comments."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if "data" in fields:
+            events.append((fields.get("id"), json.loads(fields["data"])))
+    return events
+
+
+class TestExecutionLog:
+    def test_sequential_ids_and_since(self):
+        """Test that events are numbered from 1 and since() returns only newer ones."""
+        log = ExecutionEventBuffer().start("exec-1", "agent-1")
+        for i in range(5):
+            log.append({"i": i})
+
+        assert [seq for seq, _ in log.since(0)] == [1, 2, 3, 4, 5]
+        assert [event["i"] for _, event in log.since(3)] == [3, 4]
+        assert log.since(5) == []
+
+    def test_ring_is_bounded(self):
+        """Test that the oldest events drop off and a stale cursor gets what is left."""
+        log = ExecutionEventBuffer(maxlen=3).start("exec-1", "agent-1")
+        for i in range(10):
+            log.append({"i": i})
+
+        assert len(log.events) == 3
+        assert [seq for seq, _ in log.since(2)] == [8, 9, 10]
+        assert [seq for seq, _ in log.since(8)] == [9, 10]
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out_without_events(self):
+        """Test that wait() reports a timeout when nothing new arrives."""
+        log = ExecutionEventBuffer().start("exec-1", "agent-1")
+
+        assert await log.wait(0, timeout=0.01) is False
+        log.append({"type": "message"})
+        assert await log.wait(0, timeout=0.01) is True
+
+
+class TestExecutionBufferCleanup:
+    def test_expired_logs_are_swept(self):
+        """Test that logs idle past the TTL are dropped when a new execution starts."""
+        buffer = ExecutionEventBuffer(ttl_seconds=60)
+        old = buffer.start("old", "agent-1")
+        old.finish()
+        old.updated_at -= 120
+
+        buffer.start("new", "agent-1")
+
+        assert buffer.get("old") is None
+        assert buffer.get("new") is not None
+
+    def test_max_executions_evicts_oldest(self):
+        """Test that the buffer never holds more than max_executions logs."""
+        buffer = ExecutionEventBuffer(max_executions=2)
+        for i in range(3):
+            buffer.start(f"exec-{i}", "agent-1")
+
+        assert len(buffer) == 2
+        assert buffer.get("exec-0") is None
+
+
+class TestResumableStream:
+    @pytest.fixture
+    def client(self, tmp_path):
+        from api.agent import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/api")
+        store = SQLiteAgentRepository(str(tmp_path / "agents.db"))
+
+        async def override():
+            yield store
+
+        app.dependency_overrides[get_agent_store] = override
+        with TestClient(app) as client:
+            client.post("/api/agents", json={"id": "a1", "name": "Alpha", "description": "First", "tools": ["calculator"]})
+            yield client
+
+    def test_reconnect_resumes_without_rerunning(self, client):
+        """Test that Last-Event-ID replays buffered events instead of executing again."""
+        calls = []
+
+        def fake_orchestrator(agent, query):
+            calls.append(query)
+            yield {"type": "message", "content": "step 1"}
+            yield {"type": "message", "content": "step 2"}
+            yield {"type": "result", "content": "done"}
+
+        with patch("api.agent.get_global_execution_buffer", return_value=ExecutionEventBuffer()), \
+                patch("api.agent.stream_agent_events", fake_orchestrator):
+            first = sse_events(client.get("/api/agents/a1/stream", params={"query": "2+2"}).text)
+            seen_id = first[1][0]
+            resumed = sse_events(client.get(
+                "/api/agents/a1/stream", params={"query": "2+2"}, headers={"Last-Event-ID": seen_id}
+            ).text)
+
+        assert calls == ["2+2"]
+        assert [event["type"] for _, event in first] == ["connection", "message", "message", "result", "complete"]
+        assert seen_id.endswith(":1")
+        assert [event.get("content") for _, event in resumed[1:]] == ["step 2", "done", None]
+        assert [event_id for event_id, _ in resumed[1:]] == [seen_id[:-1] + str(n) for n in (2, 3, 4)]
@@ -0,0 +1,281 @@
+import json
+import os
+import pytest
+import fakeredis
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from agents.application.execution_worker import ExecutionWorker
+from agents.core.entities.agent import Agent
+from agents.infrastructure.messaging.execution_queue import RedisExecutionQueue, RedisExecutionEvents
+from agents.infrastructure.persistence.agent_store import get_agent_store
+from agents.infrastructure.persistence.sqlite_agent_repository import SQLiteAgentRepository
+from api.execution import execution_event_frames, get_execution_events, get_execution_queue, router
+
+
+def make_job(execution_id="exec-1"):
+    return {
+        "execution_id": execution_id,
+        "agent": {"id": "agent-1", "name": "Helper", "description": "Helps", "tools": ["calculator"]},
+        "query": "2 + 2",
+    }
+
+
+def data_payloads(frames):
+    return [json.loads(line[len("data: "):]) for frame in frames for line in frame.split("\n") if line.startswith("data: ")]
+
+
+def fake_orchestrator(agent, query):
+    yield {"type": "message", "content": f"Processing query: {query}"}
+    yield {"type": "result", "content": "4"}
+    yield {"type": "complete"}
+
+
+def timed_orchestrator(agent, query):
+    step = {"id": "s1", "tool_name": "calculator", "input": {"query": query},
+            "output": {"content": "4"}, "timestamp": "0", "duration": 0.25}
+    yield {"type": "message", "content": "4", "step": step}
+    yield {"type": "result", "content": "4"}
+
+
+def failing_orchestrator(agent, query):
+    yield {"type": "message", "content": "Starting"}
+    raise RuntimeError("tool crashed")
+
+
+class TestExecutionQueue:
+    @pytest.fixture
+    def redis_client(self):
+        return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    @pytest.fixture
+    def queue(self, redis_client):
+        return RedisExecutionQueue(redis_client, stream="test-jobs", claim_idle_ms=0)
+
+    @pytest.mark.asyncio
+    async def test_enqueue_and_ack(self, queue, redis_client):
+        """Test that a job is delivered once and removed after acknowledgement."""
+        await queue.ensure_group()
+        await queue.enqueue(make_job())
+
+        entry_id, job = await queue.next_job("w1", block_ms=None)
+        await queue.ack(entry_id)
+
+        assert job == make_job()
+        assert await redis_client.xlen("test-jobs") == 0
+        assert await queue.next_job("w1", block_ms=None) is None
+
+    @pytest.mark.asyncio
+    async def test_abandoned_job_is_claimed(self, queue):
+        """Test that a job left pending by a dead worker goes to another one."""
+        await queue.ensure_group()
+        await queue.enqueue(make_job())
+        entry_id, _ = await queue.next_job("dead-worker", block_ms=None)
+
+        claimed = await queue.next_job("w2", block_ms=None)
+
+        assert claimed == (entry_id, make_job())
+
+    @pytest.mark.asyncio
+    async def test_restarted_worker_resumes_own_job(self, queue):
+        """Test that a worker's own unacknowledged job comes back to it first."""
+        queue.claim_idle_ms = 60_000
+        await queue.ensure_group()
+        await queue.enqueue(make_job("first"))
+        await queue.enqueue(make_job("second"))
+        await queue.next_job("w1", block_ms=None)
+
+        _, job = await queue.next_job("w1", block_ms=None)
+
+        assert job["execution_id"] == "first"
+
+    @pytest.mark.asyncio
+    async def test_depth(self, queue):
+        """Test that depth splits jobs waiting for a worker from jobs being run."""
+        assert await queue.depth() == {"waiting": 0, "pending": 0}
+        await queue.ensure_group()
+        for i in range(3):
+            await queue.enqueue(make_job(f"exec-{i}"))
+        await queue.next_job("w1", block_ms=None)
+
+        assert await queue.depth() == {"waiting": 2, "pending": 1}
+
+    @pytest.mark.asyncio
+    async def test_unreadable_job_is_dead_lettered(self, queue, redis_client):
+        """Test that an entry that is not a job is moved aside instead of redelivered."""
+        await queue.ensure_group()
+        await redis_client.xadd("test-jobs", {"job": "{not json"})
+        await queue.enqueue(make_job())
+
+        _, job = await queue.next_job("w1", block_ms=None)
+
+        dead = await redis_client.xrange("test-jobs:dead")
+        assert job == make_job()
+        assert [fields["job"] for _, fields in dead] == ["{not json"]
+        assert (await queue.depth())["pending"] == 1
+
+
+class TestExecutionWorker:
+    @pytest.fixture
+    def redis_client(self):
+        return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    @pytest.fixture
+    def worker(self, redis_client):
+        queue = RedisExecutionQueue(redis_client, stream="test-jobs")
+        return ExecutionWorker(queue, RedisExecutionEvents(redis_client), concurrency=1, name="test")
+
+    def test_default_names_differ_per_process(self, redis_client, monkeypatch):
+        """Test that two workers on one host never share a consumer name by default."""
+        monkeypatch.delenv("EXECUTION_WORKER_NAME", raising=False)
+        queue = RedisExecutionQueue(redis_client, stream="test-jobs")
+        monkeypatch.setattr(os, "getpid", lambda: 101)
+        first = ExecutionWorker(queue, RedisExecutionEvents(redis_client))
+        monkeypatch.setattr(os, "getpid", lambda: 102)
+        second = ExecutionWorker(queue, RedisExecutionEvents(redis_client))
+
+        assert first.name != second.name
+
+    @pytest.mark.asyncio
+    async def test_job_runs_and_publishes_events(self, worker, redis_client):
+        """Test that a worker runs the orchestrator, records the result and acks the job."""
+        await worker.queue.ensure_group()
+        await worker.queue.enqueue(make_job())
+
+        with patch("agents.application.execution_worker.stream_agent_events", fake_orchestrator):
+            processed = await worker.process_one("test-0", block_ms=None)
+
+        events = [event for _, event in await worker.events.read("exec-1")]
+        status = await worker.events.get_status("exec-1")
+        assert processed is True
+        assert [e["type"] for e in events] == ["status", "message", "result", "complete"]
+        assert status["status"] == "completed"
+        assert status["result"] == "4"
+        assert await redis_client.xlen("test-jobs") == 0
+
+    @pytest.mark.asyncio
+    async def test_step_timings_are_recorded(self, worker):
+        """Test that step durations reach the events and the execution status."""
+        await worker.queue.ensure_group()
+        await worker.queue.enqueue(make_job())
+
+        with patch("agents.application.execution_worker.stream_agent_events", timed_orchestrator):
+            await worker.process_one("test-0", block_ms=None)
+
+        events = [event for _, event in await worker.events.read("exec-1")]
+        status = await worker.events.get_status("exec-1")
+        assert events[1]["tool"] == "calculator"
+        assert events[1]["duration"] == 0.25
+        assert [s["duration"] for s in json.loads(status["steps"])] == [0.25]
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_failure_is_reported(self, worker):
+        """Test that a failing execution ends with an error event and failed status."""
+        with patch("agents.application.execution_worker.stream_agent_events", failing_orchestrator):
+            await worker.run_job(make_job())
+
+        events = [event for _, event in await worker.events.read("exec-1")]
+        assert events[-1] == {"type": "error", "message": "tool crashed", "timestamp": events[-1]["timestamp"]}
+        assert (await worker.events.get_status("exec-1"))["status"] == "failed"
+        assert worker.failed == 1
+
+    @pytest.mark.asyncio
+    async def test_sse_relays_events_until_complete(self, worker):
+        """Test that the SSE relay replays events from the start and stops at completion."""
+        with patch("agents.application.execution_worker.stream_agent_events", fake_orchestrator):
+            await worker.run_job(make_job())
+
+        frames = [frame async for frame in execution_event_frames(worker.events, "exec-1", block_ms=10)]
+
+        payloads = data_payloads(frames)
+        assert payloads[0]["type"] == "connection"
+        assert [p["type"] for p in payloads[1:]] == ["status", "message", "result", "complete"]
+
+    @pytest.mark.asyncio
+    async def test_sse_resumes_after_last_event_id(self, worker):
+        """Test that a reconnect only receives the events after the one it last saw."""
+        with patch("agents.application.execution_worker.stream_agent_events", fake_orchestrator):
+            await worker.run_job(make_job())
+        first = [frame async for frame in execution_event_frames(worker.events, "exec-1", block_ms=10)]
+        seen_id = first[2].split("\n")[0][len("id: "):]
+
+        resumed = [frame async for frame in execution_event_frames(worker.events, "exec-1", block_ms=10, last_id=seen_id)]
+
+        assert [p["type"] for p in data_payloads(resumed)[1:]] == ["result", "complete"]
+
+    @pytest.mark.asyncio
+    async def test_malformed_agent_fails_and_is_acked(self, worker, redis_client):
+        """Test that a job whose agent does not validate is recorded as failed and not replayed."""
+        await worker.queue.ensure_group()
+        await worker.queue.enqueue({**make_job(), "agent": {"tools": "not-a-list"}})
+
+        await worker.process_one("test-0", block_ms=None)
+
+        assert (await worker.events.get_status("exec-1"))["status"] == "failed"
+        assert await redis_client.xlen("test-jobs") == 0
+
+    @pytest.mark.asyncio
+    async def test_job_is_dead_lettered_after_max_deliveries(self, worker, redis_client):
+        """Test that a job redelivered past the cap is failed and dead-lettered without running."""
+        worker.queue.max_deliveries = 2
+        await worker.queue.ensure_group()
+        await worker.queue.enqueue(make_job())
+        # Two workers that died mid-run
+        for _ in range(2):
+            await worker.queue.next_job("test-0", block_ms=None)
+
+        with patch("agents.application.execution_worker.stream_agent_events",
+                   lambda agent, query: pytest.fail("ran a dead job")):
+            assert await worker.process_one("test-0", block_ms=None) is True
+
+        status = await worker.events.get_status("exec-1")
+        assert status["status"] == "failed"
+        assert status["error"] == "gave up after 2 deliveries"
+        assert await redis_client.xlen("test-jobs") == 0
+        assert await redis_client.xlen("test-jobs:dead") == 1
+
+
+class TestExecutionApi:
+    @pytest.fixture
+    def api(self, tmp_path):
+        redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        queue = RedisExecutionQueue(redis_client, stream="test-jobs")
+        events = RedisExecutionEvents(redis_client)
+        store = SQLiteAgentRepository(str(tmp_path / "agents.db"))
+
+        async def override():
+            yield store
+
+        app = FastAPI()
+        app.include_router(router, prefix="/api")
+        app.dependency_overrides[get_agent_store] = override
+        app.dependency_overrides[get_execution_queue] = lambda: queue
+        app.dependency_overrides[get_execution_events] = lambda: events
+        with TestClient(app) as client:
+            client.portal.call(queue.ensure_group)
+            yield client, store, queue
+
+    def test_job_carries_the_agent_version(self, api):
+        """Test that a queued job keeps the agent's version, which scopes its cached answers."""
+        client, store, queue = api
+        agent = client.portal.call(store.create, Agent(id="a1", name="Helper", description="Helps"))
+        client.portal.call(store.update, agent.model_copy(update={"name": "Renamed"}))
+
+        assert client.post("/api/executions", json={"agent_id": "a1", "query": "hi"}).status_code == 202
+
+        _, job = client.portal.call(queue.next_job, "w1", None)
+        assert job["agent"]["version"] == 2
+
+    @pytest.mark.parametrize("last_event_id", ["garbage", "exec-1:3", "1-2-3"])
+    def test_malformed_last_event_id_replays_from_start(self, api, last_event_id):
+        """Test that a Last-Event-ID that is not a stream id replays the execution instead of breaking the stream."""
+        client, store, queue = api
+        client.portal.call(store.create, Agent(id="a1", name="Helper", description="Helps"))
+        execution_id = client.post("/api/executions", json={"agent_id": "a1", "query": "hi"}).json()["id"]
+        events = client.app.dependency_overrides[get_execution_events]()
+        client.portal.call(events.publish, execution_id, {"type": "complete"})
+
+        response = client.get(f"/api/executions/{execution_id}/stream", headers={"Last-Event-ID": last_event_id})
+
+        assert response.status_code == 200
+        assert [p["type"] for p in data_payloads([response.text])] == ["connection", "status", "complete"]
@@ -0,0 +1,143 @@
+import gzip
+import json
+import time
+import httpx
+import pytest
+from openai import OpenAI
+from agents.infrastructure.external import http_cassette, web_search_tool
+from agents.infrastructure.external.http_cassette import (
+    CassetteMissError,
+    RecordingTransport,
+    ReplayTransport,
+    request_key,
+)
+
+
+def upstream(request: httpx.Request) -> httpx.Response:
+    """A fake upstream answering with the query (or body) it was sent."""
+    if request.method == "GET":
+        return httpx.Response(200, json={"AbstractText": f"About {request.url.params.get('q')}"})
+    prompt = json.loads(request.content)["messages"][-1]["content"]
+    return httpx.Response(200, json={
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": f"Reply to {prompt}"}}],
+    })
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    """A cassette recorded from two searches against the fake upstream."""
+    path = str(tmp_path / "upstream.jsonl.gz")
+    with httpx.Client(transport=RecordingTransport(path, httpx.MockTransport(upstream))) as client:
+        client.get("https://api.duckduckgo.com/", params={"q": "python", "format": "json"})
+        client.get("https://api.duckduckgo.com/", params={"q": "rust", "format": "json"})
+    return path
+
+
+class TestRecording:
+    def test_records_one_line_per_exchange(self, cassette):
+        """Test that each exchange is saved with status, body and latency."""
+        with gzip.open(cassette, "rt") as f:
+            entries = [json.loads(line) for line in f]
+
+        assert [e["status"] for e in entries] == [200, 200]
+        assert json.loads(entries[0]["body"]) == {"AbstractText": "About python"}
+        assert entries[0]["url"] == "https://api.duckduckgo.com/"
+        assert entries[0]["latency"] >= 0
+
+    def test_secrets_are_not_recorded(self, tmp_path):
+        """Test that request headers and bodies only appear hashed in the key."""
+        path = str(tmp_path / "c.jsonl.gz")
+        client = OpenAI(api_key="sk-secret", base_url="https://api.openai.com/v1", max_retries=0,
+                        http_client=httpx.Client(transport=RecordingTransport(path, httpx.MockTransport(
+                            lambda request: httpx.Response(200, json={"ok": True})))))
+        client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "private prompt"}])
+
+        with gzip.open(path, "rt") as f:
+            raw = f.read()
+        assert "sk-secret" not in raw
+        assert "private prompt" not in raw
+
+    def test_key_ignores_query_and_json_key_order(self):
+        """Test that equivalent requests share a key."""
+        a = httpx.Request("POST", "https://x/v1?b=2&a=1", json={"a": 1, "b": 2})
+        b = httpx.Request("POST", "https://x/v1?a=1&b=2", content=b'{"b": 2, "a": 1}')
+        c = httpx.Request("POST", "https://x/v1?a=1&b=2", json={"a": 1, "b": 3})
+
+        assert request_key(a) == request_key(b)
+        assert request_key(a) != request_key(c)
+
+
+class TestReplay:
+    def test_exact_match(self, cassette):
+        """Test that a recorded request gets its own response back."""
+        transport = ReplayTransport(cassette, latency="none")
+        with httpx.Client(transport=transport) as client:
+            resp = client.get("https://api.duckduckgo.com/", params={"format": "json", "q": "rust"})
+
+        assert resp.json() == {"AbstractText": "About rust"}
+        assert (transport.hits, transport.fallbacks) == (1, 0)
+
+    def test_unknown_request_falls_back_to_same_path(self, cassette):
+        """Test that a new query is served the path's recordings in rotation."""
+        transport = ReplayTransport(cassette, latency="none")
+        with httpx.Client(transport=transport) as client:
+            bodies = [client.get("https://api.duckduckgo.com/", params={"q": f"new {i}"}).json() for i in range(3)]
+
+        assert [b["AbstractText"] for b in bodies] == ["About python", "About rust", "About python"]
+        assert transport.fallbacks == 3
+
+    def test_strict_miss_raises(self, cassette):
+        """Test that strict replay refuses requests it has not seen."""
+        with httpx.Client(transport=ReplayTransport(cassette, latency="none", strict=True)) as client:
+            with pytest.raises(CassetteMissError):
+                client.get("https://api.duckduckgo.com/", params={"q": "new"})
+
+    def test_unknown_path_raises(self, cassette):
+        """Test that nothing is served for a path that was never recorded."""
+        with httpx.Client(transport=ReplayTransport(cassette, latency="none")) as client:
+            with pytest.raises(CassetteMissError):
+                client.get("https://api.openai.com/v1/models")
+
+    def test_synthetic_latency(self, cassette):
+        """Test that a median in ms delays each response around it."""
+        with httpx.Client(transport=ReplayTransport(cassette, latency="50")) as client:
+            start = time.perf_counter()
+            client.get("https://api.duckduckgo.com/", params={"q": "python", "format": "json"})
+            elapsed = time.perf_counter() - start
+
+        assert 0.02 < elapsed < 0.5
+
+    def test_openai_round_trip(self, tmp_path):
+        """Test that the OpenAI SDK gets the recorded completion back offline."""
+        path = str(tmp_path / "c.jsonl.gz")
+        messages = [{"role": "user", "content": "hello"}]
+        live = OpenAI(api_key="k", base_url="https://api.openai.com/v1", max_retries=0,
+                      http_client=httpx.Client(transport=RecordingTransport(path, httpx.MockTransport(upstream))))
+        live.chat.completions.create(model="gpt-4o-mini", messages=messages)
+
+        replay = OpenAI(api_key="other", base_url="https://api.openai.com/v1", max_retries=0,
+                        http_client=httpx.Client(transport=ReplayTransport(path, latency="none", strict=True)))
+        resp = replay.chat.completions.create(model="gpt-4o-mini", messages=messages)
+
+        assert resp.choices[0].message.content == "Reply to hello"
+
+
+class TestToolWiring:
+    def test_web_search_replays_without_network(self, cassette, monkeypatch):
+        """Test that WebSearchTool uses the process-wide cassette transport."""
+        # WebSearchTool sends more params than the cassette has, so only the path matches
+        monkeypatch.setattr(http_cassette, "_TRANSPORT", ReplayTransport(cassette, latency="none"))
+        monkeypatch.setattr(http_cassette, "HTTP_CASSETTE_MODE", "replay")
+        monkeypatch.setattr(web_search_tool, "DUCKDUCKGO_URL", "https://api.duckduckgo.com/")
+        output = web_search_tool.WebSearchTool().run(query="python")
+
+        assert "Abstract: About" in output.content
+
+    def test_no_transport_without_mode(self, monkeypatch):
+        """Test that clients use the network as usual when no cassette is set."""
+        monkeypatch.setattr(http_cassette, "HTTP_CASSETTE_MODE", "")
+
+        assert http_cassette.get_http_transport() is None
+        assert http_cassette.openai_http_client() is None
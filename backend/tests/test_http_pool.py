@@ -0,0 +1,223 @@
+import asyncio
+import shutil
+import ssl
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpcore
+import httpx
+import pytest
+from agents.core.services.tool_registry import ToolRegistry
+from agents.infrastructure.external import http_cassette, http_pool
+from agents.infrastructure.external.http_pool import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_DNS_LOOKUPS,
+    CachingNetworkBackend,
+    HTTPPool,
+)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = f"path={self.path}".encode()
+        # One write per response: split writes stall on delayed ACKs
+        self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://localhost:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool():
+    pool = HTTPPool()
+    yield pool
+    pool.close()
+
+
+class TestConnectionReuse:
+    def test_requests_share_one_connection(self, server, pool):
+        """Test that sequential requests to one host reuse a keep-alive connection."""
+        before = HTTP_POOL_CONNECTIONS.labels(host="localhost").value
+
+        bodies = [pool.request("GET", f"{server}/{i}").text for i in range(20)]
+
+        assert bodies == [f"path=/{i}" for i in range(20)]
+        assert HTTP_POOL_CONNECTIONS.labels(host="localhost").value == before + 1
+
+    def test_reuse_ratio_is_exported(self, server, pool):
+        """Test that the reuse ratio shows up on the metrics page."""
+        for _ in range(3):
+            pool.request("GET", server)
+
+        assert 'http_pool_connection_reuse_ratio{host="localhost"}' in http_pool._metrics.render()
+
+    def test_run_refuses_its_own_loop(self, pool):
+        """Test that blocking on the pool from its own loop fails instead of deadlocking."""
+        async def nested():
+            pool.run(asyncio.sleep(0))
+
+        with pytest.raises(RuntimeError):
+            pool.run(nested(), timeout=5)
+
+
+class TestPooledTransport:
+    @pytest.fixture
+    def tls_server(self, tmp_path):
+        if shutil.which("openssl") is None:
+            pytest.skip("openssl is needed to make a certificate")
+        cert, key = str(tmp_path / "cert.pem"), str(tmp_path / "key.pem")
+        subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+                        "-addext", "subjectAltName=DNS:localhost", "-keyout", key, "-out", cert],
+                       check=True, capture_output=True)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield f"https://localhost:{server.server_port}", cert
+        server.shutdown()
+        server.server_close()
+
+    def test_untrusted_certificate_is_rejected(self, tls_server, pool):
+        """Test that the pool verifies TLS certificates by default."""
+        url, _ = tls_server
+
+        with pytest.raises(httpx.ConnectError, match="CERTIFICATE_VERIFY_FAILED"):
+            pool.request("GET", url)
+
+    def test_verify_accepts_a_trusted_ca(self, tls_server):
+        """Test that a custom verify context reaches the connection pool."""
+        url, cert = tls_server
+        pool = HTTPPool(verify=ssl.create_default_context(cafile=cert))
+        try:
+            assert pool.request("GET", f"{url}/secure").text == "path=/secure"
+        finally:
+            pool.close()
+
+    def test_max_connections_is_honoured(self, server):
+        """Test that concurrent requests queue for the pool's connections instead of opening more."""
+        pool = HTTPPool(max_connections=1, max_keepalive=1)
+        before = HTTP_POOL_CONNECTIONS.labels(host="localhost").value
+
+        async def burst():
+            return await asyncio.gather(*(pool.client.get(f"{server}/{i}") for i in range(5)))
+
+        try:
+            responses = pool.run(burst())
+        finally:
+            pool.close()
+
+        assert [r.text for r in responses] == [f"path=/{i}" for i in range(5)]
+        assert HTTP_POOL_CONNECTIONS.labels(host="localhost").value == before + 1
+
+
+class TestDnsCache:
+    def test_second_lookup_is_cached(self):
+        """Test that a host is resolved once per TTL."""
+        backend = CachingNetworkBackend(ttl=60)
+        hits = HTTP_POOL_DNS_LOOKUPS.labels(result="hit").value
+
+        async def twice():
+            return await backend.resolve("localhost", 80), await backend.resolve("localhost", 80)
+
+        first, second = asyncio.run(twice())
+
+        assert first == second
+        assert HTTP_POOL_DNS_LOOKUPS.labels(result="hit").value == hits + 1
+
+    def test_failed_connect_forgets_the_address(self):
+        """Test that a refused connection drops the cached addresses."""
+        backend = CachingNetworkBackend(ttl=60)
+        with pytest.raises(httpcore.ConnectError):
+            asyncio.run(backend.connect_tcp("127.0.0.1", 1, timeout=1))
+
+        assert backend._addresses == {}
+
+
+class TestHostLimit:
+    def test_in_flight_requests_are_capped_per_host(self):
+        """Test that no more than max_per_host requests to a host run at once."""
+        in_flight, peak = [0], [0]
+
+        async def slow(request):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.02)
+            in_flight[0] -= 1
+            return httpx.Response(200)
+
+        pool = HTTPPool(max_per_host=2, transport=httpx.MockTransport(slow))
+
+        async def burst():
+            await asyncio.gather(*(pool.client.get("https://a.example/") for _ in range(6)))
+
+        try:
+            pool.run(burst())
+        finally:
+            pool.close()
+
+        assert peak[0] == 2
+
+
+class TestCassette:
+    def test_active_cassette_replaces_the_network(self, pool, monkeypatch):
+        """Test that requests go to the process-wide cassette while one is set."""
+        cassette = httpx.MockTransport(lambda request: httpx.Response(200, text="from cassette"))
+        monkeypatch.setattr(http_cassette, "_TRANSPORT", cassette)
+        monkeypatch.setattr(http_cassette, "HTTP_CASSETTE_MODE", "replay")
+
+        assert pool.request("GET", "https://api.duckduckgo.com/").text == "from cassette"
+
+
+class TestToolContext:
+    @pytest.fixture
+    def registry(self, tmp_path, monkeypatch, pool):
+        path = str(tmp_path / "registered_tools.json")
+        monkeypatch.setattr(ToolRegistry, "_persist_path", lambda self: path)
+        monkeypatch.setattr(http_pool, "_GLOBAL_HTTP_POOL", pool)
+        return ToolRegistry()
+
+    def test_async_tool_uses_shared_client(self, registry, server):
+        """Test that an async function tool gets the pool's client through `context`."""
+        registry.register_from_code(
+            "async def fetch(url, context):\n"
+            "    return (await context.http.get(url)).text\n",
+            "fetch",
+        )
+
+        output = registry.create_tool("fetch").run(url=f"{server}/page")
+
+        assert output.content == "path=/page"
+
+    def test_sync_tool_requests_through_context(self, registry, server):
+        """Test that a sync function tool can make blocking requests on the shared client."""
+        registry.register_from_code(
+            "def fetch(url, context):\n"
+            "    return context.request('GET', url).text\n",
+            "fetch",
+        )
+
+        assert registry.create_tool("fetch").run(url=f"{server}/sync").content == "path=/sync"
+
+    def test_context_is_not_a_listed_parameter(self, registry):
+        """Test that the injected argument is hidden from callers."""
+        registry.register_from_code("def fetch(url, context):\n    return url\n", "fetch")
+
+        assert registry.list_tools()["fetch"]["parameters"] == ["url"]
+
+    def test_class_tools_get_a_context(self, registry):
+        """Test that class-based tools find the context on self."""
+        tool = registry.create_tool("web_search")
+
+        assert tool.context is not None and tool.context.tool_name == "web_search"
@@ -0,0 +1,178 @@
+import asyncio
+import time
+import pytest
+import fakeredis
+from types import SimpleNamespace
+from agents.application import orchestrator
+from agents.core.services.tool_registry import ToolRegistry
+from agents.infrastructure.external.base_tool import TOOL_SECONDS
+from agents.infrastructure.monitoring.metrics import (
+    REDIS_SECONDS,
+    MetricsRegistry,
+    cache_hit_ratio,
+)
+from agents.infrastructure.persistence.redis_client import InstrumentedRedis
+
+
+class FakeInstrumentedRedis(fakeredis.aioredis.FakeRedis, InstrumentedRedis):
+    """In-memory Redis with the production client's instrumentation."""
+    pass
+
+
+def sample(text, line_prefix):
+    """The value of the first exposition line starting with `line_prefix`."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not in output")
+
+
+class TestMetricsRegistry:
+    def test_histogram_exposition(self):
+        """Test that a histogram renders cumulative buckets, sum and count."""
+        metrics = MetricsRegistry()
+        hist = metrics.histogram("step_seconds", "Step latency.", ["tool", "outcome"], buckets=[0.1, 1.0])
+
+        hist.labels(tool="calc", outcome="ok").observe(0.05)
+        hist.labels(tool="calc", outcome="ok").observe(0.1)
+        hist.labels(tool="calc", outcome="ok").observe(5.0)
+        text = metrics.render()
+
+        assert "# TYPE step_seconds histogram" in text
+        assert sample(text, 'step_seconds_bucket{tool="calc",outcome="ok",le="0.1"}') == 2
+        assert sample(text, 'step_seconds_bucket{tool="calc",outcome="ok",le="1"}') == 2
+        assert sample(text, 'step_seconds_bucket{tool="calc",outcome="ok",le="+Inf"}') == 3
+        assert sample(text, 'step_seconds_count{tool="calc",outcome="ok"}') == 3
+        assert sample(text, 'step_seconds_sum{tool="calc",outcome="ok"}') == pytest.approx(5.15)
+
+    def test_time_labels_outcome(self):
+        """Test that timing a block records ok or error by how it exits."""
+        metrics = MetricsRegistry()
+        hist = metrics.histogram("call_seconds", "Call latency.", ["tool", "outcome"])
+
+        with hist.time(tool="t"):
+            pass
+        with pytest.raises(ValueError):
+            with hist.time(tool="t"):
+                raise ValueError("boom")
+
+        text = metrics.render()
+        assert sample(text, 'call_seconds_count{tool="t",outcome="ok"}') == 1
+        assert sample(text, 'call_seconds_count{tool="t",outcome="error"}') == 1
+
+    def test_gauges_track_and_collect(self):
+        """Test in-progress tracking and scrape-time collected values."""
+        metrics = MetricsRegistry()
+        streams = metrics.gauge("streams", "Open streams.", ["endpoint"])
+        depth = {"value": 3}
+        metrics.gauge("depth", "Queue depth.", collect=lambda: {(): depth["value"]})
+
+        with streams.track(endpoint="agent"):
+            assert sample(metrics.render(), 'streams{endpoint="agent"}') == 1
+        depth["value"] = 7
+
+        text = metrics.render()
+        assert sample(text, 'streams{endpoint="agent"}') == 0
+        assert sample(text, "depth ") == 7
+
+    def test_cache_hit_ratio(self):
+        """Test that the hit ratio gauge is derived from the request counter."""
+        metrics = MetricsRegistry()
+        requests = metrics.counter("cache_requests_total", "Lookups.", ["cache", "result"])
+        metrics.gauge("cache_hit_ratio", "Hit ratio.", ["cache"], collect=cache_hit_ratio(requests))
+
+        requests.labels(cache="agents", result="hit").inc(3)
+        requests.labels(cache="agents", result="miss").inc()
+
+        assert sample(metrics.render(), 'cache_hit_ratio{cache="agents"}') == 0.75
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes and newlines in label values cannot break the format."""
+        metrics = MetricsRegistry()
+        metrics.counter("tool_errors_total", "Errors.", ["tool"]).labels(tool='say "hi"\n').inc()
+
+        assert 'tool_errors_total{tool="say \\"hi\\"\\n"} 1' in metrics.render()
+
+    def test_recording_is_cheap(self):
+        """Test that observing a labelled histogram stays in the microsecond range."""
+        hist = MetricsRegistry().histogram("hot_seconds", "Hot path.", ["tool", "outcome"])
+        n = 20_000
+
+        start = time.perf_counter()
+        for _ in range(n):
+            hist.labels(tool="calc", outcome="ok").observe(0.01)
+        per_call = (time.perf_counter() - start) / n
+
+        assert per_call < 20e-6
+
+
+class TestInstrumentation:
+    @pytest.fixture
+    def persist_path(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "registered_tools.json")
+        monkeypatch.setattr(ToolRegistry, "_persist_path", lambda self: path)
+        return path
+
+    def test_orchestrator_steps_are_timed(self, persist_path, monkeypatch):
+        """Test that each step carries a measured duration and lands in the step histogram."""
+        registry = ToolRegistry()
+        registry.register_from_code(
+            "import time\ndef slow_echo(query):\n    time.sleep(0.02)\n    return query.upper()\n", "slow_echo"
+        )
+        monkeypatch.setattr(orchestrator, "get_global_registry", lambda: registry)
+        before = orchestrator.STEP_SECONDS.labels(tool="slow_echo", outcome="ok").count
+        agent = SimpleNamespace(name="timed", tools=["slow_echo", "no_such_tool"])
+
+        steps = [ev["step"] for ev in orchestrator.stream_agent_events(agent, "ping") if "step" in ev]
+
+        assert [s["tool_name"] for s in steps] == ["slow_echo", "no_such_tool"]
+        assert steps[0]["duration"] >= 0.02
+        assert steps[0]["output"] == {"content": "PING"}
+        assert steps[1]["output"] == {"skipped": True}
+        assert orchestrator.STEP_SECONDS.labels(tool="slow_echo", outcome="ok").count == before + 1
+
+    def test_tool_error_outputs_are_labelled_errors(self, persist_path, monkeypatch):
+        """Test that a tool returning an error output counts as an error, for the tool and the step."""
+        registry = ToolRegistry()
+        registry.register_from_code(
+            "from agents.infrastructure.external.base_tool import BaseTool, ToolOutput\n"
+            "class Flaky(BaseTool):\n"
+            "    name = 'flaky'\n"
+            "    description = 'Fails without raising'\n"
+            "    def _run(self, **kwargs):\n"
+            "        return ToolOutput(content='Flaky error: upstream down', error='upstream down')\n",
+            "flaky",
+        )
+        monkeypatch.setattr(orchestrator, "get_global_registry", lambda: registry)
+        tool_errors = TOOL_SECONDS.labels(tool="flaky", outcome="error")
+        step_errors = orchestrator.STEP_SECONDS.labels(tool="flaky", outcome="error")
+        tool_before, step_before = tool_errors.count, step_errors.count
+        agent = SimpleNamespace(name="flaky", tools=["flaky"])
+
+        steps = [ev["step"] for ev in orchestrator.stream_agent_events(agent, "ping") if "step" in ev]
+
+        assert steps[0]["output"] == {"content": "Flaky error: upstream down", "error": "upstream down"}
+        assert tool_errors.count == tool_before + 1
+        assert step_errors.count == step_before + 1
+        assert TOOL_SECONDS.labels(tool="flaky", outcome="ok").count == 0
+
+    def test_redis_commands_are_timed(self):
+        """Test that commands and pipelines on the instrumented client are timed."""
+        client = FakeInstrumentedRedis(decode_responses=True)
+        gets = REDIS_SECONDS.labels(command="get", outcome="ok")
+        pipelines = REDIS_SECONDS.labels(command="pipeline", outcome="ok")
+        gets_before, pipelines_before = gets.count, pipelines.count
+
+        async def run():
+            await client.set("k", "v")
+            assert await client.get("k") == "v"
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.get("k")
+                pipe.incr("n")
+                assert await pipe.execute() == ["v", 1]
+            await client.aclose()
+
+        asyncio.run(run())
+
+        assert gets.count == gets_before + 1
+        assert pipelines.count == pipelines_before + 1
@@ -0,0 +1,133 @@
+import asyncio
+import marshal
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from agents.core.entities.agent import Agent
+from agents.infrastructure.messaging.execution_buffer import ExecutionEventBuffer
+from agents.infrastructure.monitoring import profiling
+from agents.infrastructure.monitoring.profiling import ExecutionProfile, ExecutionProfiler, ProfileStore
+from agents.infrastructure.persistence.agent_store import get_agent_store
+from agents.infrastructure.persistence.sqlite_agent_repository import SQLiteAgentRepository
+
+
+def slow_step():
+    time.sleep(0.01)
+    return "done"
+
+
+class TestProfiler:
+    def test_profile_captures_steps(self):
+        """Test that calls run through the profiler land in pstats data."""
+        profiler = ExecutionProfiler.start("exec-1", "a1", "q")
+        profiler.run(slow_step)
+        profiler.run(slow_step)
+        profile = profiler.finish()
+
+        stats = marshal.loads(profile.stats)
+        calls = {func[2]: data[1] for func, data in stats.items()}
+        assert calls["slow_step"] == 2
+        assert "slow_step" in profile.text(limit=10)
+        assert profile.duration >= 0.02
+
+    def test_one_profiled_execution_at_a_time(self):
+        """Test that a second profiler is refused until the first finishes."""
+        first = ExecutionProfiler.start("exec-1", "a1", "q")
+        assert ExecutionProfiler.start("exec-2", "a1", "q") is None
+        first.finish()
+
+        second = ExecutionProfiler.start("exec-3", "a1", "q")
+        assert second is not None
+        second.finish()
+
+    def test_store_is_bounded(self):
+        """Test that the store keeps only the newest profiles."""
+        store = ProfileStore(maxlen=2)
+        for i in range(3):
+            store.add(ExecutionProfile(f"p{i}", "a1", "q"))
+
+        assert [p.id for p in store.list()] == ["p2", "p1"]
+        assert store.get("p0") is None
+
+    def test_disabled_unless_turned_on(self, monkeypatch):
+        """Test that the header is ignored unless profiling is on, and checked against the token."""
+        monkeypatch.setattr(profiling, "PROFILING", False)
+        assert profiling.should_profile("1") is False
+
+        monkeypatch.setattr(profiling, "PROFILING", True)
+        monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+        assert profiling.should_profile("1") is False
+        assert profiling.should_profile("secret") is True
+        assert profiling.should_profile(None) is False
+
+
+class TestProfileEndpoints:
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        from api.agent import router as agent_router
+        from api.debug import router as debug_router
+
+        monkeypatch.setattr(profiling, "PROFILING", True)
+        monkeypatch.setattr(profiling, "PROFILE_TOKEN", "")
+        monkeypatch.setattr(profiling, "_GLOBAL_PROFILES", ProfileStore(5))
+        app = FastAPI()
+        app.include_router(agent_router, prefix="/api")
+        app.include_router(debug_router, prefix="/api")
+        store = SQLiteAgentRepository(str(tmp_path / "agents.db"))
+
+        async def override():
+            yield store
+
+        app.dependency_overrides[get_agent_store] = override
+        with TestClient(app) as client:
+            client.post("/api/agents", json={"id": "a1", "name": "Alpha", "description": "First", "tools": ["calculator"]})
+            yield client
+
+    def test_profiled_stream_is_downloadable(self, client):
+        """Test that X-Profile records the execution and the profile can be fetched."""
+        def fake_orchestrator(agent, query):
+            yield {"type": "message", "content": slow_step()}
+            yield {"type": "result", "content": "done"}
+
+        with patch("api.agent.get_global_execution_buffer", return_value=ExecutionEventBuffer()), \
+                patch("api.agent.stream_agent_events", fake_orchestrator):
+            plain = client.get("/api/agents/a1/stream", params={"query": "2+2"})
+            profiled = client.get("/api/agents/a1/stream", params={"query": "2+2"}, headers={"X-Profile": "1"})
+
+        profile_id = profiled.headers["X-Profile-Id"]
+        listing = client.get("/api/debug/profiles").json()
+        download = client.get(f"/api/debug/profiles/{profile_id}")
+        text = client.get(f"/api/debug/profiles/{profile_id}", params={"format": "text"})
+
+        assert "X-Profile-Id" not in plain.headers
+        assert [p["id"] for p in listing] == [profile_id]
+        assert download.headers["content-type"] == "application/octet-stream"
+        assert any(func[2] == "slow_step" for func in marshal.loads(download.content))
+        assert "slow_step" in text.text
+        assert client.get("/api/debug/profiles/missing").status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_cancelled_execution_frees_the_profiler(self, tmp_path, monkeypatch):
+        """Test that an execution cancelled before its first step still releases the profiler."""
+        from api.agent import stream_agent_execution
+
+        monkeypatch.setattr(profiling, "PROFILING", True)
+        monkeypatch.setattr(profiling, "PROFILE_TOKEN", "")
+        monkeypatch.setattr(profiling, "_GLOBAL_PROFILES", ProfileStore(5))
+        buffer = ExecutionEventBuffer()
+        store = SQLiteAgentRepository(str(tmp_path / "agents.db"))
+        await store.create(Agent(id="a1", name="Alpha", description="First"))
+
+        with patch("api.agent.get_global_execution_buffer", return_value=buffer):
+            response = await stream_agent_execution("a1", "2+2", None, "1", store)
+        log = buffer.get(response.headers["X-Profile-Id"])
+        log.task.cancel()
+        await asyncio.gather(log.task, return_exceptions=True)
+        await store.close()
+
+        profiler = ExecutionProfiler.start("exec-2", "a1", "q")
+        assert profiler is not None
+        profiler.finish()
+
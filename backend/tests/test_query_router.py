@@ -0,0 +1,112 @@
+import pytest
+from types import SimpleNamespace
+from agents.application import orchestrator
+from agents.application.query_router import GREETING_REPLY, TOOL_CALLS_AVOIDED, QueryRouter
+from agents.core.services.tool_registry import ToolRegistry
+
+
+class TestClassification:
+    @pytest.fixture
+    def router(self):
+        return QueryRouter()
+
+    @pytest.mark.parametrize("query,intent", [
+        ("hello", "greeting"),
+        ("good morning team", "greeting"),
+        ("2+2", "math"),
+        ("what is 3 * (4 + 5)?", "math"),
+        ('{"a": [1, 2]}', "json"),
+        ("summarize https://example.com/post", "url"),
+        ("what is python", "none"),
+        ("2024", "none"),
+        ("{not json", "none"),
+    ])
+    def test_intents(self, router, query, intent):
+        """Test that the built-in matchers classify common query shapes."""
+        assert router.route(query, ["calculator", "web_search"]).intent == intent
+
+    def test_math_keeps_only_the_calculator(self, router):
+        """Test that arithmetic skips search and summarization."""
+        route = router.route("12 * 7", ["web_search", "summarizer", "calculator"])
+
+        assert route.tools == ["calculator"]
+        assert route.skipped == ["web_search", "summarizer"]
+
+    def test_math_without_calculator_is_left_alone(self, router):
+        """Test that `when` keeps a rule from firing on plans it cannot improve."""
+        route = router.route("12 * 7", ["web_search"])
+
+        assert route.intent == "none" and route.tools == ["web_search"]
+
+    def test_plan_is_never_emptied(self, router):
+        """Test that a rule pruning every tool keeps the original plan."""
+        route = router.route('{"a": 1}', ["web_search"])
+
+        assert route.intent == "json"
+        assert route.tools == ["web_search"] and route.skipped == []
+
+    def test_greeting_replies_directly(self, router):
+        """Test that greetings skip every tool."""
+        route = router.route("hey there", ["web_search", "summarizer"])
+
+        assert route.reply == GREETING_REPLY
+        assert route.tools == [] and route.skipped == ["web_search", "summarizer"]
+
+
+class TestConfiguredRoutes:
+    def test_pattern_rule_reorders(self):
+        """Test that a configured regex rule moves its tools to the front."""
+        router = QueryRouter([{"intent": "ticket", "pattern": r"^[a-z]+-\d+$", "first": ["tracker"]}])
+
+        route = router.route("OPS-42", ["web_search", "tracker"])
+
+        assert route.intent == "ticket"
+        assert route.tools == ["tracker", "web_search"] and route.skipped == []
+
+    def test_unknown_matcher_is_rejected(self):
+        """Test that a typo in the config fails when the router is built."""
+        with pytest.raises(ValueError):
+            QueryRouter([{"intent": "x", "match": "nope"}])
+
+    def test_avoided_calls_are_counted(self):
+        """Test that every pruned tool is counted per intent."""
+        before = TOOL_CALLS_AVOIDED.labels(intent="math", tool="web_search").value
+
+        QueryRouter().route("1 + 1", ["web_search", "calculator"])
+
+        assert TOOL_CALLS_AVOIDED.labels(intent="math", tool="web_search").value == before + 1
+
+
+class TestOrchestratorRouting:
+    @pytest.fixture
+    def registry(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "registered_tools.json")
+        monkeypatch.setattr(ToolRegistry, "_persist_path", lambda self: path)
+        registry = ToolRegistry()
+        registry.register_from_code("def calculator(expression):\n    return 'calc:' + expression\n", "calculator")
+        registry.register_from_code("def web_search(query):\n    raise AssertionError('searched')\n", "web_search")
+        monkeypatch.setattr(orchestrator, "get_global_registry", lambda: registry)
+        return registry
+
+    def test_routed_plan_is_reported_and_run(self, registry):
+        """Test that the stream reports the decision and runs only the routed tools."""
+        agent = SimpleNamespace(name="maths", tools=["web_search", "calculator"])
+
+        events = list(orchestrator.stream_agent_events(agent, "6 * 7"))
+
+        routed = [ev for ev in events if "route" in ev]
+        steps = [ev["step"]["tool_name"] for ev in events if "step" in ev]
+        assert routed[0]["route"] == {"intent": "math", "tools": ["calculator"],
+                                      "skipped": ["web_search"], "reply": False}
+        assert steps == ["calculator"]
+        assert events[-2] == {"type": "result", "content": "[calculator]\ncalc:6 * 7"}
+
+    def test_greeting_builds_no_graph(self, registry, monkeypatch):
+        """Test that a direct reply returns before the graph is built."""
+        monkeypatch.setattr(orchestrator, "_make_graph", lambda registry: pytest.fail("graph built"))
+        agent = SimpleNamespace(name="chatty", tools=["web_search"])
+
+        events = list(orchestrator.stream_agent_events(agent, "hi"))
+
+        assert [ev["type"] for ev in events] == ["message", "result", "complete"]
+        assert events[1]["content"] == GREETING_REPLY
@@ -0,0 +1,128 @@
+import time
+import pytest
+import fakeredis
+from agents.core.events.agent_event_observer import AgentEvent, AgentEventObserver, AgentEventType
+from agents.infrastructure.messaging.redis_event_stream import RedisEventStream
+
+
+def make_event(i: int = 0) -> AgentEvent:
+    return AgentEvent(
+        agent_id=f"agent-{i}",
+        event_type=AgentEventType.EXECUTION_COMPLETED,
+        timestamp=time.time(),
+        data={"i": i, "result": "ok"},
+    )
+
+
+class TestRedisEventStream:
+    @pytest.fixture
+    def redis_client(self):
+        # Local Redis stand-in: real stream and consumer-group semantics, no server
+        return fakeredis.FakeAsyncRedis(decode_responses=True)
+    
+    @pytest.fixture
+    def stream(self, redis_client):
+        return RedisEventStream(redis_client, stream="test-events", maxlen=1000, claim_idle_ms=0)
+    
+    @pytest.mark.asyncio
+    async def test_batch_publish_round_trip(self, stream):
+        """Test that a batched XADD is read back intact through a consumer group."""
+        await stream.ensure_group("workers", start_id="0")
+        sent = [make_event(i) for i in range(5)]
+        
+        ids = await stream.publish_batch(sent)
+        received = await stream.read("workers", "w1", count=10, block_ms=None)
+        
+        assert len(ids) == 5
+        assert [event for _, event in received] == sent
+    
+    @pytest.mark.asyncio
+    async def test_group_members_split_entries(self, stream):
+        """Test that consumers in one group never receive the same entry twice."""
+        await stream.ensure_group("workers", start_id="0")
+        await stream.publish_batch([make_event(i) for i in range(6)])
+        
+        first = await stream.read("workers", "w1", count=3, block_ms=None)
+        second = await stream.read("workers", "w2", count=10, block_ms=None)
+        
+        assert len(first) == 3 and len(second) == 3
+        assert not {i for i, _ in first} & {i for i, _ in second}
+    
+    @pytest.mark.asyncio
+    async def test_unacked_batch_is_redelivered_after_restart(self, stream):
+        """Test that a batch whose handler failed is handed out again, then acked."""
+        await stream.ensure_group("workers", start_id="0")
+        await stream.publish_batch([make_event(i) for i in range(3)])
+        
+        async def crash(events):
+            raise RuntimeError("worker died")
+        
+        with pytest.raises(RuntimeError):
+            await stream.consume_once("workers", "w1", crash, block_ms=None)
+        
+        handled = []
+        
+        async def handle(events):
+            handled.extend(events)
+        
+        # A restarted (or different) consumer picks the pending entries up
+        assert await stream.consume_once("workers", "w2", handle, block_ms=None) == 3
+        assert [e.data["i"] for e in handled] == [0, 1, 2]
+        pending = await stream.redis.xpending("test-events", "workers")
+        assert pending["pending"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_trimmed_pending_entries_are_acked(self, stream):
+        """Test that pending entries whose fields were trimmed away are acknowledged, not skipped forever."""
+        await stream.ensure_group("workers", start_id="0")
+        await stream.publish_batch([make_event(i) for i in range(3)])
+        await stream.read("workers", "w1", count=10, block_ms=None)
+        await stream.redis.xtrim("test-events", maxlen=1, approximate=False)
+
+        pending = await stream.read("workers", "w1", pending=True)
+
+        assert [event.data["i"] for _, event in pending] == [2]
+        assert (await stream.redis.xpending("test-events", "workers"))["pending"] == 1
+
+    @pytest.mark.asyncio
+    async def test_poison_batch_is_dead_lettered(self, stream):
+        """Test that a batch whose handler keeps failing stops after max_deliveries and is dead-lettered."""
+        stream.max_deliveries = 3
+        await stream.ensure_group("workers", start_id="0")
+        await stream.publish_batch([make_event(i) for i in range(2)])
+        await stream.redis.xadd("test-events", {"agent_id": "a", "type": "no-such-type", "ts": "0", "data": "{}"})
+
+        async def crash(events):
+            raise RuntimeError("handler bug")
+
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await stream.consume_once("workers", "w1", crash, block_ms=None)
+        handled = await stream.consume_once("workers", "w1", crash, block_ms=None)
+
+        dead = await stream.redis.xrange("test-events:dead")
+        assert handled == 0
+        assert (await stream.redis.xpending("test-events", "workers"))["pending"] == 0
+        assert sorted(fields["reason"] for _, fields in dead) == [
+            "gave up after 3 deliveries", "gave up after 3 deliveries", "unreadable event: 'no-such-type' is not a valid AgentEventType",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_ensure_group_is_idempotent(self, stream):
+        """Test that creating an existing group is not an error."""
+        await stream.ensure_group("workers")
+        await stream.ensure_group("workers")
+    
+    @pytest.mark.asyncio
+    async def test_observer_fans_out_to_stream(self, stream):
+        """Test that the observer's batch subscription publishes to the stream."""
+        await stream.ensure_group("workers", start_id="0")
+        observer = AgentEventObserver()
+        observer.subscribe_batch(stream.publish_batch)
+        
+        for i in range(4):
+            await observer.notify(make_event(i))
+        await observer.close()
+        
+        received = await stream.read("workers", "w1", count=10, block_ms=None)
+        assert len(received) == 4
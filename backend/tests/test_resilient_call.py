@@ -0,0 +1,176 @@
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from agents.infrastructure.external.resilient_call import ResilientCaller, is_retryable
+from agents.infrastructure.external.upstream_limiter import AdaptiveLimiter
+
+
+class ServerError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers={})
+
+
+def flaky(failures, result="ok"):
+    """A call that raises each of `failures` in turn, then succeeds."""
+    remaining = list(failures)
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        if remaining:
+            raise remaining.pop(0)
+        return result
+
+    return fn, calls
+
+
+class TestRetries:
+    def test_retryable_errors_are_retried(self):
+        """Test that 429s and 5xx are retried until an attempt succeeds."""
+        caller = ResilientCaller("test", max_attempts=3, base_delay=0.001, hedge_quantile=None)
+        fn, calls = flaky([ServerError(429), ServerError(502)])
+
+        assert caller.call(fn) == "ok"
+        assert len(calls) == 3
+        assert caller.retries == 2
+
+    def test_client_errors_are_not_retried(self):
+        """Test that a 400 is raised straight away."""
+        caller = ResilientCaller("test", max_attempts=3, base_delay=0.001, hedge_quantile=None)
+        fn, calls = flaky([ServerError(400)])
+
+        with pytest.raises(ServerError):
+            caller.call(fn)
+        assert len(calls) == 1
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that the last error surfaces once attempts run out."""
+        caller = ResilientCaller("test", max_attempts=2, base_delay=0.001, hedge_quantile=None)
+        fn, calls = flaky([ServerError(503), ServerError(503), ServerError(503)])
+
+        with pytest.raises(ServerError):
+            caller.call(fn)
+        assert len(calls) == 2
+
+    def test_attempt_deadline(self):
+        """Test that an attempt outliving its deadline is abandoned and retried."""
+        caller = ResilientCaller("test", attempt_timeout=0.05, max_attempts=2, base_delay=0.001, hedge_quantile=None)
+        attempts = []
+
+        def fn(timeout):
+            attempts.append(timeout)
+            if len(attempts) == 1:
+                time.sleep(0.5)
+            return "second"
+
+        start = time.monotonic()
+        assert caller.call(fn) == "second"
+        assert time.monotonic() - start < 0.4
+        assert attempts == [0.05, 0.05]
+
+    def test_classification(self):
+        """Test which failures count as transient."""
+        assert is_retryable(ServerError(429))
+        assert is_retryable(ServerError(500))
+        assert is_retryable(TimeoutError())
+        assert not is_retryable(ServerError(401))
+        assert not is_retryable(ValueError("bad"))
+
+
+class TestHedging:
+    def warm(self, caller, latency=0.01, samples=20):
+        for _ in range(samples):
+            caller.call(lambda timeout: time.sleep(latency))
+
+    def test_slow_attempt_is_hedged(self):
+        """Test that a call slower than the hedge quantile is raced by a duplicate."""
+        caller = ResilientCaller("test", hedge_quantile=0.9, hedge_budget=1.0, min_samples=20)
+        self.warm(caller)
+        first = threading.Event()
+
+        def fn(timeout):
+            if not first.is_set():
+                first.set()
+                time.sleep(1.0)
+                return "slow"
+            return "hedge"
+
+        start = time.monotonic()
+        assert caller.call(fn) == "hedge"
+        assert time.monotonic() - start < 0.5
+        assert caller.hedges == 1
+        assert caller.hedge_wins == 1
+
+    def test_no_hedge_without_enough_samples(self):
+        """Test that hedging waits for a latency history."""
+        caller = ResilientCaller("test", hedge_quantile=0.9, hedge_budget=1.0, min_samples=20)
+
+        assert caller.hedge_delay() is None
+        caller.call(lambda timeout: "ok")
+        assert caller.hedges == 0
+
+    def test_budget_caps_hedges(self):
+        """Test that only about hedge_budget of calls are duplicated."""
+        caller = ResilientCaller("test", hedge_quantile=0.5, hedge_budget=0.1, min_samples=20)
+        self.warm(caller, latency=0.001)
+        hedges_before = caller.hedges
+
+        for _ in range(30):
+            caller.call(lambda timeout: time.sleep(0.02))
+
+        assert 1 <= caller.hedges - hedges_before <= 5
+
+    def test_no_hedge_while_limiter_is_queued(self):
+        """Test that hedges are withheld while callers wait on the upstream limiter."""
+        limiter = AdaptiveLimiter("test", initial_limit=4)
+        caller = ResilientCaller("test", limiter=limiter, hedge_quantile=0.5, hedge_budget=1.0, min_samples=1)
+        caller.call(lambda timeout: "ok")
+        limiter._waiting.append(object())  # someone is queued
+
+        assert caller._take_hedge_token() is False
+
+
+class TestLimiterQueueing:
+    def test_queue_wait_is_not_attempt_time(self):
+        """Test that waiting for a limiter slot counts towards neither the deadline nor the latency samples."""
+        limiter = AdaptiveLimiter("test", initial_limit=1, tolerance=None)
+        caller = ResilientCaller("test", limiter=limiter, attempt_timeout=0.2, max_attempts=1, hedge_quantile=None)
+        busy = threading.Event()
+
+        def hold_slot():
+            with limiter.slot():
+                busy.set()
+                time.sleep(0.4)
+
+        holder = threading.Thread(target=hold_slot)
+        holder.start()
+        busy.wait()
+        assert caller.call(lambda timeout: "ok") == "ok"
+        holder.join()
+
+        assert max(caller._latencies) < 0.1
+
+    def test_abandoned_hedge_returns_its_slot(self):
+        """Test that a hedge still queued when the primary answers never calls upstream."""
+        limiter = AdaptiveLimiter("test", initial_limit=1, tolerance=None)
+        caller = ResilientCaller("test", limiter=limiter, hedge_quantile=0.5, hedge_budget=1.0, min_samples=1)
+        caller._latencies.append(0.01)
+        caller._hedge_tokens = 1.0
+        fn, calls = flaky([])
+
+        def slow(timeout):
+            time.sleep(0.2)
+            return fn(timeout)
+
+        assert caller.call(slow) == "ok"
+        deadline = time.monotonic() + 1.0
+        while (limiter.in_flight or limiter.queued) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert caller.hedges == 1
+        assert len(calls) == 1
+        assert limiter.in_flight == 0 and limiter.queued == 0
+
@@ -0,0 +1,171 @@
+import pytest
+from types import SimpleNamespace
+from agents.application import orchestrator
+from agents.core.services.tool_registry import ToolRegistry
+from agents.infrastructure.persistence import semantic_cache
+from agents.infrastructure.persistence.semantic_cache import SemanticCache
+
+
+class TestLookup:
+    @pytest.fixture
+    def cache(self):
+        cache = SemanticCache(threshold=0.8)
+        cache.put("agent", "What is the capital of France?", "Paris")
+        return cache
+
+    @pytest.mark.parametrize("query", [
+        "what is the capital of france",
+        "What's the capital of France?",
+        "France capital, what is the?",
+    ])
+    def test_near_duplicates_hit(self, cache, query):
+        """Test that rewordings, case and punctuation changes still match."""
+        hit = cache.get("agent", query)
+
+        assert hit is not None and hit.answer == "Paris"
+        assert hit.query == "What is the capital of France?"
+        assert 0.8 <= hit.similarity <= 1.0
+
+    @pytest.mark.parametrize("query", [
+        "What is the capital of Germany?",
+        "what is the population of France",
+        "what is the capital city of France",
+    ])
+    def test_different_questions_miss(self, cache, query):
+        """Test that queries below the threshold are not answered."""
+        assert cache.get("agent", query) is None
+
+    def test_threshold_is_configurable(self, cache):
+        """Test that a stricter threshold rejects looser matches."""
+        strict = SemanticCache(threshold=0.99)
+        strict.put("agent", "What is the capital of France?", "Paris")
+
+        assert cache.get("agent", "What's the capital of France?") is not None
+        assert strict.get("agent", "What's the capital of France?") is None
+
+    def test_scopes_are_isolated(self, cache):
+        """Test that another agent never sees the answer."""
+        assert cache.get("other-agent", "What is the capital of France?") is None
+
+    @pytest.mark.parametrize("cached, query", [
+        ("what is the current population of the city of Paris in France",
+         "what is the current population of the city of Lyon in France"),
+        ("who is the chief executive officer of Microsoft", "who is the chief executive officer of Microsoft Research"),
+        ("how tall is the Eiffel Tower", "how tall is the Tokyo Tower"),
+    ])
+    def test_swapped_entities_miss(self, cached, query):
+        """Test that a question about another entity misses, however similar its spelling."""
+        cache = SemanticCache()
+        cache.put("agent", cached, "answer")
+
+        assert cache.get("agent", query) is None
+        assert cache.get("agent", cached).answer == "answer"
+
+    def test_numbers_are_part_of_the_scope(self):
+        """Test that queries differing only in a number never match."""
+        cache = SemanticCache()
+        cache.put("agent", "what is 2 + 2", "4")
+
+        assert cache.get("agent", "what is 2 + 3") is None
+        assert cache.get("agent", "What is 2+2?").answer == "4"
+
+    def test_negation_is_part_of_the_scope(self):
+        """Test that a negated question never gets the answer to the plain one."""
+        cache = SemanticCache()
+        cache.put("agent", "is it safe to eat raw chicken", "no")
+
+        assert cache.get("agent", "is it not safe to eat raw chicken") is None
+        assert cache.get("agent", "isn't it safe to eat raw chicken") is None
+        assert cache.get("agent", "Is it safe to eat raw chicken?").answer == "no"
+
+    def test_empty_query_is_not_cached(self):
+        """Test that a query without words is neither stored nor matched."""
+        cache = SemanticCache()
+
+        assert cache.put("agent", "?!", "x") is False
+        assert cache.get("agent", "?!") is None and len(cache) == 0
+
+
+class TestBounds:
+    def test_least_recently_used_is_evicted(self):
+        """Test that max_entries bounds the cache, keeping recently hit entries."""
+        cache = SemanticCache(max_entries=2)
+        cache.put("agent", "weather in paris today", "sunny")
+        cache.put("agent", "stock price of acme corporation", "12")
+        cache.get("agent", "weather in paris today")
+
+        cache.put("agent", "recipe for lemon pancakes", "flour")
+
+        assert len(cache) == 2
+        assert cache.get("agent", "stock price of acme corporation") is None
+        assert cache.get("agent", "weather in paris today").answer == "sunny"
+        assert not any(isinstance(b, list) and len(b) > 2 for b in cache._buckets.values())
+
+    def test_eviction_empties_buckets(self):
+        """Test that evicted entries leave nothing behind in the LSH index."""
+        cache = SemanticCache(max_entries=1)
+        cache.put("agent", "weather in paris today", "sunny")
+        cache.put("agent", "recipe for lemon pancakes", "flour")
+
+        assert len(cache._buckets) == cache.bands
+
+    def test_expired_entries_miss(self, monkeypatch):
+        """Test that answers older than the TTL are not served."""
+        now = [1000.0]
+        monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+        cache = SemanticCache(ttl=60)
+        cache.put("agent", "weather in paris today", "sunny")
+
+        now[0] += 61
+
+        assert cache.get("agent", "weather in paris today") is None
+
+    def test_bands_must_fit_the_signature(self):
+        """Test that an LSH layout wider than the signature is rejected."""
+        with pytest.raises(ValueError):
+            SemanticCache(slots=16, bands=8, rows=4)
+
+
+class TestOrchestratorCache:
+    @pytest.fixture
+    def cache(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "registered_tools.json")
+        monkeypatch.setattr(ToolRegistry, "_persist_path", lambda self: path)
+        registry = ToolRegistry()
+        registry.register_from_code("def lookup(query=None, text=None):\n    return 'found: ' + query\n", "lookup")
+        registry.register_from_code("def broken(query=None, text=None):\n    raise RuntimeError('down')\n", "broken")
+        monkeypatch.setattr(orchestrator, "get_global_registry", lambda: registry)
+        cache = SemanticCache()
+        monkeypatch.setattr(orchestrator, "get_semantic_cache", lambda: cache)
+        return cache
+
+    def test_near_duplicate_runs_no_tools(self, cache, monkeypatch):
+        """Test that a repeated question is answered without building the graph."""
+        agent = SimpleNamespace(id="a1", version=1, name="finder", tools=["lookup"])
+        first = list(orchestrator.stream_agent_events(agent, "Who maintains the billing service?"))
+        monkeypatch.setattr(orchestrator, "_make_graph", lambda registry: pytest.fail("graph built"))
+
+        events = list(orchestrator.stream_agent_events(agent, "who maintains the billing service"))
+
+        assert [ev["type"] for ev in events] == ["message", "result", "complete"]
+        assert events[0]["cache"]["query"] == "Who maintains the billing service?"
+        assert events[1] == first[-2]
+
+    def test_new_agent_version_misses(self, cache):
+        """Test that editing an agent invalidates its cached answers."""
+        agent = SimpleNamespace(id="a1", version=1, name="finder", tools=["lookup"])
+        list(orchestrator.stream_agent_events(agent, "Who maintains the billing service?"))
+        agent.version = 2
+
+        events = list(orchestrator.stream_agent_events(agent, "Who maintains the billing service?"))
+
+        assert not any("cache" in ev for ev in events)
+        assert [ev["step"]["tool_name"] for ev in events if "step" in ev] == ["lookup"]
+
+    def test_failed_runs_are_not_cached(self, cache):
+        """Test that an answer with a failed step is not stored."""
+        agent = SimpleNamespace(id="a1", version=1, name="finder", tools=["lookup", "broken"])
+
+        list(orchestrator.stream_agent_events(agent, "Who maintains the billing service?"))
+
+        assert len(cache) == 0
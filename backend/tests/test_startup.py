@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from agents.core.events import agent_event_observer
+from agents.core.events.agent_event_observer import AgentEvent, AgentEventObserver, AgentEventType
+from benchmarks.startup import BACKEND, FORBID, parse_importtime
+
+
+class TestColdStart:
+    def test_import_main_loads_no_heavy_sdks(self):
+        """Test that openai, langgraph, SQLAlchemy etc. load on first use, not at import."""
+        code = (
+            "import json, sys\n"
+            "import main\n"
+            f"print(json.dumps([m for m in {FORBID.split(',')!r} if m in sys.modules]))\n"
+        )
+        env = {k: v for k, v in os.environ.items() if k not in ("EXECUTION_QUEUE", "EVENT_STREAM", "TOOL_SYNC")}
+        proc = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, env=env, capture_output=True, text=True)
+
+        assert proc.returncode == 0, proc.stderr
+        assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
+
+    def test_import_main_does_not_build_the_registry(self):
+        """Test that the tool registry is only constructed by the app's lifespan."""
+        code = (
+            "import main\n"
+            "from agents.core.services import tool_registry\n"
+            "print(tool_registry._GLOBAL_REGISTRY is None)\n"
+        )
+        proc = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, capture_output=True, text=True)
+
+        assert proc.stdout.strip().splitlines()[-1] == "True", proc.stderr
+
+    def test_parse_importtime_sums_self_time_by_package(self):
+        """Test that -X importtime lines are grouped by top-level package."""
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |     pydantic.fields\n"
+            "import time:        50 |        150 |   pydantic\n"
+            "import time:        20 |        170 | main\n"
+        )
+
+        assert parse_importtime(stderr) == pytest.approx({"pydantic": 150e-6, "main": 20e-6})
+
+
+class TestShutdown:
+    def test_queued_events_are_delivered_on_shutdown(self, monkeypatch):
+        """Test that the lifespan drains the event observer before the app stops."""
+        from main import app
+
+        observer = AgentEventObserver()
+        monkeypatch.setattr(agent_event_observer, "_GLOBAL_OBSERVER", observer)
+        delivered = []
+
+        async def slow(events):
+            await asyncio.sleep(0.05)
+            delivered.extend(events)
+
+        observer.subscribe_batch(slow)
+        event = AgentEvent(agent_id="a1", event_type=AgentEventType.CREATED, timestamp=time.time(), data={})
+        with TestClient(app) as client:
+            client.portal.call(observer.notify, event)
+
+        assert delivered == [event]
+        assert observer._workers == []
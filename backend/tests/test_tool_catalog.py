@@ -0,0 +1,92 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from agents.core.services import tool_registry as tool_registry_module
+from agents.core.services.tool_registry import ToolRegistry
+from agents.presentation.api.http_cache import etag_matches
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    # Keep test registrations out of config/registered_tools.json
+    path = str(tmp_path / "registered_tools.json")
+    monkeypatch.setattr(ToolRegistry, "_persist_path", lambda self: path)
+    return ToolRegistry()
+
+
+class TestCatalog:
+    def test_catalog_is_built_once_per_version(self, registry, monkeypatch):
+        """Test that list_tools() reuses the catalog until the registry changes."""
+        first = registry.list_tools()
+        monkeypatch.setattr(registry, "_build_catalog", lambda: pytest.fail("rebuilt"))
+
+        assert registry.list_tools() is first
+
+    def test_registration_invalidates_catalog_and_etag(self, registry):
+        """Test that a new tool shows up and changes the ETag."""
+        before, etag = registry.catalog()
+
+        registry.register_llm_tool("translator", "Translates text", ["input"])
+        after, new_etag = registry.catalog()
+
+        assert "translator" not in before
+        assert after["translator"]["parameters"] == ["input"]
+        assert new_etag != etag
+
+    def test_etag_depends_only_on_content(self, registry):
+        """Test that two registries with the same tools agree on the ETag."""
+        other = ToolRegistry()
+
+        assert registry.catalog()[1] == other.catalog()[1]
+
+    def test_has_tool(self, registry):
+        """Test O(1) name checks against built-in and registered tools."""
+        registry.register_llm_tool("translator", "Translates text", ["input"])
+
+        assert registry.has_tool("calculator")
+        assert registry.has_tool("translator")
+        assert not registry.has_tool("missing")
+
+
+class TestEtagMatching:
+    def test_matches(self):
+        """Test strong, weak, listed and wildcard If-None-Match values."""
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches('"x", "abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"abd"', '"abc"')
+        assert not etag_matches(None, '"abc"')
+
+
+class TestToolsEndpoint:
+    @pytest.fixture
+    def client(self, registry, monkeypatch):
+        from agents.presentation.api.tool_routes import router
+
+        monkeypatch.setattr(tool_registry_module, "_GLOBAL_REGISTRY", registry)
+        app = FastAPI()
+        app.include_router(router, prefix="/api")
+        with TestClient(app) as client:
+            yield client
+
+    def test_if_none_match_gets_304_until_a_tool_is_registered(self, client, registry):
+        """Test that polling with the ETag is free until the catalog changes."""
+        first = client.get("/api/tools")
+        etag = first.headers["ETag"]
+        unchanged = client.get("/api/tools", headers={"If-None-Match": etag})
+
+        registry.register_llm_tool("translator", "Translates text", ["input"])
+        changed = client.get("/api/tools", headers={"If-None-Match": etag})
+
+        assert first.status_code == 200 and "calculator" in first.json()
+        assert first.headers["Cache-Control"] == "no-cache"
+        assert unchanged.status_code == 304 and unchanged.content == b""
+        assert changed.status_code == 200 and "translator" in changed.json()
+        assert changed.headers["ETag"] != etag
+
+    def test_duplicate_name_is_rejected(self, client):
+        """Test that registering an existing name is a 409."""
+        resp = client.post("/api/tools/register_llm", json={"name": "calculator", "description": "Does maths"})
+
+        assert resp.status_code == 409
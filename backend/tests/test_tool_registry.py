@@ -68,3 +68,21 @@ class CustomTool(WebSearchTool):
         assert result is not None
         assert "content" in result
         assert isinstance(result["content"], str)
+
+
+class TestFunctionTools:
+    @pytest.fixture
+    def registry(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "registered_tools.json")
+        monkeypatch.setattr(ToolRegistry, "_persist_path", lambda self: path)
+        return ToolRegistry()
+
+    def test_create_tool_wraps_a_function(self, registry):
+        """Test that a function tool is built with its registered description and runs."""
+        registry.register_from_code("def shout(text):\n    return text.upper()\n", "shout", description="Upper-cases text")
+
+        tool = registry.create_tool("shout")
+
+        assert tool.name == "shout"
+        assert tool.description == "Upper-cases text"
+        assert tool.run(text="hi").content == "HI"
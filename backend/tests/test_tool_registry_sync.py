@@ -0,0 +1,99 @@
+import asyncio
+import os
+import pytest
+import fakeredis
+from agents.core.services.tool_registry import ToolRegistry
+from agents.infrastructure.messaging.tool_registry_sync import RedisToolRegistrySync
+
+
+@pytest.fixture
+def persist_path(tmp_path, monkeypatch):
+    # Keep test registrations out of config/registered_tools.json
+    path = str(tmp_path / "registered_tools.json")
+    monkeypatch.setattr(ToolRegistry, "_persist_path", lambda self: path)
+    return path
+
+
+class TestRegistryChanges:
+    def test_local_registration_notifies_listeners(self, persist_path):
+        """Test that a registration bumps the version and reaches listeners."""
+        registry = ToolRegistry()
+        seen = []
+        registry.subscribe(seen.append)
+        before = registry.version
+
+        registry.register_llm_tool("translator", "Translates text", ["input"])
+
+        assert registry.version == before + 1
+        assert seen == [{
+            'name': 'translator',
+            'kind': 'function',
+            'description': 'Translates text',
+            'parameters': ['input'],
+            'llm_proxy': True,
+        }]
+
+    def test_apply_change_is_incremental_and_idempotent(self, persist_path, monkeypatch):
+        """Test that a remote change builds one tool without persisting or republishing."""
+        registry = ToolRegistry()
+        seen = []
+        registry.subscribe(seen.append)
+        monkeypatch.setattr(registry, "_load_persisted", lambda: pytest.fail("full reload"))
+        entry = {'name': 'remote_tool', 'kind': 'function', 'description': 'From elsewhere',
+                 'parameters': ['input'], 'llm_proxy': True}
+
+        assert registry.apply_change(entry) is True
+        assert registry.apply_change(dict(entry)) is False
+        assert "remote_tool" in registry.list_tools()
+        assert seen == []
+        assert not os.path.exists(persist_path)
+
+
+class TestRedisToolRegistrySync:
+    @pytest.fixture
+    def redis_client(self):
+        return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    @pytest.mark.asyncio
+    async def test_registration_reaches_other_worker(self, persist_path, redis_client):
+        """Test that a tool registered on one worker appears on another."""
+        origin = RedisToolRegistrySync(redis_client, ToolRegistry(), stream="test-tools")
+        follower = RedisToolRegistrySync(redis_client, ToolRegistry(), stream="test-tools")
+        origin.registry.subscribe(origin._on_local_change)
+
+        origin.registry.register_llm_tool("summarize_v2", "Summarizes text", ["input"])
+        await asyncio.gather(*origin._publishing)
+        read = await follower.poll_once(block_ms=None)
+
+        assert read == 1
+        assert follower.applied == 1
+        assert "summarize_v2" in follower.registry.list_tools()
+        assert follower.last_id != "0"
+
+    @pytest.mark.asyncio
+    async def test_own_changes_are_skipped(self, persist_path, redis_client):
+        """Test that a worker tailing its own changes does not rebuild the tool."""
+        sync = RedisToolRegistrySync(redis_client, ToolRegistry(), stream="test-tools")
+        sync.registry.subscribe(sync._on_local_change)
+
+        sync.registry.register_llm_tool("echo_tool", "Echoes input", ["input"])
+        await asyncio.gather(*sync._publishing)
+        version = sync.registry.version
+        await sync.poll_once(block_ms=None)
+
+        assert sync.applied == 0
+        assert sync.registry.version == version
+
+    @pytest.mark.asyncio
+    async def test_bad_change_does_not_block_later_ones(self, persist_path, redis_client):
+        """Test that an entry that fails to build is skipped and tailing continues."""
+        sync = RedisToolRegistrySync(redis_client, ToolRegistry(), stream="test-tools")
+        await sync.publish({'name': 'broken', 'kind': 'function', 'code': 'def (:', 'description': ''})
+        await sync.publish({'name': 'fine_tool', 'kind': 'function', 'description': 'Works fine',
+                            'parameters': ['input'], 'llm_proxy': True})
+
+        read = await sync.poll_once(block_ms=None)
+
+        assert read == 2
+        assert "fine_tool" in sync.registry.list_tools()
+        assert "broken" not in sync.registry.list_tools()
@@ -0,0 +1,188 @@
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from agents.infrastructure.external.upstream_limiter import (
+    AdaptiveLimiter,
+    UpstreamBusyError,
+    get_upstream_limiter,
+    is_overload,
+)
+
+
+class RateLimited(Exception):
+    """Shaped like openai.RateLimitError: status_code plus a response with headers."""
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=429, headers=headers)
+
+
+def run_threads(n, target):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+
+
+class TestAdaptiveLimiter:
+    def test_caps_concurrency(self):
+        """Test that no more than the current limit of calls run at once."""
+        limiter = AdaptiveLimiter("test", initial_limit=2, max_limit=2)
+        lock = threading.Lock()
+        peak = [0, 0]  # current, max
+
+        def call():
+            with limiter.slot():
+                with lock:
+                    peak[0] += 1
+                    peak[1] = max(peak[1], peak[0])
+                time.sleep(0.02)
+                with lock:
+                    peak[0] -= 1
+
+        run_threads(8, call)
+
+        assert peak[1] == 2
+        assert limiter.in_flight == 0
+
+    def test_waiters_are_served_in_arrival_order(self):
+        """Test that a freed slot goes to the longest-waiting caller."""
+        limiter = AdaptiveLimiter("test", initial_limit=1, max_limit=1)
+        order = []
+        limiter.acquire()
+        threads = []
+        for i in range(5):
+            t = threading.Thread(target=lambda i=i: (limiter.acquire(), order.append(i), limiter.release(0.01, 1)))
+            t.start()
+            threads.append(t)
+            while limiter.queued < i + 1:
+                time.sleep(0.001)
+
+        limiter.release(0.01, 1)
+        for t in threads:
+            t.join(5)
+
+        assert order == [0, 1, 2, 3, 4]
+
+    def test_overload_cuts_limit_once_per_burst(self):
+        """Test that a 429 halves the limit and simultaneous ones count once."""
+        limiter = AdaptiveLimiter("test", initial_limit=16)
+        limiter.baseline_latency = 10.0  # a burst within one baseline is one signal
+
+        for _ in range(3):
+            limiter.acquire()
+        for _ in range(3):
+            limiter.release(0.1, 3, overload=True)
+
+        assert int(limiter.limit) == 8
+        assert limiter.overloads == 3
+
+    def test_success_at_the_limit_grows_it(self):
+        """Test additive increase: about one slot per limit's worth of saturated successes."""
+        limiter = AdaptiveLimiter("test", initial_limit=4)
+
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(0.1, in_flight=4)
+
+        assert int(limiter.limit) == 5
+
+    def test_slow_calls_count_as_overload(self):
+        """Test that latency well above the baseline backs the limit off."""
+        limiter = AdaptiveLimiter("test", initial_limit=8, tolerance=2.0)
+        limiter.acquire()
+        limiter.release(0.1, 1)
+
+        limiter.acquire()
+        limiter.release(0.5, 1)
+
+        assert int(limiter.limit) == 4
+
+    def test_client_errors_do_not_adapt(self):
+        """Test that an ordinary failure releases the slot without moving the limit."""
+        limiter = AdaptiveLimiter("test", initial_limit=4)
+
+        with pytest.raises(ValueError):
+            with limiter.slot():
+                raise ValueError("bad request")
+
+        assert limiter.limit == 4.0
+        assert limiter.in_flight == 0
+
+    def test_retry_after_pauses_new_calls(self):
+        """Test that a 429 with Retry-After holds back the next caller."""
+        limiter = AdaptiveLimiter("test", initial_limit=4)
+        with pytest.raises(RateLimited):
+            with limiter.slot():
+                raise RateLimited(retry_after=0.2)
+
+        start = time.monotonic()
+        with limiter.slot():
+            pass
+
+        assert time.monotonic() - start >= 0.15
+
+    def test_queue_timeout(self):
+        """Test that a caller gives up after queue_timeout with UpstreamBusyError."""
+        limiter = AdaptiveLimiter("test", initial_limit=1)
+        limiter.acquire()
+
+        with pytest.raises(UpstreamBusyError):
+            limiter.acquire(timeout=0.05)
+
+        assert limiter.rejected == 1
+        assert limiter.queued == 0
+
+    def test_converges_below_upstream_capacity(self):
+        """Test that bursts against a capacity-limited upstream settle with few 429s."""
+        capacity = 6
+        limiter = AdaptiveLimiter("sim", initial_limit=32, max_limit=64, tolerance=None)
+        lock = threading.Lock()
+        state = {"active": 0, "ok": 0, "rejected": 0}
+
+        def upstream():
+            with lock:
+                state["active"] += 1
+                over = state["active"] > capacity
+            try:
+                if over:
+                    raise RateLimited()
+                time.sleep(0.005)
+            finally:
+                with lock:
+                    state["active"] -= 1
+
+        def client():
+            for _ in range(30):
+                try:
+                    with limiter.slot():
+                        upstream()
+                    outcome = "ok"
+                except RateLimited:
+                    outcome = "rejected"
+                with lock:
+                    state[outcome] += 1
+
+        run_threads(24, client)
+
+        total = state["ok"] + state["rejected"]
+        assert total == 24 * 30
+        assert state["rejected"] / total < 0.1
+        assert 1 <= limiter.limit <= 2 * capacity
+
+
+class TestUpstreamRegistry:
+    def test_shared_per_upstream(self):
+        """Test that every caller in the process gets the same limiter per upstream."""
+        assert get_upstream_limiter("openai") is get_upstream_limiter("openai")
+        assert get_upstream_limiter("openai") is not get_upstream_limiter("duckduckgo")
+        assert get_upstream_limiter("openai").tolerance is None
+
+    def test_overload_classification(self):
+        """Test which failures count as upstream overload."""
+        assert is_overload(RateLimited())
+        assert is_overload(TimeoutError())
+        assert not is_overload(ValueError("bad input"))
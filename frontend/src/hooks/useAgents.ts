@@ -26,9 +26,16 @@ export const useAgents = (): UseAgentsReturn => {
   useEffect(() => {
     const fetchAgents = async () => {
       try {
-        const response = await fetch('/api/agents');
-        if (!response.ok) throw new Error(`HTTP ${response.status}`);
-        const data: Agent[] = await response.json();
+        // The list is paged; follow X-Next-Cursor until the last page
+        const data: Agent[] = [];
+        let cursor: string | null = null;
+        do {
+          const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+          const response: Response = await fetch(`/api/agents${query}`);
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+          data.push(...((await response.json()) as Agent[]));
+          cursor = response.headers.get('X-Next-Cursor');
+        } while (cursor);
         setAgents(data);
       } catch (err) {
         // Fallback to simulated data if backend is not reachable
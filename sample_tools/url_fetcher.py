@@ -1,17 +1,19 @@
-import requests
+import httpx
 
-def fetch_url(url: str) -> str:
+async def fetch_url(url: str, context) -> str:
     """Fetches the content of a URL.
 
     Args:
         url: The URL to fetch.
+        context: Injected by the tool registry; its shared HTTP client keeps
+            connections to a host open between calls.
 
     Returns:
         The first 500 characters of the content or an error message.
     """
     try:
-        response = requests.get(url, timeout=5)
+        response = await context.http.get(url, timeout=5)
         response.raise_for_status()
         return response.text[:500]
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Error fetching URL: {e}"